@@ -0,0 +1,604 @@
+"""Headless benchmarks for File Search.
+
+Generates reproducible synthetic directory trees and times the parts of the
+app that scale with them. Results are written as JSON so runs can be compared:
+
+    python benchmark.py core --files 10000 100000 --output before.json
+    python benchmark.py core --files 10000 100000 --output after.json
+    python benchmark.py compare before.json after.json
+
+The gui suite drives FileSearchWindow under Qt's offscreen platform:
+
+    python benchmark.py gui --rows 1000 10000
+
+The matchers suite replays a query log against every backend in
+search_core.MATCHERS and checks each one against the reference linear scan:
+
+    python benchmark.py matchers --files 100000 --queries queries.txt
+
+The startup suite launches the app (from source and/or the build.py
+profiles in dist/) and times first paint and index readiness:
+
+    python benchmark.py startup --profiles source onefile fast --files 200000
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from file_index import FileIndex, walk_entries, load_index_file, save_index_file
+from search_core import search_files, MATCHERS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_OUTPUT = "bench_results.json"
+
+# Queries run against every tree; a mix of extensions, common and rare tokens and a miss
+QUERY_MIX = ["mp4", ".jpg", "img_00", "final", "video (1)", "copy.mp4", "2023", "post_1", "zzzznotfound", ""]
+
+MEDIA_PREFIXES = ["IMG", "VID", "video", "clip", "photo", "Screenshot", "DSC", "download"]
+MEDIA_SUFFIXES = ["", "", "", " (1)", " (2)", "_final", " - copy", "_edit"]
+MEDIA_EXTENSIONS = [".jpg"] * 6 + [".png"] * 3 + [".mp4"] * 4 + [".mkv", ".gif", ".webp", ".txt", ".part"]
+WORDS = ["the", "cat", "video", "final", "holiday", "beach", "2023", "2024", "party", "raw",
+         "edit", "clip", "stream", "vlog", "music", "cover", "live", "remix", "draft", "export"]
+
+def media_name(rng, i):
+    """Camera/download style names, e.g. "IMG_0042 (1).jpg"."""
+    return f"{rng.choice(MEDIA_PREFIXES)}_{i:04d}{rng.choice(MEDIA_SUFFIXES)}{rng.choice(MEDIA_EXTENSIONS)}"
+
+def random_name(rng, i):
+    """Random lowercase names; good worst case for substring matching."""
+    length = rng.randint(6, 20)
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(length)) + f"_{i}.dat"
+
+def zipf_name(rng, i):
+    """Names built from a small vocabulary with Zipf-like word frequencies."""
+    words = [WORDS[min(int(rng.paretovariate(1.2)) - 1, len(WORDS) - 1)] for _ in range(rng.randint(1, 4))]
+    return "_".join(words) + f"_{i}" + rng.choice(MEDIA_EXTENSIONS)
+
+NAME_GENERATORS = {
+    "media": media_name,
+    "random": random_name,
+    "zipf": zipf_name,
+}
+
+def synthetic_paths(root, files, depth=3, fanout=8, names="media", seed=0):
+    """Return (directories, file paths) of a reproducible synthetic tree below root.
+
+    Directories form a tree depth levels deep with fanout children each, named
+    like JDownloader post folders; files are spread over all of them at random.
+    """
+    rng = random.Random(seed)
+    make_name = NAME_GENERATORS[names]
+    dirs = [root]
+    level = [root]
+    for d in range(depth):
+        next_level = []
+        for parent in level:
+            for i in range(fanout):
+                next_level.append(os.path.join(parent, f"post_{rng.randint(1, 99999)}_{d}{i}"))
+        dirs.extend(next_level)
+        level = next_level
+    paths = [os.path.join(rng.choice(dirs), make_name(rng, i)) for i in range(files)]
+    return dirs, paths
+
+def generate_tree(root, files, depth=3, fanout=8, names="media", seed=0):
+    """Create the synthetic_paths() tree as empty files and return the file count."""
+    dirs, paths = synthetic_paths(root, files, depth, fanout, names, seed)
+    for directory in dirs:
+        os.makedirs(directory, exist_ok=True)
+    for path in paths:
+        with open(path, 'ab'):
+            pass
+    return files
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if platform.system() == "Darwin" else peak * 1024
+
+def drop_page_cache():
+    """Ask Linux to drop the page/dentry caches; needs root. Returns True on success."""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+def timed(func, repeats=1):
+    """Run func repeats times; return (median seconds, min seconds, last result)."""
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), min(times), result
+
+def count_walk(root):
+    return sum(len(files) for _, _, files in os.walk(root))
+
+def build_index(root):
+    index = FileIndex()
+    for path, size, mtime, inode in walk_entries(root):
+        index.add(path, size, mtime, inode)
+    return index
+
+def run_core(config):
+    """Run the core suite for one tree size and return its results."""
+    work_dir = tempfile.mkdtemp(prefix="filesearch-bench-")
+    root = os.path.join(work_dir, "tree")
+    index_file = os.path.join(work_dir, "file_index.json")
+    repeats = config["repeats"]
+    results = {"files": config["files"]}
+    try:
+        start = time.perf_counter()
+        generate_tree(root, config["files"], config["depth"], config["fanout"], config["names"], config["seed"])
+        results["generate_s"] = time.perf_counter() - start
+
+        results["cold_cache_dropped"] = drop_page_cache()
+        results["walk_cold_s"], _, _ = timed(lambda: count_walk(root))
+        results["walk_warm_s"], results["walk_warm_min_s"], _ = timed(lambda: count_walk(root), repeats)
+
+        results["index_build_s"], _, index = timed(lambda: build_index(root), repeats)
+        results["index_entries"] = len(index)
+        results["rss_after_index_bytes"] = peak_rss_bytes()
+
+        results["index_save_s"], _, _ = timed(lambda: save_index_file(index_file, root, index), repeats)
+        results["index_file_bytes"] = os.path.getsize(index_file)
+        results["index_load_s"], _, (_, index) = timed(lambda: load_index_file(index_file), repeats)
+
+        queries = {}
+        total = 0.0
+        for query in QUERY_MIX:
+            median, _, found = timed(lambda: search_files(root, query, index), repeats)
+            queries[query] = {"median_s": median, "results": len(found)}
+            total += median
+        results["queries"] = queries
+        results["query_mix_s"] = total
+        results["peak_rss_bytes"] = peak_rss_bytes()
+    finally:
+        if config["keep"]:
+            print(f"Kept benchmark tree in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers, or None if it is empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def run_gui(config):
+    """Inject synthetic results into an offscreen FileSearchWindow and time the UI.
+
+    Measures how long on_search_complete blocks, time until the results list
+    first paints and until every row's fade-in animation has finished,
+    event-loop stalls seen by a 1 ms heartbeat timer and the window's
+    paintEvent (snow) frame times.
+    """
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    work_dir = tempfile.mkdtemp(prefix="filesearch-guibench-")
+    os.chdir(work_dir)  # FileSearchWindow reads/writes file_index.json in the working directory
+
+    from PyQt6.QtCore import QEvent, QEventLoop, QObject, QTimer
+    from PyQt6.QtWidgets import QApplication
+    from gui import FileSearchWindow, RESULTS_PAGE_SIZE
+
+    app = QApplication.instance() or QApplication([])
+    stall_threshold = config["stall_ms"] / 1000.0
+    state = {"phase": "idle", "inject_start": None, "first_row": None}
+    frames = {"idle": [], "inject": []}
+    gaps = []
+
+    class BenchWindow(FileSearchWindow):
+        def paintEvent(self, event):
+            start = time.perf_counter()
+            super().paintEvent(event)
+            frames[state["phase"]].append(time.perf_counter() - start)
+
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if (event.type() == QEvent.Type.Paint and state["inject_start"] is not None
+                    and state["first_row"] is None and window.results_list.count()):
+                state["first_row"] = time.perf_counter() - state["inject_start"]
+            return False
+
+    window = BenchWindow()
+    window.show()
+    paint_filter = FirstPaintFilter()
+    window.results_list.viewport().installEventFilter(paint_filter)
+
+    last_tick = [time.perf_counter()]
+    def heartbeat():
+        now = time.perf_counter()
+        if state["phase"] == "inject":
+            gaps.append(now - last_tick[0])
+        last_tick[0] = now
+    heartbeat_timer = QTimer()
+    heartbeat_timer.timeout.connect(heartbeat)
+    heartbeat_timer.start(1)
+
+    def run_loop_for(seconds, until=None):
+        # A nested QEventLoop per phase; quitting app.exec() would stop painting
+        deadline = time.perf_counter() + seconds
+        loop = QEventLoop()
+        loop_timer = QTimer()
+        def check():
+            if time.perf_counter() >= deadline or (until and until()):
+                loop.quit()
+        loop_timer.timeout.connect(check)
+        loop_timer.start(10)
+        loop.exec()
+        loop_timer.stop()
+
+    run_loop_for(config["idle"])
+
+    rows = [os.path.join(work_dir, f"post_{i // 50}", media_name(random.Random(i), i)) for i in range(config["rows"])]
+    state["phase"] = "inject"
+    last_tick[0] = time.perf_counter()
+    state["inject_start"] = time.perf_counter()
+    window.on_search_complete(rows)
+    inject_call = time.perf_counter() - state["inject_start"]
+
+    def all_rows_done():
+        # Only the first page of results is turned into rows
+        return window.results_list.count() == min(len(rows), RESULTS_PAGE_SIZE) and not window.results_list.animations
+    run_loop_for(config["timeout"], all_rows_done)
+    all_rows = time.perf_counter() - state["inject_start"] if all_rows_done() else None
+    heartbeat_timer.stop()
+
+    stalls = [gap for gap in gaps if gap > stall_threshold]
+    idle, inject = frames["idle"], frames["inject"]
+    results = {
+        "rows": config["rows"],
+        "inject_call_s": inject_call,
+        "time_to_first_row_s": state["first_row"],
+        "time_to_all_rows_s": all_rows,
+        "timed_out": all_rows is None,
+        "stalls": len(stalls),
+        "stall_total_s": sum(stalls),
+        "stall_max_s": max(gaps) if gaps else None,
+        "frame_idle_median_s": statistics.median(idle) if idle else None,
+        "frame_idle_p95_s": percentile(idle, 0.95),
+        "frame_inject_median_s": statistics.median(inject) if inject else None,
+        "frame_inject_p95_s": percentile(inject, 0.95),
+        "frame_inject_max_s": max(inject) if inject else None,
+        "fps_idle": len(idle) / config["idle"] if config["idle"] else None,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+    window.close()
+    os.chdir(tempfile.gettempdir())
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def generate_queries(paths, count, seed=0):
+    """A reproducible query log drawn from the paths being searched.
+
+    Mostly substrings of real names, plus extensions, common words, names with
+    spaces/brackets/capitals that only match after normalization, misses and
+    the empty query.
+    """
+    rng = random.Random(seed)
+    queries = [""]
+    while len(queries) < count:
+        kind = rng.random()
+        if kind < 0.4 and paths:
+            name = os.path.basename(rng.choice(paths))
+            start = rng.randrange(len(name))
+            queries.append(name[start:start + rng.randint(2, 8)])
+        elif kind < 0.6:
+            queries.append(rng.choice(MEDIA_EXTENSIONS))
+        elif kind < 0.8:
+            queries.append(rng.choice(WORDS + MEDIA_PREFIXES + MEDIA_SUFFIXES[3:]))
+        elif kind < 0.9:
+            queries.append("".join(rng.choice("qxzjkw") for _ in range(rng.randint(4, 10))))
+        elif paths:
+            name = os.path.splitext(os.path.basename(rng.choice(paths)))[0]
+            queries.append(name.upper().replace("_", " ")[:rng.randint(3, 12)])
+    return queries
+
+def run_matchers(config):
+    """Replay a query log against every matcher backend and check it against the reference."""
+    if config["index"]:
+        _, index = load_index_file(config["index"])
+        paths = list(index)
+    else:
+        _, paths = synthetic_paths("/bench", config["files"], config["depth"], config["fanout"],
+                                   config["names"], config["seed"])
+    if config["queries"]:
+        with open(config["queries"], 'r', encoding='utf-8') as f:
+            queries = [line.rstrip("\n") for line in f]
+    else:
+        queries = generate_queries(paths, config["query_count"], config["seed"])
+
+    # The reference runs first, is timed like the others and its results become the oracle
+    wanted = ["linear"] + [name for name in config["backends"] or MATCHERS if name != "linear"]
+    expected = None
+
+    results = {"files": len(paths), "queries": len(queries), "backends": {}}
+    for name in wanted:
+        start = time.perf_counter()
+        matcher = MATCHERS[name](paths)
+        build = time.perf_counter() - start
+        latencies = []
+        mismatched_sets = []
+        mismatched_order = 0
+        answers = []
+        for query in queries:
+            start = time.perf_counter()
+            answers.append(matcher.search(query))
+            latencies.append(time.perf_counter() - start)
+        if expected is None:
+            expected = answers
+        for query, found, reference_result in zip(queries, answers, expected):
+            if found != reference_result:
+                if set(found) != set(reference_result):
+                    mismatched_sets.append(query)
+                else:
+                    mismatched_order += 1
+        total = sum(latencies)
+        results["backends"][name] = {
+            "build_s": build,
+            "p50_s": percentile(latencies, 0.50),
+            "p95_s": percentile(latencies, 0.95),
+            "p99_s": percentile(latencies, 0.99),
+            "max_s": max(latencies) if latencies else None,
+            "total_s": total,
+            "queries_per_s": len(queries) / total if total else None,
+            "correct": not mismatched_sets,
+            "set_mismatches": len(mismatched_sets),
+            "order_mismatches": mismatched_order,
+            "mismatch_examples": mismatched_sets[:10],
+        }
+    results["peak_rss_bytes"] = peak_rss_bytes()
+    return results
+
+def startup_command(profile):
+    """Command line that starts the window for a startup profile, or None if it isn't built."""
+    if profile == "source":
+        return [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "file_search.py"), "gui"]
+    from build import executable_path
+    path = os.path.abspath(executable_path(profile))
+    return [path] if os.path.exists(path) else None
+
+def run_startup(config):
+    """Launch the window repeatedly and time first paint and index readiness.
+
+    Times are wall clock from process creation, so onefile unpacking and
+    interpreter start-up are included. The app reports each milestone on
+    stdout when FILESEARCH_STARTUP_PROBE is set and quits once it has both.
+    """
+    command = startup_command(config["profile"])
+    results = {"profile": config["profile"], "files": config["files"]}
+    if command is None:
+        print(f"{config['profile']}: not built, run build.py --profile {config['profile']} first")
+        results["skipped"] = True
+        return results
+
+    work_dir = tempfile.mkdtemp(prefix="filesearch-startbench-")
+    try:
+        index = FileIndex()
+        _, paths = synthetic_paths(os.path.join(work_dir, "tree"), config["files"], seed=config["seed"])
+        for i, path in enumerate(paths):
+            index.add(path, i, 1700000000.0 + i, i + 1)
+        save_index_file(os.path.join(work_dir, "file_index.json"), os.path.join(work_dir, "tree"), index)
+        results["index_file_bytes"] = os.path.getsize(os.path.join(work_dir, "file_index.json"))
+
+        env = dict(os.environ, FILESEARCH_STARTUP_PROBE="1")
+        if config["platform"]:
+            env["QT_QPA_PLATFORM"] = config["platform"]
+        first_paint, index_ready = [], []
+        for _ in range(config["repeats"]):
+            start = time.time()
+            process = subprocess.Popen(command, cwd=work_dir, env=env, stdout=subprocess.PIPE,
+                                       stderr=subprocess.DEVNULL, text=True)
+            try:
+                output, _ = process.communicate(timeout=config["timeout"])
+            except subprocess.TimeoutExpired:
+                process.kill()
+                output, _ = process.communicate()
+            marks = {}
+            for line in output.splitlines():
+                parts = line.split()
+                if len(parts) == 2 and parts[0] in ("first_paint", "index_ready"):
+                    marks[parts[0]] = float(parts[1]) - start
+            if "first_paint" in marks:
+                first_paint.append(marks["first_paint"])
+            if "index_ready" in marks:
+                index_ready.append(marks["index_ready"])
+        results.update({
+            "runs": config["repeats"],
+            "first_paint_s": statistics.median(first_paint) if first_paint else None,
+            "first_paint_min_s": min(first_paint) if first_paint else None,
+            "index_ready_s": statistics.median(index_ready) if index_ready else None,
+            "index_ready_min_s": min(index_ready) if index_ready else None,
+            "failed_runs": config["repeats"] - len(first_paint),
+        })
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def run_isolated(func, config):
+    """Run func(config) in a fresh process so peak RSS isn't shared between runs."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(func, config).result()
+
+def run_metadata():
+    """Describe the machine and checkout a result file came from."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+def write_results(path, suite, config, runs):
+    data = {"suite": suite, "meta": run_metadata(), "config": config, "runs": runs}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    print(f"Results written to {path}")
+
+def flatten(data, prefix=""):
+    """Flatten nested result dicts into {"a.b.c": number}."""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def compare(old_path, new_path):
+    """Print the relative change of every numeric metric between two result files."""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    def run_key(run, i):
+        return str(run.get("profile", run.get("files", run.get("rows", i))))
+    old_runs = {run_key(run, i): run for i, run in enumerate(old["runs"])}
+    for i, run in enumerate(new["runs"]):
+        key = run_key(run, i)
+        if key not in old_runs:
+            continue
+        print(f"== {key} ==")
+        old_flat = flatten(old_runs[key])
+        for name, value in flatten(run).items():
+            before = old_flat.get(name)
+            if before is None:
+                continue
+            change = f"{(value - before) * 100 / before:+.1f}%" if before else "n/a"
+            print(f"  {name:40} {before:>14.6g} -> {value:>14.6g}  {change}")
+
+def print_core(results):
+    print(f"{results['files']} files: walk cold {results['walk_cold_s']:.3f}s warm {results['walk_warm_s']:.3f}s, "
+          f"index {results['index_build_s']:.3f}s, save {results['index_save_s']:.3f}s "
+          f"({results['index_file_bytes'] / 1e6:.1f} MB), load {results['index_load_s']:.3f}s, "
+          f"queries {results['query_mix_s']:.3f}s, peak RSS {(results['peak_rss_bytes'] or 0) / 1e6:.0f} MB")
+
+def print_gui(results):
+    def ms(value):
+        return "n/a" if value is None else f"{value * 1000:.1f}ms"
+    print(f"{results['rows']} rows: on_search_complete {ms(results['inject_call_s'])}, "
+          f"first row {ms(results['time_to_first_row_s'])}, all rows {ms(results['time_to_all_rows_s'])}, "
+          f"{results['stalls']} stalls (max {ms(results['stall_max_s'])}), "
+          f"frame idle {ms(results['frame_idle_median_s'])} / during {ms(results['frame_inject_median_s'])}")
+
+def print_matchers(results):
+    print(f"{results['files']} files, {results['queries']} queries:")
+    reference = results["backends"].get("linear", {}).get("total_s")
+    for name, stats in results["backends"].items():
+        speedup = f"{reference / stats['total_s']:.1f}x" if reference and stats["total_s"] else "n/a"
+        status = "ok" if stats["correct"] else f"WRONG on {stats['set_mismatches']} queries"
+        if stats["order_mismatches"]:
+            status += f", order differs on {stats['order_mismatches']}"
+        print(f"  {name:12} p50 {stats['p50_s'] * 1000:8.3f}ms  p95 {stats['p95_s'] * 1000:8.3f}ms  "
+              f"p99 {stats['p99_s'] * 1000:8.3f}ms  {stats['queries_per_s']:10.1f} q/s  "
+              f"build {stats['build_s']:.3f}s  {speedup:>7}  {status}")
+
+def print_startup(results):
+    if results.get("skipped"):
+        return
+    def ms(value):
+        return "n/a" if value is None else f"{value * 1000:.0f}ms"
+    print(f"{results['profile']:8} first paint {ms(results['first_paint_s'])} (min {ms(results['first_paint_min_s'])}), "
+          f"index ready {ms(results['index_ready_s'])} (min {ms(results['index_ready_min_s'])}) "
+          f"with {results['files']} indexed files, {results['failed_runs']} failed runs")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="File Search benchmarks")
+    sub = parser.add_subparsers(dest="suite", required=True)
+
+    core = sub.add_parser("core", help="walk, index build, index save/load and search")
+    core.add_argument("--files", type=int, nargs="+", default=[10000, 100000])
+    core.add_argument("--depth", type=int, default=3)
+    core.add_argument("--fanout", type=int, default=8)
+    core.add_argument("--names", choices=sorted(NAME_GENERATORS), default="media")
+    core.add_argument("--seed", type=int, default=0)
+    core.add_argument("--repeats", type=int, default=3)
+    core.add_argument("--keep", action="store_true", help="keep the generated trees")
+    core.add_argument("--output", default=DEFAULT_OUTPUT)
+
+    gui = sub.add_parser("gui", help="offscreen result insertion and frame times")
+    gui.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    gui.add_argument("--idle", type=float, default=2.0, help="seconds of idle frames to record first")
+    gui.add_argument("--timeout", type=float, default=60.0, help="give up waiting for rows after this many seconds")
+    gui.add_argument("--stall-ms", type=float, default=50.0, help="heartbeat gaps longer than this count as stalls")
+    gui.add_argument("--output", default=DEFAULT_OUTPUT)
+
+    matchers = sub.add_parser("matchers", help="compare matcher backends against the reference search")
+    matchers.add_argument("--files", type=int, nargs="+", default=[100000])
+    matchers.add_argument("--index", help="use the paths of an existing index file instead of synthetic ones")
+    matchers.add_argument("--queries", help="query log, one query per line (generated if omitted)")
+    matchers.add_argument("--query-count", type=int, default=500)
+    matchers.add_argument("--backends", nargs="+", choices=sorted(MATCHERS))
+    matchers.add_argument("--depth", type=int, default=3)
+    matchers.add_argument("--fanout", type=int, default=8)
+    matchers.add_argument("--names", choices=sorted(NAME_GENERATORS), default="media")
+    matchers.add_argument("--seed", type=int, default=0)
+    matchers.add_argument("--output", default=DEFAULT_OUTPUT)
+
+    startup = sub.add_parser("startup", help="time to first paint and to a loaded index")
+    startup.add_argument("--profiles", nargs="+", default=["source"],
+                         help="'source' and/or build.py profiles already built into dist/")
+    startup.add_argument("--files", type=int, default=100000, help="entries in the index loaded at start-up")
+    startup.add_argument("--repeats", type=int, default=5)
+    startup.add_argument("--seed", type=int, default=0)
+    startup.add_argument("--platform", help="QT_QPA_PLATFORM for the launched app (e.g. offscreen)")
+    startup.add_argument("--timeout", type=float, default=60.0, help="kill a launch after this many seconds")
+    startup.add_argument("--output", default=DEFAULT_OUTPUT)
+
+    cmp_parser = sub.add_parser("compare", help="compare two result files")
+    cmp_parser.add_argument("old")
+    cmp_parser.add_argument("new")
+
+    args = parser.parse_args(argv)
+    if args.suite == "compare":
+        compare(args.old, args.new)
+        return
+
+    if args.suite == "gui":
+        func, report, sizes_key, size_key = run_gui, print_gui, "rows", "rows"
+    elif args.suite == "startup":
+        func, report, sizes_key, size_key = run_startup, print_startup, "profiles", "profile"
+    elif args.suite == "matchers":
+        func, report, sizes_key, size_key = run_matchers, print_matchers, "files", "files"
+    else:
+        func, report, sizes_key, size_key = run_core, print_core, "files", "files"
+    config = {key: value for key, value in vars(args).items() if key not in ("suite", "output", sizes_key)}
+    runs = []
+    for size in getattr(args, sizes_key):
+        results = run_isolated(func, dict(config, **{size_key: size}))
+        report(results)
+        runs.append(results)
+    write_results(args.output, args.suite, dict(config, **{sizes_key: getattr(args, sizes_key)}), runs)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import argparse
 import platform
 import subprocess
 import shutil
@@ -14,6 +15,27 @@ ICON_MAC = "1.icns"      # Using .icns for Mac
 ICON_LINUX = "1.png"     # Using .png for Linux
 OUTPUT_DIR = "dist"
 
+# Build profiles:
+#   onefile  a single self-extracting executable (unpacks all of Qt to a temp dir on every start)
+#   fast     an unpacked onedir bundle with optimised bytecode and only the Qt parts the app uses
+PROFILES = ["onefile", "fast"]
+FAST_OUTPUT_DIR = os.path.join(OUTPUT_DIR, "fast")
+
+# Qt modules the app imports; everything else in PyQt6 is left out of the fast build
+QT_MODULES_USED = ["QtCore", "QtGui", "QtWidgets"]
+QT_MODULES_EXCLUDED = [
+    "QtNetwork", "QtPrintSupport", "QtSvg", "QtSvgWidgets", "QtXml", "QtQml", "QtQuick", "QtQuickWidgets",
+    "QtOpenGL", "QtOpenGLWidgets", "QtDBus", "QtMultimedia", "QtMultimediaWidgets", "QtPdf", "QtPdfWidgets",
+    "QtSql", "QtTest", "QtDesigner", "QtHelp", "QtBluetooth", "QtPositioning", "QtSensors", "QtSerialPort",
+    "QtWebChannel", "QtWebSockets", "QtRemoteObjects", "QtNfc", "QtSpatialAudio", "QtTextToSpeech",
+    "Qt3DCore", "QtCharts", "QtDataVisualization",
+]
+# Qt plugin directories the window needs (platform backends, desktop integration, styles,
+# and image formats for the preview pane's thumbnails)
+QT_PLUGINS_USED = ["platforms", "platformthemes", "platforminputcontexts", "styles", "imageformats",
+                   "xcbglintegrations", "wayland-shell-integration", "wayland-decoration-client",
+                   "wayland-graphics-integration-client"]
+
 def get_pyqt_paths():
     """Get all PyQt6 related paths that need to be included."""
     pyqt_path = os.path.dirname(PyQt6.__file__)
@@ -34,11 +56,29 @@ def get_pyqt_paths():
     
     return paths
 
-def clean_previous_builds():
-    """Remove previous build and dist directories."""
-    for dir_name in ["build", "dist"]:
-        if os.path.exists(dir_name):
-            shutil.rmtree(dir_name)
+def executable_path(profile):
+    """Path of the executable a profile builds."""
+    system = platform.system().lower()
+    exe = APP_NAME + ".exe" if system == "windows" else APP_NAME
+    if profile == "onefile":
+        return os.path.join(OUTPUT_DIR, exe)
+    if system == "darwin":
+        return os.path.join(FAST_OUTPUT_DIR, APP_NAME + ".app", "Contents", "MacOS", APP_NAME)
+    return os.path.join(FAST_OUTPUT_DIR, APP_NAME, exe)
+
+def clean_previous_builds(profile):
+    """Remove the build directory and this profile's previous output."""
+    if os.path.exists("build"):
+        shutil.rmtree("build")
+    if profile == "onefile":
+        outputs = [os.path.join(OUTPUT_DIR, name) for name in (APP_NAME, APP_NAME + ".exe", APP_NAME + ".app")]
+    else:
+        outputs = [FAST_OUTPUT_DIR]
+    for path in outputs:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
     # Remove spec files from previous builds
     for file in os.listdir():
         if file.endswith(".spec"):
@@ -55,8 +95,62 @@ def get_platform_icon():
         return ICON_LINUX
     return None
 
-def build_for_platform():
+def build_fast_profile():
+    """Build the fast-starting onedir bundle and trim unused Qt plugins from it."""
+    system = platform.system().lower()
+    cmd = [
+        "pyinstaller",
+        "--name", APP_NAME,
+        "--windowed",
+        "--onedir",      # Nothing to unpack at start-up
+        "--optimize", "1",  # Bytecode compiled at build time with -O
+        "--noupx",       # Compressed libraries would be decompressed on every start
+        "--clean",
+        "--noconfirm",
+        "--distpath", FAST_OUTPUT_DIR,
+    ]
+    # PyInstaller's own PyQt6 hooks collect the modules below with their libraries and plugins
+    for module in QT_MODULES_USED:
+        cmd.extend(["--hidden-import", f"PyQt6.{module}"])
+    for module in QT_MODULES_EXCLUDED:
+        cmd.extend(["--exclude-module", f"PyQt6.{module}"])
+    cmd.extend(["--exclude-module", "tkinter"])
+
+    icon_file = get_platform_icon()
+    if icon_file and system in ("windows", "darwin"):
+        cmd.extend(["--icon", icon_file])
+    if system == "windows":
+        cmd.append("--uac-admin")
+    elif system == "darwin":
+        cmd.extend(["--osx-bundle-identifier", "com.filesearch.app"])
+    cmd.append(MAIN_FILE)
+
+    print(f"Building fast profile for {system}...")
+    try:
+        subprocess.run(cmd, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Build failed: {e}")
+        return False
+    prune_qt_plugins(FAST_OUTPUT_DIR)
+    print(f"Build completed successfully! Executable is in {FAST_OUTPUT_DIR}")
+    return True
+
+def prune_qt_plugins(bundle_dir):
+    """Delete Qt plugin directories the app never loads from a onedir bundle."""
+    removed = 0
+    for root, dirs, _ in os.walk(bundle_dir):
+        if os.path.basename(root) == "plugins" and os.path.basename(os.path.dirname(root)) in ("Qt6", "PlugIns"):
+            for name in list(dirs):
+                if name not in QT_PLUGINS_USED:
+                    shutil.rmtree(os.path.join(root, name))
+                    dirs.remove(name)
+                    removed += 1
+    print(f"Removed {removed} unused Qt plugin directories")
+
+def build_for_platform(profile="onefile"):
     """Build the application for the current platform."""
+    if profile == "fast":
+        return build_fast_profile()
     system = platform.system().lower()
     
     # Get PyQt6 paths
@@ -195,24 +289,31 @@ def verify_dependencies():
     print("Dependencies installed/upgraded successfully.")
 
 def main():
+    parser = argparse.ArgumentParser(description=f"Build {APP_NAME} with PyInstaller")
+    parser.add_argument("--profile", choices=PROFILES, default="onefile",
+                        help="onefile (single executable) or fast (onedir bundle that starts quicker)")
+    parser.add_argument("--skip-deps", action="store_true", help="don't install/upgrade the build dependencies")
+    args = parser.parse_args()
+
     # Verify dependencies
-    verify_dependencies()
+    if not args.skip_deps:
+        verify_dependencies()
     
     # Verify main file exists
     if not os.path.exists(MAIN_FILE):
         print(f"Error: {MAIN_FILE} not found!")
         return
     
-    # Create Linux hook if needed
-    if platform.system().lower() == "linux":
+    # Create Linux hook if needed (the fast profile relies on PyInstaller's Qt hooks instead)
+    if platform.system().lower() == "linux" and args.profile == "onefile":
         create_linux_hook()
     
     # Clean previous builds
     print("Cleaning previous builds...")
-    clean_previous_builds()
+    clean_previous_builds(args.profile)
     
     # Build for current platform
-    if build_for_platform():
+    if build_for_platform(args.profile):
         # Clean up unnecessary files
         if os.path.exists("build"):
             shutil.rmtree("build")
@@ -223,23 +324,24 @@ def main():
             os.remove("linux_hook.py")
         
         print("\nBuild process completed!")
-        print(f"Executable location: {os.path.abspath(os.path.join(OUTPUT_DIR, APP_NAME))}")
+        print(f"Executable location: {os.path.abspath(executable_path(args.profile))}")
         
         # Print platform-specific instructions
         system = platform.system().lower()
+        folder = OUTPUT_DIR if args.profile == "onefile" else FAST_OUTPUT_DIR
         if system == "windows":
             print("\nTo run the application:")
-            print("1. Navigate to the dist folder")
+            print(f"1. Navigate to the {folder} folder")
             print("2. Double-click FileSearch.exe")
             print("Note: The application may request administrator privileges.")
         elif system == "linux":
             print("\nTo run the application:")
-            print("1. Open terminal in the dist folder")
+            print(f"1. Open terminal in the {os.path.dirname(executable_path(args.profile))} folder")
             print("2. Run: chmod +x FileSearch")
             print("3. Run: ./FileSearch")
         elif system == "darwin":
             print("\nTo run the application:")
-            print("1. Navigate to the dist folder")
+            print(f"1. Navigate to the {folder} folder")
             print("2. Double-click FileSearch.app")
     else:
         print("\nBuild process failed!")
@@ -0,0 +1,123 @@
+import os
+import re
+import mmap
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+MMAP_THRESHOLD = 1024 * 1024  # Files bigger than this are mapped instead of read
+SNIFF_BYTES = 8192  # A NUL byte in this many leading bytes marks a file as binary
+MAX_FILE_SIZE = 512 * 1024 * 1024  # Skip anything bigger unless the caller says otherwise
+MAX_PREVIEWS = 5  # Matching lines reported per file
+PREVIEW_CHARS = 160
+CHUNK_FILES = 64  # Files handed to a worker process at a time
+
+def parse_extensions(text):
+    """Turn "txt, .log md" into {'.txt', '.log', '.md'}; empty text means no filter."""
+    extensions = set()
+    for part in re.split(r'[\s,;]+', text.strip()):
+        if part:
+            extensions.add('.' + part.lstrip('.').lower())
+    return extensions or None
+
+def select_candidates(sized_paths, extensions=None, max_size=MAX_FILE_SIZE):
+    """Narrow (path, size) pairs from FileIndex.sized_paths() to the files worth opening, using only index data."""
+    candidates = []
+    for path, size in sized_paths:
+        if extensions and os.path.splitext(path)[1].lower() not in extensions:
+            continue
+        if size == 0 or (max_size and size > max_size):
+            continue
+        candidates.append(path)
+    return candidates
+
+def compile_pattern(pattern, regex=False, ignore_case=True):
+    """Compile a literal or regex query for matching raw file bytes."""
+    source = pattern.encode('utf-8', 'surrogateescape')
+    flags = re.IGNORECASE if ignore_case else 0
+    if regex:
+        flags |= re.MULTILINE  # ^ and $ anchor to lines, like grep
+    else:
+        source = re.escape(source)
+    return re.compile(source, flags)
+
+def _preview(data, start, end):
+    """The matching line, clipped to a window around the match for long lines."""
+    line_start = max(data.rfind(b'\n', 0, start) + 1, start - PREVIEW_CHARS // 2)
+    line_end = data.find(b'\n', end, line_start + PREVIEW_CHARS * 4)
+    if line_end == -1:
+        line_end = min(len(data), line_start + PREVIEW_CHARS * 4)
+    text = bytes(data[line_start:line_end]).decode('utf-8', 'replace').strip()
+    return text[:PREVIEW_CHARS]
+
+def _scan(data, compiled):
+    """Return up to MAX_PREVIEWS (line number, byte offset, preview) matches."""
+    matches = []
+    line = 1
+    counted_to = 0
+    for match in compiled.finditer(data):
+        start = match.start()
+        line += bytes(data[counted_to:start]).count(b'\n')
+        counted_to = start
+        matches.append((line, start, _preview(data, start, match.end())))
+        if len(matches) >= MAX_PREVIEWS:
+            break
+    return matches
+
+def search_file(path, compiled):
+    """Search one file; binary and unreadable files give no matches."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(SNIFF_BYTES)
+            if b'\0' in head:
+                return []
+            if len(head) < SNIFF_BYTES:
+                return _scan(head, compiled)
+            size = os.fstat(f.fileno()).st_size
+            if size <= MMAP_THRESHOLD:
+                return _scan(head + f.read(), compiled)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return _scan(mapped, compiled)
+    except (OSError, ValueError):
+        return []
+
+def _search_chunk(paths, pattern, flags):
+    compiled = re.compile(pattern, flags)
+    results = []
+    for path in paths:
+        matches = search_file(path, compiled)
+        if matches:
+            results.append((path, matches))
+    return results
+
+def content_search(paths, pattern, regex=False, ignore_case=True, workers=None, cancel=None):
+    """Yield (path, matches) for every file whose contents match pattern.
+
+    Files are spread over a process pool in chunks and results are yielded as
+    each chunk finishes, so callers can show them while the search runs.
+    matches is a list of (line number, byte offset, preview line).
+    """
+    compiled = compile_pattern(pattern, regex, ignore_case)
+    paths = list(paths)
+    if not paths:
+        return
+    chunks = [paths[i:i + CHUNK_FILES] for i in range(0, len(paths), CHUNK_FILES)]
+    workers = workers or os.cpu_count() or 2
+    if workers == 1 or len(chunks) == 1:
+        for chunk in chunks:
+            if cancel and cancel():
+                return
+            yield from _search_chunk(chunk, compiled.pattern, compiled.flags)
+        return
+
+    # spawn rather than fork: the GUI calls this from a thread of a Qt process
+    context = multiprocessing.get_context("spawn")
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context)
+    try:
+        futures = [executor.submit(_search_chunk, chunk, compiled.pattern, compiled.flags)
+                   for chunk in chunks]
+        for future in as_completed(futures):
+            if cancel and cancel():
+                return
+            yield from future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,155 @@
+"""Per-directory disk usage computed from a FileIndex, without touching the disk.
+
+Sizes and file counts come from the index's metadata. Files are summed
+into their own directory, then directories into their parents in one pass
+from the deepest level up. Afterwards the totals follow the index's add,
+remove and rename notifications, so each change only updates the
+directories above one file.
+"""
+import os
+
+import tracing
+
+class DiskUsage:
+    """Cumulative size and file count of every directory in one FileIndex, registered as one of its watchers."""
+    def __init__(self, index=None, root=None):
+        self.index = None
+        self.root = None
+        self.totals = None  # directory -> [bytes, files] including subdirectories; None until computed
+        self.subdirs = {}  # directory -> set of child directories holding files
+        if index is not None:
+            self.attach(index, root)
+
+    def attach(self, index, root=None):
+        """Follow index; the totals are computed the first time they are needed."""
+        if self.index is not None and self in self.index.watchers:
+            self.index.watchers.remove(self)
+        self.index = index
+        self.root = os.path.normpath(root) if root else None
+        self.totals = None
+        self.subdirs = {}
+        index.watchers.append(self)
+
+    def compute(self):
+        """Sum the whole index: files into their directories, then each level into the one above.
+
+        Can run off the thread that changes the index, but changes made while
+        it runs are missed; compare index.version before and after.
+        """
+        with tracing.span("disk_usage", entries=len(self.index)):
+            by_prefix = {}  # Text before the last separator -> [bytes, files, a path]
+            sizes = self.index.sizes
+            sep = os.sep
+            for slot, path in self.index.slot_items():
+                size = sizes[slot]
+                prefix = path.rpartition(sep)[0]  # Much cheaper than os.path.dirname per file
+                entry = by_prefix.get(prefix)
+                if entry is None:
+                    by_prefix[prefix] = [max(size, 0), 1, path]
+                else:
+                    entry[0] += max(size, 0)
+                    entry[1] += 1
+            totals = {}
+            for size, count, path in by_prefix.values():
+                entry = totals.setdefault(os.path.dirname(path), [0, 0])  # Once per directory
+                entry[0] += size
+                entry[1] += count
+            levels = {}
+            for directory in totals:
+                levels.setdefault(directory.count(os.sep), []).append(directory)
+            subdirs = {}
+            for depth in range(max(levels, default=0), -1, -1):
+                for directory in levels.pop(depth, ()):
+                    parent = self.parent(directory)
+                    if parent is None:
+                        continue
+                    entry = totals[directory]
+                    parent_entry = totals.get(parent)
+                    if parent_entry is None:
+                        parent_entry = totals[parent] = [0, 0]
+                        levels.setdefault(depth - 1, []).append(parent)  # Parents only holding folders
+                    parent_entry[0] += entry[0]
+                    parent_entry[1] += entry[1]
+                    subdirs.setdefault(parent, set()).add(directory)
+            self.totals = totals
+            self.subdirs = subdirs
+
+    def ensure(self):
+        if self.totals is None:
+            self.compute()
+
+    def parent(self, directory):
+        """The directory totals are added into, or None at the root."""
+        if directory == self.root:
+            return None
+        parent = os.path.dirname(directory)
+        return None if parent == directory else parent
+
+    def top(self):
+        """The directory to start browsing from: the root, or where the index's directories meet."""
+        self.ensure()
+        if self.root is not None and self.root in self.totals:
+            return self.root
+        tops = [directory for directory in self.totals if self.parent(directory) is None]
+        return tops[0] if len(tops) == 1 else (os.path.commonpath(tops) if tops else None)
+
+    def usage(self, directory):
+        """(bytes, files) under directory, counting subdirectories."""
+        self.ensure()
+        entry = self.totals.get(directory)
+        return (entry[0], entry[1]) if entry else (0, 0)
+
+    def children(self, directory):
+        """[(subdirectory, bytes, files)] of directory, biggest first."""
+        self.ensure()
+        rows = [(child, *self.totals[child]) for child in self.subdirs.get(directory, ())]
+        rows.sort(key=lambda row: (-row[1], row[0]))
+        return rows
+
+    def own_usage(self, directory):
+        """(bytes, files) of the files directly in directory."""
+        size, count = self.usage(directory)
+        for _, child_size, child_count in self.children(directory):
+            size -= child_size
+            count -= child_count
+        return size, count
+
+    def files(self, directory, recursive=True):
+        """Indexed paths below directory (only those directly in it unless recursive), in index order."""
+        prefix = directory.rstrip(os.sep) + os.sep
+        if recursive:
+            return [path for path in self.index if path.startswith(prefix)]
+        return [path for path in self.index if path.startswith(prefix) and os.sep not in path[len(prefix):]]
+
+    def _update(self, path, size, count):
+        directory = os.path.dirname(path)
+        child = None
+        while directory is not None:
+            entry = self.totals.get(directory)
+            if entry is None:
+                entry = self.totals[directory] = [0, 0]
+            entry[0] += size
+            entry[1] += count
+            if child is not None:
+                if child in self.totals:
+                    self.subdirs.setdefault(directory, set()).add(child)
+                else:
+                    self.subdirs.get(directory, set()).discard(child)
+            if not entry[1]:
+                del self.totals[directory]  # Its last file is gone
+                self.subdirs.pop(directory, None)
+            child = directory
+            directory = self.parent(directory)
+
+    def on_add(self, path, size):
+        if self.totals is not None:
+            self._update(path, max(size, 0), 1)
+
+    def on_remove(self, path, size):
+        if self.totals is not None:
+            self._update(path, -max(size, 0), -1)
+
+    def on_rename(self, old_path, new_path, size):
+        if self.totals is not None:
+            self._update(old_path, -max(size, 0), -1)
+            self._update(new_path, max(size, 0), 1)
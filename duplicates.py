@@ -0,0 +1,172 @@
+import os
+import json
+import mmap
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from file_index import UNKNOWN_SIZE
+
+PARTIAL_BLOCK = 64 * 1024  # Bytes hashed from each end of a file in the quick pass
+READ_BLOCK = 8 * 1024 * 1024  # Block size for full hashes when mmap isn't possible
+HASH_WORKERS = min(8, (os.cpu_count() or 2) * 2)  # hashlib releases the GIL on big buffers
+
+def _new_hash():
+    return hashlib.blake2b(digest_size=20)
+
+def partial_hash(path, size):
+    """Hash the first and last PARTIAL_BLOCK bytes of a file."""
+    digest = _new_hash()
+    with open(path, 'rb') as f:
+        digest.update(f.read(PARTIAL_BLOCK))
+        if size > 2 * PARTIAL_BLOCK:
+            f.seek(size - PARTIAL_BLOCK)
+            digest.update(f.read(PARTIAL_BLOCK))
+        elif size > PARTIAL_BLOCK:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def full_hash(path, cancel=None):
+    """Hash a whole file, through mmap when possible."""
+    digest = _new_hash()
+    with open(path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, len(mapped), READ_BLOCK):
+                        if cancel and cancel():
+                            return None
+                        digest.update(view[offset:offset + READ_BLOCK])
+                finally:
+                    view.release()
+                return digest.hexdigest()
+        except (ValueError, OSError):
+            pass  # Empty files and some filesystems can't be mapped
+        f.seek(0)
+        while True:
+            if cancel and cancel():
+                return None
+            block = f.read(READ_BLOCK)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+class HashCache:
+    """Partial and full hashes keyed by (inode, size, mtime), stored as JSON.
+
+    A file whose inode, size and mtime are unchanged since the last run is
+    not read again.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                print(f"Error loading hash cache: {str(e)}")
+                self.entries = {}
+
+    @staticmethod
+    def key(st):
+        return f"{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+
+    def get(self, key, kind):
+        entry = self.entries.get(key)
+        return entry.get(kind) if entry else None
+
+    def put(self, key, kind, value):
+        self.entries.setdefault(key, {})[kind] = value
+        self.dirty = True
+
+    def prune(self, stats):
+        """Forget hashes superseded by a newer size/mtime of the same inode."""
+        current = {st.st_ino: self.key(st) for st in stats}
+        stale = [key for key in self.entries
+                 if current.get(int(key.split(':', 1)[0]), key) != key]
+        for key in stale:
+            del self.entries[key]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            self.dirty = False
+        except Exception as e:
+            print(f"Error saving hash cache: {str(e)}")
+
+def find_duplicates(sized_paths, cache=None, progress=None, cancel=None, min_size=1):
+    """Return groups of identical files among (path, size) pairs, biggest waste first.
+
+    sized_paths comes from FileIndex.sized_paths(), a copy taken where the
+    index is updated, so the search can run on another thread. Candidates
+    are bucketed by the sizes stored in the index, then narrowed by
+    a head/tail hash, and only files still ambiguous after that are hashed in
+    full. progress(stage, done, total) is called as work completes and
+    cancel() is polled so a caller can stop the search early.
+    """
+    cache = cache if cache is not None else HashCache()
+
+    by_size = {}
+    for path, size in sized_paths:
+        if size == UNKNOWN_SIZE:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+        if size >= min_size:
+            by_size.setdefault(size, []).append(path)
+    candidates = [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+
+    stats = {}  # path -> os.stat_result, so every stage agrees on cache keys
+
+    def cached_hash(path, size, kind):
+        if cancel and cancel():
+            return path, None
+        try:
+            st = stats.get(path) or os.stat(path)
+            stats[path] = st
+            if st.st_size != size:
+                return path, None  # Changed since it was indexed, so it no longer belongs in this size group
+            key = HashCache.key(st)
+            value = cache.get(key, kind)
+            if value is None:
+                value = partial_hash(path, st.st_size) if kind == 'partial' else full_hash(path, cancel)
+                if value is not None:
+                    cache.put(key, kind, value)
+            return path, value
+        except OSError:
+            return path, None
+
+    def hash_groups(groups, kind):
+        """Split (size, paths) groups by hash, keeping groups of two or more."""
+        jobs = [(size, path) for size, paths in groups for path in paths]
+        by_hash = {}
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+            hashed = executor.map(lambda job: (job[0],) + cached_hash(job[1], job[0], kind), jobs)
+            for done, (size, path, value) in enumerate(hashed, 1):
+                if value is not None:
+                    by_hash.setdefault((size, value), []).append(path)
+                if progress and (done % 100 == 0 or done == len(jobs)):
+                    progress(kind, done, len(jobs))
+        if cancel and cancel():
+            return []
+        return [(size, paths) for (size, _), paths in by_hash.items() if len(paths) > 1]
+
+    groups = hash_groups(candidates, 'partial')
+    # Every file left was stat'd at its group's size, and files no bigger
+    # than the two partial blocks were hashed in full already
+    settled = [(size, paths) for size, paths in groups if size <= 2 * PARTIAL_BLOCK]
+    ambiguous = [(size, paths) for size, paths in groups if size > 2 * PARTIAL_BLOCK]
+    groups = settled + hash_groups(ambiguous, 'full')
+
+    if not (cancel and cancel()):
+        cache.prune(stats.values())
+    groups.sort(key=lambda group: group[0] * (len(group[1]) - 1), reverse=True)
+    return [paths for _, paths in groups]
@@ -0,0 +1,126 @@
+"""Writing result sets to files for other tools: NUL-separated paths, CSV or JSON lines.
+
+Rows are formatted a chunk at a time straight from the list of result
+paths and the index's metadata arrays, and each chunk is written before the
+next is built. Memory use stays the same however many results there are,
+and no per-row objects are kept. Rows are formatted directly rather than
+through json.dumps and csv.writer, which are several times slower per
+row; the output is the same.
+
+CSV and JSON lines rows carry the index's size and mtime (seconds since the
+epoch), plus width, height, duration and codec for files with media
+metadata. JSON lines objects have the same keys as "file_search.py search
+--json" and leave out what isn't known; CSV leaves those cells empty.
+"""
+import os
+import re
+import json
+from itertools import repeat
+
+from search_core import SearchCancelled
+
+EXPORT_FORMATS = {"nul": "NUL-separated paths", "csv": "CSV", "jsonl": "JSON lines"}
+EXPORT_EXTENSIONS = {"nul": ".txt", "csv": ".csv", "jsonl": ".jsonl"}
+EXPORT_CHUNK_ROWS = 8192  # Rows formatted and written at a time
+CSV_COLUMNS = ("path", "size", "mtime", "width", "height", "duration", "codec")
+_CSV_SPECIAL = re.compile(r'[",\r\n]')  # Characters that make the csv module quote a field
+
+# JSON string quoting that keeps non-ASCII as is, like json.dumps(ensure_ascii=False)
+_quote = json.encoder.c_encode_basestring or json.encoder.py_encode_basestring
+
+def export_format(filename):
+    """The format matching filename's extension; NUL-separated for anything else."""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    return "nul"
+
+def _rows(paths, index):
+    """[(path, size, mtime, media)] for paths; size is -1 and media None where the index doesn't know."""
+    if index is None:
+        return [(path, -1, 0.0, None) for path in paths]
+    sizes = index.sizes
+    mtimes = index.mtimes
+    count = len(sizes)
+    slots = [slot if slot is not None and slot < count else None  # Gone from the index since the search
+             for slot in map(index.slot_of.get, paths)]
+    media = map(index.media.get, paths) if index.media else repeat(None)
+    return [(path, sizes[slot], mtimes[slot], info) if slot is not None else (path, -1, 0.0, None)
+            for path, slot, info in zip(paths, slots, media)]
+
+def _csv_field(value):
+    value = str(value)
+    return '"' + value.replace('"', '""') + '"' if _CSV_SPECIAL.search(value) else value
+
+def _nul_chunk(paths, index, out):
+    out.write("\0".join(paths) + "\0")
+
+def _jsonl_chunk(paths, index, out):
+    lines = []
+    for path, size, mtime, info in _rows(paths, index):
+        line = '{"path": ' + _quote(path)
+        if size >= 0:
+            line += f', "size": {size}, "mtime": {mtime!r}'
+        if info is not None:
+            if info.width:
+                line += f', "width": {info.width}, "height": {info.height}'
+            if info.duration:
+                line += f', "duration": {info.duration!r}'
+            if info.codec:
+                line += ', "codec": ' + _quote(info.codec)
+        lines.append(line + "}\n")
+    out.write("".join(lines))
+
+def _csv_chunk(paths, index, out):
+    lines = []
+    for path, size, mtime, info in _rows(paths, index):
+        line = _csv_field(path) + (f",{size},{mtime!r}" if size >= 0 else ",,")
+        if info is not None:
+            line += (f",{info.width or ''},{info.height or ''},{info.duration or ''},"
+                     + (_csv_field(info.codec) if info.codec else ""))
+        else:
+            line += ",,,,"
+        lines.append(line + "\r\n")  # Line ends as written by the csv module
+    out.write("".join(lines))
+
+_WRITERS = {"nul": _nul_chunk, "csv": _csv_chunk, "jsonl": _jsonl_chunk}
+
+def export_results(paths, filename, fmt=None, index=None, progress=None, cancel=None,
+                   chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write paths (in order) to filename as fmt, one of EXPORT_FORMATS; returns the row count.
+
+    The file is written next to filename and renamed into place at the end,
+    so a cancelled or failed export leaves no partial file behind.
+    progress(done, total) is called after each chunk; cancel() is polled
+    between chunks and SearchCancelled raised when it returns True.
+    """
+    fmt = fmt or export_format(filename)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    temp = filename + ".tmp"
+    count = 0
+    try:
+        # surrogateescape writes undecodable file names back as their original bytes
+        with open(temp, "w", encoding="utf-8", errors="surrogateescape", newline="",
+                  buffering=1024 * 1024) as out:
+            write_chunk = _WRITERS[fmt]
+            if fmt == "csv":
+                out.write(",".join(CSV_COLUMNS) + "\r\n")
+            for start in range(0, len(paths), chunk_rows):
+                if cancel is not None and cancel():
+                    raise SearchCancelled()
+                chunk = paths[start:start + chunk_rows]
+                write_chunk(chunk, index, out)
+                count += len(chunk)
+                if progress:
+                    progress(count, len(paths))
+        os.replace(temp, filename)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+    return count
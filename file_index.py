@@ -0,0 +1,301 @@
+import os
+import json
+import time
+from array import array
+from itertools import compress
+from datetime import datetime
+
+import tracing
+
+COMPACT_MIN_TOMBSTONES = 1024  # Don't bother compacting small indexes
+UNKNOWN_SIZE = -1  # Size of entries indexed without metadata (older index files)
+SORT_KEYS = ("name", "folder", "size", "mtime", "duration", "resolution")
+MEDIA_SORT_KEYS = ("duration", "resolution")  # From media, 0 where unknown
+
+def walk_entries(directory, throttle=None):
+    """Yield (path, size, mtime, inode) for every file below directory.
+
+    Visits files in the same order as os.walk(directory) but keeps the stat
+    data that os.scandir already has, so the index can be built in one pass.
+    With an io_throttle.IndexThrottle, each directory is listed only when
+    the throttle allows and the time its listing and stat calls took is
+    reported back to it, and the walk ends as soon as the throttle is
+    stopped.
+    """
+    stopped = throttle.stopped.is_set if throttle is not None else None
+    stack = [directory]
+    while stack:
+        root = stack.pop()
+        if throttle is not None:
+            throttle.wait()
+            if stopped():
+                return
+        start = time.perf_counter()
+        try:
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs = []
+        rows = []  # Stat the whole directory before yielding, so the consumer isn't timed too
+        for entry in entries:
+            if stopped is not None and stopped():
+                return  # Don't finish stat-ing a huge directory on a slow drive
+            try:
+                if entry.is_dir():
+                    if not entry.is_symlink():  # Like os.walk, don't follow directory links
+                        subdirs.append(entry.path)
+                    continue
+                st = entry.stat()
+                rows.append((entry.path, st.st_size, st.st_mtime, st.st_ino))
+            except OSError:
+                rows.append((entry.path, UNKNOWN_SIZE, 0.0, 0))
+        if throttle is not None:
+            throttle.listed(time.perf_counter() - start, len(rows) + 1)
+        yield from rows
+        stack.extend(reversed(subdirs))
+
+class FileIndex:
+    """Indexed file paths with O(1) membership, removal and rename.
+
+    Paths are stored in slots in index order with a path -> slot hash map
+    beside them, and size/mtime/inode kept in parallel arrays. Removing a
+    path leaves a None tombstone in its slot so the other slots stay valid;
+    the slot list is compacted once tombstones outnumber the live entries.
+
+    sort_keys() gives a per-slot array to order results by; for name and
+    folder these are precomputed ranks, built on first use and dropped
+    whenever paths are added, renamed or renumbered.
+
+    version goes up with every add, remove and rename, so results computed
+    from the index can tell whether they are still current. Objects in
+    watchers are told about every add, remove and rename through
+    on_add(path, size), on_remove(path, size) and on_rename(old, new, size)
+    (see saved_searches.SavedSearches and disk_usage.DiskUsage);
+    saved_searches holds the saved search definitions stored in the index
+    file.
+
+    media maps paths to media_info.MediaInfo (None for files that aren't
+    readable media). It is filled in by media_info.extract_media from its
+    own cache file rather than stored in the index file.
+    """
+    def __init__(self, paths=(), sizes=None, mtimes=None, inodes=None):
+        self.slots = []
+        self.slot_of = {}
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.inodes = array('Q')
+        self.tombstones = 0
+        self.ranks = {}  # sort key -> array of per-slot ranks
+        self.version = 0
+        self.watchers = []
+        self.saved_searches = []
+        self.media = {}
+        paths = list(paths)
+        has_meta = (sizes is not None and mtimes is not None and inodes is not None
+                    and len(sizes) == len(mtimes) == len(inodes) == len(paths))
+        for i, path in enumerate(paths):
+            if has_meta:
+                self.add(path, sizes[i], mtimes[i], inodes[i])
+            else:
+                self.add(path)
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    def __contains__(self, path):
+        return path in self.slot_of
+
+    def __iter__(self):
+        return (path for path in self.slots if path is not None)
+
+    def add(self, path, size=UNKNOWN_SIZE, mtime=0.0, inode=0):
+        """Add a path if it isn't indexed yet and return its slot."""
+        slot = self.slot_of.get(path)
+        if slot is None:
+            slot = len(self.slots)
+            self.slots.append(path)
+            self.slot_of[path] = slot
+            self.sizes.append(size)
+            self.mtimes.append(mtime)
+            self.inodes.append(inode)
+            self.ranks = {}
+            self.version += 1
+            for watcher in self.watchers:
+                watcher.on_add(path, size)
+        return slot
+
+    def remove(self, path):
+        """Remove a path, returning False if it wasn't indexed."""
+        slot = self.slot_of.pop(path, None)
+        if slot is None:
+            return False
+        self.slots[slot] = None
+        self.tombstones += 1
+        self.version += 1
+        self.media.pop(path, None)
+        for watcher in self.watchers:
+            watcher.on_remove(path, self.sizes[slot])
+        if self.tombstones > COMPACT_MIN_TOMBSTONES and self.tombstones > len(self.slot_of):
+            self.compact()
+        return True
+
+    def rename(self, old_path, new_path):
+        """Point the slot of old_path at new_path, keeping its position and metadata."""
+        slot = self.slot_of.pop(old_path, None)
+        if slot is None:
+            return self.add(new_path)
+        self.ranks = {}
+        self.version += 1
+        info = self.media.pop(old_path, None)
+        if new_path in self.slot_of:
+            self.slots[slot] = None
+            self.tombstones += 1
+            for watcher in self.watchers:
+                watcher.on_remove(old_path, self.sizes[slot])
+            return self.slot_of[new_path]
+        self.slots[slot] = new_path
+        self.slot_of[new_path] = slot
+        if info is not None:
+            self.media[new_path] = info
+        for watcher in self.watchers:
+            watcher.on_rename(old_path, new_path, self.sizes[slot])
+        return slot
+
+    def slot_items(self):
+        """Yield (slot, path) for every live entry."""
+        for slot, path in enumerate(self.slots):
+            if path is not None:
+                yield slot, path
+
+    def paths(self):
+        """Iterator of every live path, over a copy of the slots that later changes to the index don't touch."""
+        return filter(None, self.slots[:])  # Tombstone slots are None
+
+    def sized_paths(self):
+        """Iterator of (path, size) for every live entry, over copies that later changes to the index don't touch.
+
+        Taking the copies is cheap, so it can be done on the thread that
+        updates the index and the iterator handed to a worker thread.
+        """
+        slots = self.slots[:]
+        return compress(zip(slots, self.sizes[:]), slots)  # Tombstone slots are None
+
+    def copy(self):
+        """A copy of the entries for another thread to read while this index keeps changing.
+
+        The copies take milliseconds per million entries, so they can be made
+        on the thread that updates the index. The copy has the index's
+        version and shares its media dict, so metadata read through the copy
+        reaches the index too; it has no watchers and isn't meant to be changed.
+        """
+        other = FileIndex()
+        other.slots = self.slots[:]
+        other.slot_of = self.slot_of.copy()
+        other.sizes = self.sizes[:]
+        other.mtimes = self.mtimes[:]
+        other.inodes = self.inodes[:]
+        other.tombstones = self.tombstones
+        other.version = self.version
+        other.media = self.media
+        return other
+
+    def compact(self):
+        """Drop tombstones and renumber the slots."""
+        if not self.tombstones:
+            return
+        live = [slot for slot, path in enumerate(self.slots) if path is not None]
+        self.slots = [self.slots[slot] for slot in live]
+        self.sizes = array('q', (self.sizes[slot] for slot in live))
+        self.mtimes = array('d', (self.mtimes[slot] for slot in live))
+        self.inodes = array('Q', (self.inodes[slot] for slot in live))
+        self.slot_of = {path: slot for slot, path in enumerate(self.slots)}
+        self.tombstones = 0
+        self.ranks = {}
+
+    def sort_keys(self, key):
+        """Per-slot values that order entries by key (one of SORT_KEYS).
+
+        size and mtime are the metadata arrays themselves; name (then folder)
+        and folder (then name) are ranks from one case-insensitive sort of the
+        whole index, so ordering results only compares integers. duration
+        (seconds) and resolution (pixels) come from media.
+        """
+        if key == "size":
+            return self.sizes
+        if key == "mtime":
+            return self.mtimes
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {key}")
+        ranks = self.ranks.get(key)
+        if ranks is None and key in MEDIA_SORT_KEYS:
+            ranks = array('d', bytes(8 * len(self.slots)))
+            media = self.media
+            for slot, path in self.slot_items():  # Not media.items(): it may grow on another thread
+                info = media.get(path)
+                if info is not None:
+                    ranks[slot] = info.duration if key == "duration" else info.width * info.height
+            self.ranks[key] = ranks
+        elif ranks is None:
+            with tracing.span("sort_keys", key=key, entries=len(self)):
+                order = sorted((slot for slot, _ in self.slot_items()),
+                               key=lambda slot: path_sort_key(self.slots[slot], key))
+                ranks = array('q', bytes(8 * len(self.slots)))
+                for rank, slot in enumerate(order):
+                    ranks[slot] = rank
+            self.ranks[key] = ranks
+        return ranks
+
+    def media_changed(self):
+        """Drop the media sort keys after media was added to."""
+        for key in MEDIA_SORT_KEYS:
+            self.ranks.pop(key, None)
+
+    def to_dict(self):
+        """Return the lists stored in the index file."""
+        self.compact()
+        data = {
+            'files': list(self.slots),
+            'sizes': self.sizes.tolist(),
+            'mtimes': self.mtimes.tolist(),
+            'inodes': self.inodes.tolist(),
+        }
+        if self.saved_searches:
+            data['saved_searches'] = self.saved_searches
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build an index from the lists stored in the index file."""
+        index = cls(data.get('files', []), data.get('sizes'), data.get('mtimes'), data.get('inodes'))
+        index.saved_searches = data.get('saved_searches', [])
+        return index
+
+def path_sort_key(path, key):
+    """Case-insensitive string key used for name and folder ordering."""
+    folder, name = os.path.split(path)
+    if key == "folder":
+        return folder.lower(), name.lower(), path
+    return name.lower(), folder.lower(), path
+
+def load_index_file(index_file):
+    """Read an index file, returning (directory, FileIndex) or (None, None) if it doesn't exist."""
+    if not os.path.exists(index_file):
+        return None, None
+    with tracing.span("index_load", file=index_file) as span:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        index = FileIndex.from_dict(data)
+        span.set(entries=len(index))
+    return data.get('directory', None), index
+
+def save_index_file(index_file, directory, index):
+    """Write the index for directory to index_file."""
+    data = {
+        'directory': directory,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    with tracing.span("index_save", file=index_file, entries=len(index)):
+        data.update(index.to_dict())
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,325 @@
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+COPY_BUFFER_SIZE = 8 * 1024 * 1024  # Buffer for the plain read/write fallback
+KERNEL_CHUNK_SIZE = 64 * 1024 * 1024  # Bytes per copy_file_range/sendfile call, keeps cancel/pause responsive
+PROGRESS_INTERVAL = 0.1  # Seconds between progress callbacks
+FICLONE = 0x40049409  # Linux ioctl to share extents between files (btrfs, XFS, bcachefs)
+
+# Parallel copies per device; spinning disks get one stream to avoid seeking
+ROTATIONAL_CONCURRENCY = 1
+SOLID_STATE_CONCURRENCY = 4
+UNKNOWN_CONCURRENCY = 2
+
+_device_concurrency_cache = {}
+
+def format_bytes(num_bytes):
+    """Format a byte count as a short human readable string."""
+    size = float(num_bytes)
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if size < 1024 or unit == "TB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def parse_size(text):
+    """Parse "500M", "1.5 GB" or "2048" into bytes; empty text is 0. Raises ValueError."""
+    text = text.strip().upper().rstrip("B").strip()
+    if not text:
+        return 0
+    multiplier = 1
+    if text[-1] in "KMGT":
+        multiplier = 1024 ** ("KMGT".index(text[-1]) + 1)
+        text = text[:-1]
+    return int(float(text) * multiplier)
+
+class JobCancelled(Exception):
+    """Raised inside a running job when it has been cancelled."""
+
+class FileJob:
+    """A queued copy, move or delete over a list of files.
+
+    The job is run from a worker thread with run(). pause(), resume() and
+    cancel() may be called from any other thread. Per-file errors are
+    collected in failures instead of aborting the whole job.
+    """
+    def __init__(self, operation, sources, dest_dir=None):
+        if operation not in ("copy", "move", "delete"):
+            raise ValueError(f"Unknown file operation: {operation}")
+        self.operation = operation
+        self.sources = list(sources)
+        self.dest_dir = dest_dir
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self.completed = []  # (source, destination or None) for each finished file
+        self.failures = []   # (source, error message) for each failed file
+        self.cancelled = False
+        self.start_time = None
+        self.paused_time = 0.0
+        self._lock = threading.Lock()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._cancel_event = threading.Event()
+        self._paused_at = None
+        self._progress_callback = None
+        self._last_progress = 0.0
+
+    def pause(self):
+        with self._lock:
+            if self._paused_at is None:
+                self._paused_at = time.monotonic()
+            self._resume_event.clear()
+
+    def resume(self):
+        with self._lock:
+            if self._paused_at is not None:
+                self.paused_time += time.monotonic() - self._paused_at
+                self._paused_at = None
+            self._resume_event.set()
+
+    def cancel(self):
+        self._cancel_event.set()
+        self.resume()  # Wake a paused job so it can exit
+
+    @property
+    def is_paused(self):
+        return not self._resume_event.is_set()
+
+    def throughput(self):
+        """Average bytes per second, not counting time spent paused."""
+        if self.start_time is None:
+            return 0.0
+        now = time.monotonic()
+        elapsed = now - self.start_time - self.paused_time
+        if self._paused_at is not None:
+            elapsed -= now - self._paused_at
+        return self.done_bytes / elapsed if elapsed > 0 else 0.0
+
+    def checkpoint(self):
+        """Block while paused and raise JobCancelled if the job was cancelled."""
+        self._resume_event.wait()
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def add_progress(self, num_bytes):
+        """Account for copied bytes and report progress at a bounded rate."""
+        with self._lock:
+            self.done_bytes += num_bytes
+        now = time.monotonic()
+        if self._progress_callback and now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            self._progress_callback(self)
+
+    def run(self, progress_callback=None):
+        """Run the job to completion, cancellation or failure of every file.
+
+        Copies and cross-device moves are grouped by (source device,
+        destination device); groups run in parallel, each with the
+        concurrency of its slower device.
+        """
+        self._progress_callback = progress_callback
+        self.start_time = time.monotonic()
+        self.total_bytes = 0
+        groups = {}
+        for source in self.sources:
+            try:
+                st = os.stat(source)
+                self.total_bytes += st.st_size
+                device = st.st_dev
+            except OSError:
+                device = None
+            groups.setdefault(device, []).append(source)
+
+        if self.operation == "delete":
+            self._run_sources(self.sources)
+        else:
+            dest_device = _device_of(self.dest_dir)
+            with ThreadPoolExecutor(max_workers=max(1, len(groups))) as executor:
+                futures = []
+                for device, sources in groups.items():
+                    workers = min(device_concurrency(sources[0]),
+                                  device_concurrency(self.dest_dir))
+                    if self.operation == "move" and device is not None and device == dest_device:
+                        workers = 1  # Renames are metadata-only, no point fanning out
+                    futures.append(executor.submit(self._run_group, sources, workers))
+                for future in futures:
+                    future.result()
+
+        self.cancelled = self._cancel_event.is_set()
+        if progress_callback:
+            progress_callback(self)
+        return self.failures
+
+    def _run_group(self, sources, workers):
+        if workers <= 1:
+            self._run_sources(sources)
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for i in range(workers):
+                executor.submit(self._run_sources, sources[i::workers])
+
+    def _run_sources(self, sources):
+        for source in sources:
+            try:
+                self.checkpoint()
+            except JobCancelled:
+                return
+            try:
+                self._run_one(source)
+            except JobCancelled:
+                return
+            except Exception as e:
+                with self._lock:
+                    self.failures.append((source, str(e)))
+
+    def _destination(self, source):
+        dest = os.path.join(self.dest_dir, os.path.basename(source))
+        if os.path.exists(dest):
+            raise FileExistsError(f"Destination already exists: {dest}")
+        return dest
+
+    def _run_one(self, source):
+        if self.operation == "delete":
+            size = os.path.getsize(source)
+            os.remove(source)
+            dest = None
+            self.add_progress(size)
+        elif self.operation == "copy":
+            dest = self._destination(source)
+            copy_file(source, dest, self)
+        else:
+            dest = self._destination(source)
+            move_file(source, dest, self)
+        with self._lock:
+            self.completed.append((source, dest))
+
+def _device_of(path):
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return None
+
+def device_concurrency(path):
+    """Pick how many parallel copies the block device holding path can take."""
+    device = _device_of(path)
+    if device is None:
+        return UNKNOWN_CONCURRENCY
+    if device in _device_concurrency_cache:
+        return _device_concurrency_cache[device]
+
+    concurrency = UNKNOWN_CONCURRENCY
+    try:
+        # /sys/dev/block/MAJ:MIN points at the disk or at a partition below it
+        sys_path = os.path.realpath(f"/sys/dev/block/{os.major(device)}:{os.minor(device)}")
+        for candidate in (sys_path, os.path.dirname(sys_path)):
+            rotational = os.path.join(candidate, "queue", "rotational")
+            if os.path.exists(rotational):
+                with open(rotational) as f:
+                    is_rotational = f.read().strip() == "1"
+                concurrency = ROTATIONAL_CONCURRENCY if is_rotational else SOLID_STATE_CONCURRENCY
+                break
+    except (OSError, AttributeError):
+        pass
+    _device_concurrency_cache[device] = concurrency
+    return concurrency
+
+def move_file(source, dest, job=None):
+    """Move a file with a plain rename when possible, otherwise copy and remove."""
+    size = os.path.getsize(source)
+    if _device_of(source) == _device_of(os.path.dirname(dest) or "."):
+        try:
+            os.rename(source, dest)
+            if job:
+                job.add_progress(size)
+            return
+        except OSError:
+            pass  # e.g. EXDEV across bind mounts, fall through to a copy
+    copy_file(source, dest, job)
+    os.remove(source)
+
+def _clone_file(src, dst):
+    """Try to reflink dst to src. Returns True if the filesystem shared the extents."""
+    if fcntl is None or not hasattr(os, "major"):
+        return False
+    try:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        return False
+
+def _kernel_copy(src, dst, size, job):
+    """Copy with copy_file_range or sendfile so data never enters user space.
+
+    Returns the number of bytes copied; less than size means the caller should
+    finish with the buffered fallback from the current offsets.
+    """
+    copied = 0
+    for name in ("copy_file_range", "sendfile"):
+        copy = getattr(os, name, None)
+        if copy is None:
+            continue
+        try:
+            while copied < size:
+                if job:
+                    job.checkpoint()
+                count = min(KERNEL_CHUNK_SIZE, size - copied)
+                if name == "copy_file_range":
+                    sent = copy(src.fileno(), dst.fileno(), count)
+                else:
+                    sent = copy(dst.fileno(), src.fileno(), None, count)
+                if sent == 0:
+                    break
+                copied += sent
+                if job:
+                    job.add_progress(sent)
+            return copied
+        except OSError:
+            if copied:
+                return copied  # Offsets have moved, let the fallback finish
+    return copied
+
+def copy_file(source, dest, job=None):
+    """Copy a file, reporting progress to job and honouring pause/cancel.
+
+    Tries, in order, a reflink clone, copy_file_range/sendfile and a large
+    buffered read/write. A partially written destination is removed if the
+    copy fails or is cancelled.
+    """
+    created = False
+    try:
+        with open(source, 'rb') as src, open(dest, 'xb') as dst:
+            created = True
+            size = os.fstat(src.fileno()).st_size
+            if size and _clone_file(src, dst):
+                if job:
+                    job.add_progress(size)
+            else:
+                copied = _kernel_copy(src, dst, size, job)
+                src.seek(copied)
+                dst.seek(copied)
+                buffer = bytearray(COPY_BUFFER_SIZE)
+                view = memoryview(buffer)
+                while True:
+                    if job:
+                        job.checkpoint()
+                    count = src.readinto(buffer)
+                    if not count:
+                        break
+                    dst.write(view[:count])
+                    if job:
+                        job.add_progress(count)
+        shutil.copystat(source, dest)
+    except BaseException:
+        if created:
+            try:
+                os.remove(dest)
+            except OSError:
+                pass
+        raise
@@ -0,0 +1,3003 @@
+import os
+import re
+import sys
+import html
+import subprocess
+import platform
+import webbrowser
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
+                             QLabel, QLineEdit, QPushButton, QListWidget, QListWidgetItem, QFileDialog, 
+                             QMessageBox, QGraphicsBlurEffect, QGraphicsOpacityEffect, QProgressBar, QMenu, QCheckBox,
+                             QComboBox, QInputDialog, QDialog, QTreeWidget, QTreeWidgetItem, QHeaderView)
+from PyQt6.QtGui import (QPainter, QLinearGradient, QColor, QBrush, QFont, QPalette, QPen, QPixmap, QRadialGradient, QShortcut, QKeySequence,
+                         QImage, QImageReader)
+from PyQt6.QtCore import Qt, QRectF, QPropertyAnimation, QEasingCurve, QParallelAnimationGroup, QSequentialAnimationGroup, QPoint, QPointF, QTimer, QThread, QObject, pyqtSignal, QSize, QBuffer, QIODevice
+import random
+import math
+import heapq
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import time
+from file_ops import FileJob, format_bytes, parse_size
+from file_index import FileIndex, MEDIA_SORT_KEYS, walk_entries, load_index_file, save_index_file
+from search_core import (normalize_filename, search_files, sort_results, group_by_directory,
+                         CancelToken, SearchCancelled, CANCEL_CHECK_INTERVAL, MatcherCache)
+from duplicates import HashCache, find_duplicates
+from similar_names import find_similar_names, DEFAULT_THRESHOLD as SIMILAR_NAMES_THRESHOLD
+from content_search import content_search, select_candidates, parse_extensions
+from saved_searches import SavedSearches
+from media_info import (MediaCache, media_cache_path, has_media_filters, parse_media_filters, filter_media,
+                        extract_media)
+from thumbnails import ThumbnailStore, content_key, THUMBNAIL_SIZE
+from disk_usage import DiskUsage
+from io_throttle import IndexThrottle, lower_thread_priority
+from snapshots import snapshot_path, save_snapshot, load_snapshot, diff_index, is_snapshot_of
+from export import export_results, export_format, EXPORT_FORMATS, EXPORT_EXTENSIONS
+import tracing
+from search_daemon import query as daemon_query, DaemonUnavailable
+
+LIVE_SEARCH_DELAY_MS = 150  # Typing pause before a search-as-you-type query runs
+LIVE_SEARCH_MIN_CHARS = 2  # Shorter queries match most of the index, so wait for Enter
+LIVE_SEARCH_MAX_RESULTS = 10000  # Live queries stop here to stay fast; Enter finds all matches
+RESULTS_PAGE_SIZE = 500  # Result rows turned into widgets at a time
+BACKGROUND_INDEX_PROGRESS_FILES = 1000  # Files between status updates while indexing in the background
+THUMBNAIL_WORKERS = 2  # Threads decoding preview thumbnails
+PIXMAP_CACHE_BYTES = 64 * 1024 * 1024  # Decoded thumbnails kept in memory
+PREVIEW_PREFETCH_ROWS = 20  # Rows below the visible ones whose thumbnails are made ahead of time
+# Sort menu entries: label, sort key (None keeps the order results were found in), descending
+SORT_OPTIONS = [
+    ("Found order", None, False),
+    ("Name", "name", False),
+    ("Folder", "folder", False),
+    ("Largest first", "size", True),
+    ("Smallest first", "size", False),
+    ("Newest first", "mtime", True),
+    ("Oldest first", "mtime", False),
+    ("Longest first", "duration", True),
+    ("Highest resolution first", "resolution", True),
+]
+
+def open_file(file_path):
+    """Open a file using the system's default application."""
+    try:
+        # Convert to absolute path
+        abs_path = os.path.abspath(file_path)
+        print(f"Attempting to open file: {abs_path}")
+        
+        if platform.system() == 'Windows':
+            os.startfile(abs_path)
+        elif platform.system() == 'Darwin':
+            subprocess.run(f'open "{abs_path}"', shell=True, env=os.environ)
+        else:  # Linux and others
+            # Try xdg-open with full path
+            subprocess.run(f'xdg-open "{abs_path}"', shell=True, env=os.environ)
+        
+        print("File open command executed")
+    except Exception as e:
+        print(f"Error opening file: {str(e)}")
+        import traceback
+        print("Full error traceback:")
+        print(traceback.format_exc())
+
+def open_file_explorer(file_path):
+    """Open the file's containing folder in the system's file manager."""
+    try:
+        # Convert to absolute path
+        abs_path = os.path.abspath(file_path)
+        dir_path = os.path.dirname(abs_path)
+        print(f"Attempting to open folder: {dir_path}")
+        
+        if platform.system() == 'Windows':
+            subprocess.run(f'explorer /select,"{abs_path}"', shell=True, env=os.environ)
+        elif platform.system() == 'Darwin':
+            subprocess.run(f'open -R "{abs_path}"', shell=True, env=os.environ)
+        else:  # Linux and others
+            subprocess.run(f'xdg-open "{dir_path}"', shell=True, env=os.environ)
+        
+        print("Folder open command executed")
+    except Exception as e:
+        print(f"Error opening file explorer: {str(e)}")
+        import traceback
+        print("Full error traceback:")
+        print(traceback.format_exc())
+
+class AnimatedLabel(QLabel):
+    def __init__(self, text, parent=None):
+        super().__init__(text, parent)
+        self.opacity_effect = QGraphicsOpacityEffect(self)
+        self.setGraphicsEffect(self.opacity_effect)
+        self.opacity_effect.setOpacity(1.0)
+        
+    def setText(self, text):
+        super().setText(text)
+        
+    def animate_text_change(self, new_text):
+        try:
+            self.setText(new_text)
+        except Exception as e:
+            print(f"Error updating label: {str(e)}")
+
+class AeroButton(QPushButton):
+    """Custom button with authentic Aero glass effect."""
+    def __init__(self, text, parent=None):
+        super().__init__(text, parent)
+        self.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
+                    stop:0 rgba(255, 255, 255, 180),
+                    stop:0.3 rgba(220, 240, 255, 140),
+                    stop:0.6 rgba(200, 230, 255, 120),
+                    stop:1 rgba(180, 220, 255, 100));
+                border: 1px solid rgba(255, 255, 255, 180);
+                border-radius: 3px;
+                padding: 6px;
+                color: rgba(0, 0, 0, 180);
+                font-weight: bold;
+                min-height: 20px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(255, 255, 255, 220),
+                    stop:0.3 rgba(230, 245, 255, 180),
+                    stop:0.6 rgba(210, 235, 255, 160),
+                    stop:1 rgba(190, 225, 255, 140));
+                border: 1px solid rgba(255, 255, 255, 220);
+            }
+            QPushButton:pressed {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(180, 220, 255, 100),
+                    stop:0.3 rgba(200, 230, 255, 120),
+                    stop:0.6 rgba(220, 240, 255, 140),
+                    stop:1 rgba(255, 255, 255, 180));
+                padding-top: 7px;
+                padding-bottom: 5px;
+            }
+        """)
+        self.setMinimumHeight(28)
+        
+        # Add click animation
+        self.click_animation = QPropertyAnimation(self, b"geometry")
+        self.click_animation.setDuration(100)
+        self.click_animation.setEasingCurve(QEasingCurve.Type.OutQuad)
+        
+        # Add hover animation
+        self.hover_opacity = QGraphicsOpacityEffect(self)
+        self.setGraphicsEffect(self.hover_opacity)
+        self.hover_opacity.setOpacity(1.0)
+        
+        self.hover_animation = QPropertyAnimation(self.hover_opacity, b"opacity")
+        self.hover_animation.setDuration(150)
+        
+    def enterEvent(self, event):
+        self.hover_animation.setStartValue(1.0)
+        self.hover_animation.setEndValue(0.8)
+        self.hover_animation.start()
+        super().enterEvent(event)
+        
+    def leaveEvent(self, event):
+        self.hover_animation.setStartValue(0.8)
+        self.hover_animation.setEndValue(1.0)
+        self.hover_animation.start()
+        super().leaveEvent(event)
+        
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            rect = self.geometry()
+            self.click_animation.setStartValue(rect)
+            self.click_animation.setEndValue(rect.adjusted(1, 1, -1, -1))
+            self.click_animation.start()
+        super().mousePressEvent(event)
+        
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            rect = self.geometry()
+            self.click_animation.setStartValue(rect)
+            self.click_animation.setEndValue(rect.adjusted(-1, -1, 1, 1))
+            self.click_animation.start()
+        super().mouseReleaseEvent(event)
+
+class AnimatedButton(AeroButton):
+    def __init__(self, text, parent=None):
+        super().__init__(text, parent)
+        self.pulse_animation = QPropertyAnimation(self, b"geometry")
+        self.pulse_animation.setDuration(1500)
+        self.pulse_animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
+        self.is_pulsing = False
+        
+    def start_pulse(self):
+        if not self.is_pulsing:
+            self.is_pulsing = True
+            rect = self.geometry()
+            self.pulse_animation.setStartValue(rect)
+            self.pulse_animation.setEndValue(rect.adjusted(-2, -2, 2, 2))
+            self.pulse_animation.setLoopCount(-1)  # Infinite loop
+            self.pulse_animation.start()
+            
+    def stop_pulse(self):
+        if self.is_pulsing:
+            self.is_pulsing = False
+            self.pulse_animation.stop()
+            rect = self.geometry()
+            self.setGeometry(rect)
+
+class AnimatedProgressBar(QProgressBar):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("""
+            QProgressBar {
+                border: 1px solid rgba(255, 255, 255, 180);
+                border-radius: 3px;
+                text-align: center;
+                background: rgba(255, 255, 255, 100);
+            }
+            QProgressBar::chunk {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(200, 220, 255, 180),
+                    stop:1 rgba(180, 200, 255, 140));
+                border-radius: 2px;
+            }
+        """)
+        self.wave_animation = QPropertyAnimation(self, b"value")
+        self.wave_animation.setDuration(1000)
+        self.wave_animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
+        self.is_waving = False
+        
+    def start_wave(self):
+        if not self.is_waving:
+            self.is_waving = True
+            self.wave_animation.setStartValue(0)
+            self.wave_animation.setEndValue(100)
+            self.wave_animation.setLoopCount(-1)
+            self.wave_animation.start()
+            
+    def stop_wave(self):
+        if self.is_waving:
+            self.is_waving = False
+            self.wave_animation.stop()
+            self.setValue(100)  # Set to 100% when stopping
+            self.hide()  # Hide the progress bar immediately
+
+class AnimatedListWidget(QListWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setVerticalScrollMode(QListWidget.ScrollMode.ScrollPerPixel)
+        self.animation_duration = 800  # Longer duration for more magical effect
+        self.animations = []
+        self.item_delay = 50  # Longer delay between items for more dramatic effect
+        self.path_items = {}  # file path -> QListWidgetItem for in-place removal
+        self.generation = 0  # Bumped by clear() so delayed animation starts for old rows are skipped
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_context_menu)
+        
+    def clear(self):
+        for animation, _, _ in self.animations:
+            animation.stop()
+        self.animations = []
+        self.path_items = {}
+        self.generation += 1
+        super().clear()
+
+    def remove_paths(self, paths):
+        """Remove the rows showing the given file paths, if present."""
+        removed = set()
+        for path in paths:
+            item = self.path_items.pop(path, None)
+            if item is not None:
+                removed.add(id(item))
+                self.takeItem(self.row(item))
+        if removed:
+            remaining = []
+            for entry in self.animations:
+                if id(entry[2]) in removed:
+                    entry[0].stop()
+                else:
+                    remaining.append(entry)
+            self.animations = remaining
+
+    def add_header(self, text):
+        """Add a non-selectable heading row, e.g. a folder when grouping results."""
+        label = QLabel(text)
+        label.setStyleSheet("""
+            QLabel {
+                color: rgba(0, 0, 0, 200);
+                padding: 4px 2px 0px 2px;
+                font-size: 11px;
+                font-weight: bold;
+            }
+        """)
+        item = QListWidgetItem()
+        item.setFlags(Qt.ItemFlag.NoItemFlags)
+        item.setSizeHint(QSize(label.sizeHint().width(), label.sizeHint().height() + 4))
+        self.addItem(item)
+        self.setItemWidget(item, label)
+
+    def path_at(self, row):
+        """The file path shown in a row, or None for headings and rows out of range."""
+        item = self.item(row)
+        if item is None or not item.flags() & Qt.ItemFlag.ItemIsSelectable:
+            return None
+        widget = self.itemWidget(item)
+        label = widget.findChild(QLabel) if widget is not None else None
+        return label.text() if label else None
+
+    def visible_rows(self):
+        """(first, last) rows at least partly in view, or None when the list is empty."""
+        if not self.count():
+            return None
+        first = self.indexAt(QPoint(1, 1)).row()
+        last = self.indexAt(QPoint(1, self.viewport().height() - 2)).row()
+        return max(first, 0), last if last >= 0 else self.count() - 1
+
+    def show_context_menu(self, position):
+        item = self.itemAt(position)
+        if item and item.flags() & Qt.ItemFlag.ItemIsSelectable:
+            # Get the widget from the item
+            widget = self.itemWidget(item)
+            # Get the label from the widget's layout
+            label = widget.findChild(QLabel)
+            if label:
+                file_path = label.text()
+                menu = QMenu()
+                open_action = menu.addAction("Open")
+                show_in_folder_action = menu.addAction("Show in File Manager")
+                
+                action = menu.exec(self.mapToGlobal(position))
+                if action == open_action:
+                    open_file(file_path)
+                elif action == show_in_folder_action:
+                    open_file_explorer(file_path)
+        
+    def add_item_with_animation(self, text, detail=None):
+        # Create a widget to hold the text
+        widget = QWidget()
+        layout = QVBoxLayout(widget) if detail else QHBoxLayout(widget)
+        layout.setContentsMargins(8, 4, 8, 4)  # Increased padding
+        label = QLabel(text)
+        label.setStyleSheet("""
+            QLabel {
+                color: rgba(0, 0, 0, 180);
+                padding: 2px;
+                font-size: 12px;
+            }
+        """)
+        layout.addWidget(label)
+        if detail:
+            # Secondary line, e.g. matching lines from a content search
+            detail_label = QLabel(detail)
+            detail_label.setStyleSheet("""
+                QLabel {
+                    color: rgba(0, 0, 0, 130);
+                    padding: 0px 2px;
+                    font-size: 10px;
+                }
+            """)
+            layout.addWidget(detail_label)
+        
+        # Create opacity effect for the widget
+        effect = QGraphicsOpacityEffect(widget)
+        widget.setGraphicsEffect(effect)
+        effect.setOpacity(0.0)
+        
+        # Create and configure the animation
+        animation = QPropertyAnimation(effect, b"opacity")
+        animation.setDuration(self.animation_duration)
+        animation.setStartValue(0.0)
+        animation.setEndValue(1.0)
+        animation.setEasingCurve(QEasingCurve.Type.OutCubic)
+        
+        # Calculate delay based on item position, ensure it's not negative
+        delay = max(0, (self.count() - 1) * self.item_delay)
+        
+        # Create list item and set the widget
+        item = QListWidgetItem()
+        item.setSizeHint(widget.sizeHint())
+        # Add extra height to the item
+        size_hint = item.sizeHint()
+        item.setSizeHint(QSize(size_hint.width(), size_hint.height() + 8))  # Add 8 pixels of height
+        self.addItem(item)
+        self.setItemWidget(item, widget)
+        self.path_items[text] = item
+        
+        # Keep reference to prevent garbage collection
+        self.animations.append((animation, widget, item))
+        
+        def cleanup():
+            if (animation, widget, item) in self.animations:
+                self.animations.remove((animation, widget, item))
+        
+        animation.finished.connect(cleanup)
+        
+        # Start animation after delay, unless the list has been cleared by then
+        generation = self.generation
+        def start():
+            if generation == self.generation:
+                animation.start()
+        QTimer.singleShot(delay, start)
+
+def format_media_info(info):
+    """Short description of a media_info.MediaInfo, e.g. "1920x1080, 2:05, h264"."""
+    parts = []
+    if info.width and info.height:
+        parts.append(f"{info.width}x{info.height}")
+    if info.duration:
+        minutes, seconds = divmod(int(round(info.duration)), 60)
+        hours, minutes = divmod(minutes, 60)
+        parts.append(f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}")
+    if info.codec:
+        parts.append(info.codec)
+    return ", ".join(parts)
+
+class PixmapCache:
+    """Least recently used thumbnails as QPixmaps, bounded by their pixel memory. GUI thread only."""
+    def __init__(self, max_bytes=PIXMAP_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.pixmaps = OrderedDict()
+        self.total = 0
+
+    def __contains__(self, path):
+        return path in self.pixmaps
+
+    def get(self, path):
+        pixmap = self.pixmaps.get(path)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(path)
+        return pixmap
+
+    def put(self, path, pixmap):
+        """Add a thumbnail; a null pixmap records that the file has no preview."""
+        old = self.pixmaps.pop(path, None)
+        if old is not None:
+            self.total -= self.cost(old)
+        self.pixmaps[path] = pixmap
+        self.total += self.cost(pixmap)
+        while self.total > self.max_bytes and len(self.pixmaps) > 1:
+            _, evicted = self.pixmaps.popitem(last=False)
+            self.total -= self.cost(evicted)
+
+    @staticmethod
+    def cost(pixmap):
+        return pixmap.width() * pixmap.height() * 4
+
+class ThumbnailLoader(QObject):
+    """Thumbnail worker threads fed from a priority queue of requested paths.
+
+    request() replaces the queue, so the selected row and the rows on screen
+    are always decoded next and rows scrolled past are dropped. Images are
+    decoded at thumbnail size where the format allows it, and stored in a
+    ThumbnailStore so they are decoded once. Results come back as QImage
+    through ready; QPixmaps are only made on the GUI thread.
+    """
+    ready = pyqtSignal(str, QImage)  # path, thumbnail (null if the file can't be decoded)
+
+    def __init__(self, store, workers=THUMBNAIL_WORKERS, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.queue = []  # heap of (priority, path)
+        self.running = set()  # Paths being decoded right now
+        self.keys = {}  # (path, size, mtime) -> content key, so each file is hashed once per session
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.threads = [threading.Thread(target=self.work, name=f"thumbnail-{i}", daemon=True)
+                        for i in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def request(self, paths):
+        """Make thumbnails for paths, most important first, instead of whatever was queued."""
+        with self.condition:
+            self.queue = [(priority, path) for priority, path in enumerate(paths) if path not in self.running]
+            heapq.heapify(self.queue)
+            self.condition.notify_all()
+
+    def shutdown(self):
+        with self.condition:
+            self.stopped = True
+            self.queue = []
+            self.condition.notify_all()
+
+    def work(self):
+        while True:
+            with self.condition:
+                while not self.queue and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                _, path = heapq.heappop(self.queue)
+                self.running.add(path)
+            try:
+                with tracing.span("thumbnail", path=path):
+                    image = self.load(path)
+            except Exception as e:
+                print(f"Error making thumbnail for {path}: {str(e)}")
+                image = QImage()
+            with self.condition:
+                self.running.discard(path)
+            if not self.stopped:
+                self.ready.emit(path, image)
+
+    def load(self, path):
+        st = os.stat(path)
+        identity = (path, st.st_size, st.st_mtime_ns)
+        key = self.keys.get(identity)
+        if key is None:
+            key = self.keys[identity] = content_key(path, st.st_size)
+        data = self.store.get(key)
+        if data is not None:
+            image = QImage.fromData(data)
+            if not image.isNull():
+                return image
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)  # Honour EXIF rotation
+        size = reader.size()
+        if size.isValid() and max(size.width(), size.height()) > THUMBNAIL_SIZE:
+            # JPEG decodes straight to a fraction of its size; other formats scale after decoding
+            reader.setScaledSize(size.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return image
+        if max(image.width(), image.height()) > THUMBNAIL_SIZE:
+            image = image.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        buffer = QBuffer()
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        image.save(buffer, "PNG" if image.hasAlphaChannel() else "JPG", 85)
+        self.store.put(key, bytes(buffer.data()))
+        return image
+
+class PreviewPane(QWidget):
+    """Thumbnail and details of the selected result."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        self.image_label = QLabel()
+        self.image_label.setFixedSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.image_label.setStyleSheet("color: rgba(0, 0, 0, 130); font-size: 10px;")
+        self.info_label = QLabel()
+        self.info_label.setWordWrap(True)
+        self.info_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        self.info_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.info_label.setStyleSheet("color: rgba(0, 0, 0, 180); font-size: 10px;")
+        layout.addWidget(self.image_label)
+        layout.addWidget(self.info_label, 1)
+        self.setFixedHeight(THUMBNAIL_SIZE + 8)
+
+    def show_file(self, details, placeholder=""):
+        self.info_label.setText(details)
+        self.image_label.clear()
+        self.image_label.setText(placeholder)
+
+    def set_pixmap(self, pixmap):
+        if pixmap.isNull():
+            self.image_label.setText("No preview")
+        else:
+            self.image_label.setPixmap(pixmap)
+
+def current_rss_bytes():
+    """Resident memory of this process, or None where it can't be read cheaply."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if platform.system() == "Darwin" else peak * 1024
+    except ImportError:
+        return None
+
+def estimate_index_bytes(index, sample_size=1000):
+    """Rough memory used by a FileIndex, from its containers and a sample of paths."""
+    total = sys.getsizeof(index.slots) + sys.getsizeof(index.slot_of)
+    for values in (index.sizes, index.mtimes, index.inodes):
+        total += values.buffer_info()[1] * values.itemsize
+    if index.slots:
+        step = max(1, len(index.slots) // sample_size)
+        sample = [path for path in index.slots[::step] if path is not None]
+        if sample:
+            total += sum(sys.getsizeof(path) for path in sample) * len(index) // len(sample)
+    return total
+
+class PerformanceHUD(QLabel):
+    """Overlay with search phase timings, index size, memory and paint stats.
+
+    Toggled with F12. While hidden it has no timer running and no trace
+    listener registered, so it costs nothing.
+    """
+    PHASES = ["walk", "walk_match", "match", "emit", "render", "index_build", "index_load", "index_save"]
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.main_window = window
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("""
+            QLabel {
+                background: rgba(20, 24, 32, 190);
+                color: rgba(220, 240, 255, 230);
+                border: 1px solid rgba(255, 255, 255, 120);
+                border-radius: 3px;
+                padding: 6px;
+                font-family: monospace;
+                font-size: 10px;
+            }
+        """)
+        self.phases = {}  # span name -> (seconds, args) of its latest run
+        self.frame_times = []
+        self.frame_count = 0
+        self.last_refresh = time.perf_counter()
+        self.index_bytes = (0, 0)  # (index length it was computed for, estimate)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.timer.stop()
+            tracing.remove_listener(self.on_span)
+            self.hide()
+        else:
+            tracing.add_listener(self.on_span)
+            self.frame_times = []
+            self.frame_count = 0
+            self.last_refresh = time.perf_counter()
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start(500)  # 2 Hz is plenty for a readout
+
+    def on_span(self, name, seconds, args):
+        # Called from worker threads too; a single dict assignment is safe under the GIL
+        self.phases[name] = (seconds, args)
+
+    def record_frame(self, seconds):
+        self.frame_times.append(seconds)
+        self.frame_count += 1
+
+    def refresh(self):
+        now = time.perf_counter()
+        elapsed = now - self.last_refresh
+        fps = self.frame_count / elapsed if elapsed > 0 else 0.0
+        frame_ms = (sum(self.frame_times) / len(self.frame_times) * 1000) if self.frame_times else 0.0
+        frame_max = max(self.frame_times) * 1000 if self.frame_times else 0.0
+        self.frame_times = []
+        self.frame_count = 0
+        self.last_refresh = now
+
+        lines = []
+        latency = self.main_window.last_search_latency
+        lines.append(f"last search  {latency * 1000:8.1f} ms" if latency is not None else "last search        n/a")
+        for name in self.PHASES:
+            if name in self.phases:
+                seconds, args = self.phases[name]
+                lines.append(f"  {name:11}{seconds * 1000:8.1f} ms")
+        scanned = self.phases.get("match")
+        if scanned and scanned[1].get("scanned") and scanned[0] > 0:
+            lines.append(f"scan rate    {scanned[1]['scanned'] / scanned[0]:10,.0f} files/s")
+
+        index = self.main_window.indexed_files
+        if self.index_bytes[0] != len(index):
+            self.index_bytes = (len(index), estimate_index_bytes(index))
+        lines.append(f"index        {len(index):10,} files")
+        lines.append(f"index mem    {format_bytes(self.index_bytes[1]):>10}")
+        rss = current_rss_bytes()
+        if rss is not None:
+            lines.append(f"process RSS  {format_bytes(rss):>10}")
+        lines.append(f"paint        {fps:6.1f} fps {frame_ms:5.2f} ms (max {frame_max:.2f})")
+        lines.append(f"result rows  {self.main_window.results_list.count():10,}")
+        lines.append(f"animations   {len(self.main_window.results_list.animations):10,}")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.move(self.main_window.width() - self.width() - 12, 12)
+
+class SearchTask(QObject):
+    """A cancellable unit of search work run on a SearchExecutor thread.
+
+    Subclasses define run(), which execute() calls on the worker thread,
+    and report through their own signals, which Qt delivers on the GUI
+    thread. There is no run() here to fall back on. stop() only sets the
+    cancellation token; run() notices it at its next chunk boundary.
+    """
+    done = pyqtSignal()  # Emitted last, after any other signal of the task
+
+    def __init__(self):
+        super().__init__()
+        self.token = CancelToken()
+        self.generation = 0  # Set by SearchExecutor.submit
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def stop(self):
+        self.token.cancel()
+
+    def execute(self):
+        try:
+            if not self.token.cancelled:  # Superseded while it was queued
+                self.run()
+        except SearchCancelled:
+            pass
+        finally:
+            self.done.emit()
+
+class SearchExecutor(QObject):
+    """Long-lived threads that run SearchTasks, reused across queries.
+
+    Submitting a task cancels the current one without waiting for it, so
+    rapid re-searching neither blocks the GUI nor starts new threads; a
+    superseded task stops at its next cancellation check.
+    """
+    def __init__(self, workers=2, parent=None):
+        super().__init__(parent)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+        self.current = None
+        self.generation = 0  # Id of the latest submitted task
+        self.tasks = set()  # Kept alive until their last signal has been delivered
+
+    def submit(self, task):
+        self.cancel()
+        self.generation += 1
+        task.generation = self.generation
+        self.current = task
+        self.tasks.add(task)
+        task.done.connect(lambda: self.tasks.discard(task))
+        self.pool.submit(task.execute)
+        return task
+
+    def cancel(self):
+        """Ask the current task to stop; returns immediately."""
+        if self.current is not None:
+            self.current.stop()
+
+    def is_running(self):
+        """True while the current task is neither finished nor cancelled."""
+        return self.current is not None and self.current in self.tasks and not self.current.cancelled
+
+    def is_current(self, task):
+        """True if task is the latest submitted generation and hasn't been cancelled."""
+        return task.generation == self.generation and not task.cancelled
+
+    def shutdown(self):
+        for task in self.tasks:
+            task.stop()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+class NameSearchTask(SearchTask):
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(int, int)  # current, total
+    large_directory = pyqtSignal(int)  # Signal for large directory detection
+    
+    def __init__(self, directory, keyword, indexed_files=None, index_file=None, check_size=True, media_cache=None):
+        super().__init__()
+        self.directory = directory
+        self.keyword = keyword
+        self.indexed_files = indexed_files  # A FileIndex.copy(), as the GUI thread keeps changing the index
+        self.index_file = index_file
+        self.check_size = check_size  # Ask before walking very large directories
+        self.media_cache = media_cache  # Shared with the window's media scan; loaded here when None
+        self.media_filters = []
+
+    def filter_media(self, results, index=None):
+        """Apply the query's media filters, reading headers the cache doesn't have."""
+        if not self.media_filters:
+            return results
+        if self.media_cache is None:
+            self.media_cache = MediaCache(media_cache_path(self.index_file or 'file_index.json'))
+        try:
+            with tracing.span("media_filter", candidates=len(results)) as span:
+                results = filter_media(results, self.media_filters, self.media_cache, index, self.token)
+                span.set(results=len(results))
+        finally:
+            self.media_cache.save()  # Keep the headers read, even when cancelled
+        return results
+
+    def run(self):
+        try:
+            try:
+                self.keyword, self.media_filters = parse_media_filters(self.keyword)
+            except ValueError as e:
+                self.error.emit(str(e))
+                return
+
+            # Check if directory exists and is accessible
+            if not os.path.exists(self.directory):
+                self.error.emit(f"Error: Directory '{self.directory}' does not exist.")
+                return
+                
+            if not os.access(self.directory, os.R_OK):
+                self.error.emit(f"Error: No read permission for directory '{self.directory}'")
+                return
+
+            if self.indexed_files:
+                # Use indexed files if available, through the search daemon when it is running
+                results = None
+                if self.index_file and os.path.exists(self.index_file):
+                    try:
+                        results = []
+                        for i, path in enumerate(daemon_query(self.keyword, self.index_file, directory=self.directory)):
+                            if not i % CANCEL_CHECK_INTERVAL:
+                                self.token.check()
+                            results.append(path)
+                    except DaemonUnavailable:
+                        results = None
+                if results is None:
+                    results = search_files(self.directory, self.keyword, self.indexed_files, self.token)
+                self.token.check()
+                results = self.filter_media(results, self.indexed_files)
+                with tracing.span("emit", results=len(results)):
+                    self.finished.emit(results)
+            else:
+                # For non-indexed search, count files first
+                total_files = 0
+                if self.check_size:
+                    try:
+                        with tracing.span("walk", directory=self.directory, purpose="count"):
+                            for _, _, files in os.walk(self.directory):
+                                self.token.check()
+                                total_files += len(files)
+                    except SearchCancelled:
+                        raise
+                    except Exception as e:
+                        self.error.emit(f"Error counting files: {str(e)}")
+                        return
+                    
+                    if total_files > 10000:  # Warning threshold
+                        self.large_directory.emit(total_files)
+                        return
+                
+                # Perform search with progress updates
+                results = []
+                processed_files = 0
+                keyword = self.keyword.lower()
+                
+                try:
+                    with tracing.span("walk_match", directory=self.directory, keyword=self.keyword):
+                        for root, _, files in os.walk(self.directory):
+                            self.token.check()  # Once per directory
+                            for file in files:
+                                try:
+                                    file_path = os.path.join(root, file)
+                                    if keyword in file.lower():
+                                        results.append(file_path)
+                                
+                                    processed_files += 1
+                                    if processed_files % 100 == 0:  # Update progress every 100 files
+                                        self.token.check()
+                                        if total_files:
+                                            self.progress.emit(processed_files, total_files)
+                                except Exception as e:
+                                    print(f"Error processing file {file}: {str(e)}")
+                                    continue
+                    
+                    results = self.filter_media(results)
+                    with tracing.span("emit", results=len(results)):
+                        self.finished.emit(results)
+                except SearchCancelled:
+                    raise
+                except Exception as e:
+                    self.error.emit(f"Error during file search: {str(e)}")
+                
+        except SearchCancelled:
+            raise
+        except Exception as e:
+            self.error.emit(f"Unexpected error: {str(e)}")
+            import traceback
+            print("Full error traceback:")
+            print(traceback.format_exc())
+
+class LiveSearchTask(SearchTask):
+    """Search-as-you-type query, answered from a matcher kept for the current index."""
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+    live = True  # Errors go to the status line instead of a dialog
+
+    def __init__(self, keyword, indexed_files, matchers):
+        super().__init__()
+        self.keyword = keyword
+        self.indexed_files = indexed_files
+        self.version = indexed_files.version
+        self.paths = indexed_files.paths()  # Copied here, on the GUI thread, in case the matcher is rebuilt
+        self.matchers = matchers
+        self.truncated = False  # More than LIVE_SEARCH_MAX_RESULTS matches
+
+    def run(self):
+        try:
+            matcher = self.matchers.get(self.indexed_files, self.version, self.paths)  # Built once per index version
+            self.token.check()
+            with tracing.span("match", keyword=self.keyword, live=True) as span:
+                results = matcher.search(self.keyword, LIVE_SEARCH_MAX_RESULTS + 1)
+                span.set(results=len(results))
+            if len(results) > LIVE_SEARCH_MAX_RESULTS:
+                self.truncated = True
+                del results[LIVE_SEARCH_MAX_RESULTS:]
+            self.token.check()
+            self.finished.emit(results)
+        except SearchCancelled:
+            raise
+        except Exception as e:
+            self.error.emit(f"Error during search: {str(e)}")
+
+class ContentSearchTask(SearchTask):
+    """Searches the contents of indexed files, streaming matches as they are found."""
+    match_found = pyqtSignal(str, list)  # path, [(line, offset, preview), ...]
+    finished = pyqtSignal(int)  # number of matching files
+    error = pyqtSignal(str)
+
+    def __init__(self, sized_paths, pattern, regex=False, extensions=None):
+        super().__init__()
+        self.sized_paths = sized_paths  # Copied from the index on the GUI thread, which updates it
+        self.pattern = pattern
+        self.regex = regex
+        self.extensions = extensions
+
+    def run(self):
+        count = 0
+        try:
+            candidates = select_candidates(self.sized_paths, self.extensions)
+            with tracing.span("content_search", pattern=self.pattern, candidates=len(candidates)):
+                for path, matches in content_search(candidates, self.pattern, self.regex, cancel=self.token):
+                    count += 1
+                    self.match_found.emit(path, matches)
+        except re.error as e:
+            self.error.emit(f"Invalid regular expression: {str(e)}")
+            return
+        except Exception as e:
+            self.error.emit(f"Error during content search: {str(e)}")
+            import traceback
+            print("Full error traceback:")
+            print(traceback.format_exc())
+            return
+        self.token.check()
+        self.finished.emit(count)
+
+class DuplicateTask(SearchTask):
+    """Finds groups of identical files in the index."""
+    finished = pyqtSignal(list)  # list of lists of identical paths
+    progress = pyqtSignal(int, int)  # current, total
+
+    def __init__(self, sized_paths, cache_file):
+        super().__init__()
+        self.sized_paths = sized_paths  # Copied from the index on the GUI thread, which updates it
+        self.cache_file = cache_file
+
+    def run(self):
+        try:
+            cache = HashCache(self.cache_file)
+            with tracing.span("duplicates"):
+                groups = find_duplicates(self.sized_paths, cache,
+                                         progress=lambda stage, done, total: self.progress.emit(done, total),
+                                         cancel=self.token)
+            cache.save()  # Hashes computed before a cancel are still worth keeping
+            self.token.check()
+            self.finished.emit(groups)
+        except SearchCancelled:
+            raise
+        except Exception as e:
+            print(f"Error finding duplicates: {str(e)}")
+            import traceback
+            print("Full error traceback:")
+            print(traceback.format_exc())
+            self.finished.emit([])
+
+class SimilarNamesTask(SearchTask):
+    """Clusters indexed files whose names are nearly the same."""
+    finished = pyqtSignal(list)  # list of lists of similarly named paths
+    progress = pyqtSignal(int, int)  # names done, total
+    error = pyqtSignal(str)
+
+    def __init__(self, paths, threshold):
+        super().__init__()
+        self.paths = paths  # Copied from the index on the GUI thread, which updates it
+        self.threshold = threshold
+
+    def run(self):
+        try:
+            with tracing.span("similar_names", threshold=self.threshold) as span:
+                clusters = find_similar_names(self.paths, self.threshold,
+                                              progress=self.progress.emit, cancel=self.token)
+                span.set(clusters=len(clusters))
+            self.finished.emit(clusters)
+        except SearchCancelled:
+            raise
+        except Exception as e:
+            self.error.emit(f"Error finding similar names: {str(e)}")
+
+class IndexDiffTask(SearchTask):
+    """Compares the index with the generation the last reindex replaced."""
+    finished = pyqtSignal(object)  # IndexDiff, or None when there is no earlier index of the directory
+    error = pyqtSignal(str)
+
+    def __init__(self, indexed_files, directory, snapshot_file, snapshot_saving=None):
+        super().__init__()
+        self.indexed_files = indexed_files  # A FileIndex.copy(), as the GUI thread keeps changing the index
+        self.directory = directory
+        self.snapshot_file = snapshot_file
+        self.snapshot_saving = snapshot_saving  # Future of a snapshot still being written
+
+    def run(self):
+        try:
+            if self.snapshot_saving is not None:
+                self.snapshot_saving.result()
+            snapshot = load_snapshot(self.snapshot_file)
+            if snapshot is None or not is_snapshot_of(snapshot, self.directory):
+                self.finished.emit(None)
+                return
+            self.token.check()
+            self.finished.emit(diff_index(snapshot, self.indexed_files, cancel=self.token))
+        except SearchCancelled:
+            raise
+        except Exception as e:
+            self.error.emit(f"Error comparing with the previous index: {str(e)}")
+
+class FileOperationWorker(QThread):
+    """Runs a single FileJob off the GUI thread."""
+    progress = pyqtSignal(object)  # the running FileJob
+    finished = pyqtSignal(object)  # the finished FileJob
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def run(self):
+        try:
+            self.job.run(self.progress.emit)
+        except Exception as e:
+            self.job.failures.append(("", f"Unexpected error: {str(e)}"))
+            import traceback
+            print("Full error traceback:")
+            print(traceback.format_exc())
+        self.finished.emit(self.job)
+
+class MediaScanWorker(QThread):
+    """Reads image and video metadata for the whole index in the background."""
+    scanned = pyqtSignal(int)  # files with media metadata
+
+    def __init__(self, index, cache):
+        super().__init__()
+        self.index = index
+        self.cache = cache
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    def run(self):
+        try:
+            with tracing.span("media_extract", entries=len(self.index)):
+                found = extract_media(list(self.index), self.cache, self.index, cancel=lambda: self.stopped)
+            self.scanned.emit(sum(1 for info in found.values() if info))
+        except SearchCancelled:
+            pass
+        except Exception as e:
+            print(f"Error reading media metadata: {str(e)}")
+        finally:
+            self.cache.save()  # Keep what was read, even when stopped early
+
+class ExportWorker(QThread):
+    """Writes a result set to a file in the order it is shown."""
+    exported = pyqtSignal(str, int)  # filename, rows written
+    progress = pyqtSignal(int, int)
+    error = pyqtSignal(str)
+
+    def __init__(self, paths, index, filename, fmt, key=None, reverse=False, by_folder=False):
+        super().__init__()
+        self.paths = paths
+        self.index = index
+        self.filename = filename
+        self.fmt = fmt
+        self.key = key
+        self.reverse = reverse
+        self.by_folder = by_folder
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    def run(self):
+        try:
+            with tracing.span("export", format=self.fmt, results=len(self.paths)):
+                paths = self.paths
+                if self.by_folder:
+                    paths = [path for _, group in group_by_directory(paths, self.index, self.key, self.reverse)
+                             for path in group]
+                elif self.key:
+                    paths = sort_results(paths, self.index, self.key, self.reverse)
+                count = export_results(paths, self.filename, self.fmt, self.index,
+                                       progress=self.progress.emit, cancel=lambda: self.stopped)
+            self.exported.emit(self.filename, count)
+        except SearchCancelled:
+            pass
+        except Exception as e:
+            self.error.emit(str(e))
+
+class BackgroundIndexWorker(QThread):
+    """Builds a fresh index at idle priority with paced directory listings, for shared drives."""
+    indexed = pyqtSignal(str, object)  # directory, FileIndex
+    progress = pyqtSignal(int, float)  # files so far, directory listings allowed per second
+    error = pyqtSignal(str)
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        self.throttle = IndexThrottle()
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+        self.throttle.stop()
+
+    def run(self):
+        lower_thread_priority()  # This thread only; it ends with the walk
+        index = FileIndex()
+        try:
+            with tracing.span("index_build", directory=self.directory, background=True) as span:
+                for path, size, mtime, inode in walk_entries(self.directory, self.throttle):
+                    if self.stopped:
+                        return
+                    index.add(path, size, mtime, inode)
+                    if len(index) % BACKGROUND_INDEX_PROGRESS_FILES == 0:
+                        self.progress.emit(len(index), self.throttle.rate)
+                span.set(listings=self.throttle.listings, waited=round(self.throttle.waited, 3))
+        except Exception as e:
+            self.error.emit(str(e))
+            return
+        if not self.stopped:
+            self.indexed.emit(self.directory, index)
+
+class IndexLoadWorker(QThread):
+    """Loads the saved index off the GUI thread so the window can paint first."""
+    loaded = pyqtSignal(object, object)  # directory, FileIndex (None, None when there is no index)
+    error = pyqtSignal(str)
+
+    def __init__(self, index_file):
+        super().__init__()
+        self.index_file = index_file
+        self.discard = False  # Set when a reindex makes this load obsolete
+
+    def run(self):
+        try:
+            directory, index = load_index_file(self.index_file)
+        except Exception as e:
+            self.error.emit(str(e))
+            return
+        self.loaded.emit(directory, index)
+
+class DiskUsageDialog(QDialog):
+    """Folders of the index by cumulative size; expanding one lists its subfolders, biggest first.
+
+    Totals come from a DiskUsage kept up to date by the index, so only the
+    first opening after (re)indexing adds anything up, off the GUI thread.
+    """
+    computed = pyqtSignal()
+    list_files = pyqtSignal(str, bool)  # folder, include subfolders
+
+    def __init__(self, usage, executor, parent=None):
+        super().__init__(parent)
+        self.usage = usage
+        self.executor = executor
+        self.computing = False
+        self.error = None
+        self.setWindowTitle("Disk Usage")
+        self.resize(520, 420)
+        layout = QVBoxLayout(self)
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Folder", "Size", "Files", "Share"])
+        self.tree.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.tree.header().setStretchLastSection(False)
+        self.tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.tree.itemExpanded.connect(self.populate)
+        self.tree.itemDoubleClicked.connect(self.on_double_click)
+        self.tree.customContextMenuRequested.connect(self.show_context_menu)
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: rgba(0, 0, 0, 180); font-size: 10px;")
+        layout.addWidget(self.tree)
+        layout.addWidget(self.status_label)
+        self.computed.connect(self.refresh)
+
+    def refresh(self):
+        """Show the current totals, keeping expanded folders open; adds them up first if needed."""
+        if self.error:
+            self.status_label.setText(f"Error adding up folder sizes: {self.error}")
+            self.error = None
+            return
+        if self.usage.totals is None or self.computing:
+            if not self.computing:
+                self.computing = True
+                self.status_label.setText("Adding up folder sizes...")
+                self.executor.submit(self.compute)
+            return
+        expanded = set()
+        for i in range(self.tree.topLevelItemCount()):
+            self.collect_expanded(self.tree.topLevelItem(i), expanded)
+        self.tree.clear()
+        top = self.usage.top()
+        if top is None:
+            self.status_label.setText("The index is empty")
+            return
+        size, count = self.usage.usage(top)
+        item = self.make_item(top, top, size, count, size)
+        self.tree.addTopLevelItem(item)
+        item.setExpanded(True)
+        self.reexpand(item, expanded)
+        self.status_label.setText(f"{format_bytes(size)} in {count:,} files. Double-click a folder to list its files.")
+
+    def compute(self):
+        try:
+            while True:
+                version = self.usage.index.version
+                self.usage.compute()
+                if self.usage.index.version == version:
+                    break  # Otherwise the index changed before the totals could follow it
+        except Exception as e:
+            self.error = str(e)
+        self.computing = False
+        self.computed.emit()
+
+    def collect_expanded(self, item, expanded):
+        if item.isExpanded():
+            expanded.add(item.data(0, Qt.ItemDataRole.UserRole))
+            for i in range(item.childCount()):
+                self.collect_expanded(item.child(i), expanded)
+
+    def reexpand(self, item, expanded):
+        for i in range(item.childCount()):
+            child = item.child(i)
+            if child.data(0, Qt.ItemDataRole.UserRole) in expanded and child.childCount():
+                child.setExpanded(True)
+                self.reexpand(child, expanded)
+
+    def make_item(self, label, path, size, count, parent_size, own=False):
+        item = QTreeWidgetItem([label, format_bytes(size), f"{count:,}",
+                                f"{100 * size / parent_size:.1f}%" if parent_size else ""])
+        item.setData(0, Qt.ItemDataRole.UserRole, path)
+        item.setData(0, Qt.ItemDataRole.UserRole + 1, own)
+        for column in (1, 2, 3):
+            item.setTextAlignment(column, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        if not own and self.usage.subdirs.get(path):
+            item.addChild(QTreeWidgetItem())  # Placeholder so it can be expanded; filled in by populate
+        return item
+
+    def populate(self, item):
+        """Fill in a folder's subfolders when it is expanded."""
+        if item.childCount() != 1 or item.child(0).data(0, Qt.ItemDataRole.UserRole) is not None:
+            return  # Already filled in
+        placeholder = item.child(0)
+        path = item.data(0, Qt.ItemDataRole.UserRole)
+        size = self.usage.usage(path)[0]
+        children = self.usage.children(path)
+        for child, child_size, child_count in children:
+            item.addChild(self.make_item(os.path.basename(child), child, child_size, child_count, size))
+        own_size, own_count = self.usage.own_usage(path)
+        if own_count and children:
+            item.addChild(self.make_item("(files in this folder)", path, own_size, own_count, size, own=True))
+        item.removeChild(placeholder)
+
+    def selected_folder(self, item):
+        return item.data(0, Qt.ItemDataRole.UserRole), not item.data(0, Qt.ItemDataRole.UserRole + 1)
+
+    def on_double_click(self, item, column):
+        path, recursive = self.selected_folder(item)
+        if path:
+            self.list_files.emit(path, recursive)
+
+    def show_context_menu(self, position):
+        item = self.tree.itemAt(position)
+        if item is None or not item.data(0, Qt.ItemDataRole.UserRole):
+            return
+        path, recursive = self.selected_folder(item)
+        menu = QMenu()
+        list_action = menu.addAction("List files")
+        open_action = menu.addAction("Show in File Manager")
+        action = menu.exec(self.tree.viewport().mapToGlobal(position))
+        if action == list_action:
+            self.list_files.emit(path, recursive)
+        elif action == open_action:
+            open_file_explorer(path)
+
+class FileSearchWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("File Search - Frosted Glass")
+        self.setGeometry(100, 100, 500, 500)
+        self.setWindowOpacity(0.95)
+        
+        # Initialize UI elements first
+        self.central_widget = QWidget(self)
+        self.setCentralWidget(self.central_widget)
+        self.layout = QVBoxLayout(self.central_widget)
+        self.layout.setContentsMargins(10, 10, 10, 10)
+        self.layout.setSpacing(8)
+        
+        # Directory Row
+        dir_row = QHBoxLayout()
+        dir_row.setSpacing(4)
+        self.dir_label = QLabel("Directory:")
+        self.dir_label.setStyleSheet("color: rgba(0, 0, 0, 180);")
+        self.dir_input = QLineEdit()
+        self.browse_btn = AeroButton("Browse")
+        self.index_btn = AeroButton("Reindex")
+        self.changes_btn = AeroButton("Changes")
+        self.changes_btn.setToolTip("List files added, modified or removed since the previous reindex")
+        self.background_check = QCheckBox("Gently")
+        self.background_check.setToolTip("Reindex in the background at idle priority, pacing folder listings "
+                                         "and slowing down when the drive is busy. For shared drives.")
+        self.background_check.setStyleSheet("color: rgba(0, 0, 0, 180); font-size: 10px;")
+        
+        # Set fixed widths and styles for directory buttons
+        for btn in [self.browse_btn, self.index_btn, self.changes_btn]:
+            btn.setFixedWidth(60)
+            btn.setFixedHeight(20)
+            btn.setStyleSheet("""
+                QPushButton {
+                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
+                        stop:0 rgba(255, 255, 255, 180),
+                        stop:0.3 rgba(220, 240, 255, 140),
+                        stop:0.6 rgba(200, 230, 255, 120),
+                        stop:1 rgba(180, 220, 255, 100));
+                    border: 1px solid rgba(255, 255, 255, 180);
+                    border-radius: 3px;
+                    padding: 4px;
+                    color: rgba(0, 0, 0, 180);
+                    font-weight: bold;
+                    font-size: 10px;
+                }
+                QPushButton:hover {
+                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 rgba(255, 255, 255, 220),
+                        stop:0.3 rgba(230, 245, 255, 180),
+                        stop:0.6 rgba(210, 235, 255, 160),
+                        stop:1 rgba(190, 225, 255, 140));
+                    border: 1px solid rgba(255, 255, 255, 220);
+                }
+            """)
+        
+        # Connect directory buttons
+        self.browse_btn.clicked.connect(self.on_browse)
+        self.index_btn.clicked.connect(self.on_index)
+        self.changes_btn.clicked.connect(self.on_show_changes)
+        
+        dir_row.addWidget(self.dir_label)
+        dir_row.addWidget(self.dir_input)
+        dir_row.addWidget(self.browse_btn)
+        dir_row.addWidget(self.index_btn)
+        dir_row.addWidget(self.background_check)
+        dir_row.addWidget(self.changes_btn)
+        self.layout.addLayout(dir_row)
+        
+        # Status Label
+        self.status_label = AnimatedLabel("No index loaded")
+        self.status_label.setStyleSheet("""
+            QLabel {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(200, 220, 255, 160),
+                    stop:0.3 rgba(180, 210, 255, 140),
+                    stop:0.6 rgba(160, 200, 255, 120),
+                    stop:1 rgba(140, 190, 255, 100));
+                padding: 4px;
+                border-radius: 3px;
+                border: 1px solid rgba(255, 255, 255, 180);
+                color: rgba(0, 0, 0, 200);
+                font-weight: bold;
+                font-size: 10px;
+            }
+        """)
+        self.layout.addWidget(self.status_label)
+        
+        # Search Row
+        search_row = QHBoxLayout()
+        search_row.setSpacing(4)
+        self.search_label = QLabel("Search:")
+        self.search_label.setStyleSheet("color: rgba(0, 0, 0, 180);")
+        self.search_input = QLineEdit()
+        self.search_input.returnPressed.connect(self.on_search)  # Add Enter key functionality
+        self.search_input.textEdited.connect(self.on_search_text_edited)
+        self.live_timer = QTimer(self)  # Debounces search-as-you-type
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_SEARCH_DELAY_MS)
+        self.live_timer.timeout.connect(self.on_live_search)
+        self.content_check = QCheckBox("Contents")
+        self.content_check.setToolTip("Search inside files. Wrap the query in /slashes/ for a regular expression.")
+        self.content_check.setStyleSheet("color: rgba(0, 0, 0, 180); font-size: 10px;")
+        self.ext_input = QLineEdit()
+        self.ext_input.setPlaceholderText("txt log")
+        self.ext_input.setToolTip("Only search inside files with these extensions")
+        self.ext_input.setFixedWidth(70)
+        self.ext_input.setVisible(False)
+        self.ext_input.returnPressed.connect(self.on_search)
+        self.content_check.toggled.connect(self.ext_input.setVisible)
+        self.search_btn = AnimatedButton("Search")
+        self.search_btn.setFixedWidth(60)
+        self.search_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
+                    stop:0 rgba(255, 255, 255, 180),
+                    stop:0.3 rgba(220, 240, 255, 140),
+                    stop:0.6 rgba(200, 230, 255, 120),
+                    stop:1 rgba(180, 220, 255, 100));
+                border: 1px solid rgba(255, 255, 255, 180);
+                border-radius: 3px;
+                padding: 4px;
+                color: rgba(0, 0, 0, 180);
+                font-weight: bold;
+                font-size: 10px;
+                min-height: 20px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(255, 255, 255, 220),
+                    stop:0.3 rgba(230, 245, 255, 180),
+                    stop:0.6 rgba(210, 235, 255, 160),
+                    stop:1 rgba(190, 225, 255, 140));
+                border: 1px solid rgba(255, 255, 255, 220);
+            }
+        """)
+        self.cancel_btn = AnimatedButton("Cancel")
+        self.cancel_btn.setFixedWidth(60)
+        self.cancel_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
+                    stop:0 rgba(255, 255, 255, 180),
+                    stop:0.3 rgba(220, 240, 255, 140),
+                    stop:0.6 rgba(200, 230, 255, 120),
+                    stop:1 rgba(180, 220, 255, 100));
+                border: 1px solid rgba(255, 255, 255, 180);
+                border-radius: 3px;
+                padding: 4px;
+                color: rgba(0, 0, 0, 180);
+                font-weight: bold;
+                font-size: 10px;
+                min-height: 20px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(255, 255, 255, 220),
+                    stop:0.3 rgba(230, 245, 255, 180),
+                    stop:0.6 rgba(210, 235, 255, 160),
+                    stop:1 rgba(190, 225, 255, 140));
+                border: 1px solid rgba(255, 255, 255, 220);
+            }
+        """)
+        self.cancel_btn.setVisible(False)
+        search_row.addWidget(self.search_label)
+        search_row.addWidget(self.search_input)
+        search_row.addWidget(self.ext_input)
+        search_row.addWidget(self.content_check)
+        search_row.addWidget(self.search_btn)
+        search_row.addWidget(self.cancel_btn)
+        self.layout.addLayout(search_row)
+        
+        # Add progress bar
+        self.progress_bar = AnimatedProgressBar()
+        self.progress_bar.setFixedHeight(4)
+        self.progress_bar.hide()
+        self.layout.addWidget(self.progress_bar)
+        
+        # Result ordering, grouping and paging
+        results_row = QHBoxLayout()
+        results_row.setSpacing(4)
+        self.saved_combo = QComboBox()
+        self.saved_combo.setStyleSheet("font-size: 10px;")
+        self.saved_combo.setMinimumWidth(140)
+        self.saved_combo.setToolTip("Open a saved search; right-click to remove one")
+        self.saved_combo.activated.connect(self.on_saved_search_selected)
+        self.saved_combo.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.saved_combo.customContextMenuRequested.connect(self.show_saved_menu)
+        self.save_search_btn = AeroButton("Save")
+        self.save_search_btn.setFixedWidth(40)
+        self.save_search_btn.setFixedHeight(20)
+        self.save_search_btn.setToolTip("Save the current name search")
+        self.save_search_btn.clicked.connect(self.on_save_search)
+        self.sort_label = QLabel("Sort:")
+        self.sort_label.setStyleSheet("color: rgba(0, 0, 0, 180); font-size: 10px;")
+        self.sort_combo = QComboBox()
+        for label, key, reverse in SORT_OPTIONS:
+            self.sort_combo.addItem(label, (key, reverse))
+        self.sort_combo.setStyleSheet("font-size: 10px;")
+        self.group_check = QCheckBox("Group by folder")
+        self.group_check.setStyleSheet("color: rgba(0, 0, 0, 180); font-size: 10px;")
+        self.preview_check = QCheckBox("Preview")
+        self.preview_check.setToolTip("Show a thumbnail and details of the selected file")
+        self.preview_check.setStyleSheet("color: rgba(0, 0, 0, 180); font-size: 10px;")
+        self.preview_check.toggled.connect(self.on_preview_toggled)
+        self.page_label = QLabel("")
+        self.page_label.setStyleSheet("color: rgba(0, 0, 0, 180); font-size: 10px;")
+        self.page_prev_btn = AeroButton("<")
+        self.page_next_btn = AeroButton(">")
+        for btn in [self.page_prev_btn, self.page_next_btn]:
+            btn.setFixedWidth(28)
+            btn.setFixedHeight(20)
+        self.sort_combo.currentIndexChanged.connect(self.on_sort_changed)
+        self.group_check.toggled.connect(self.on_sort_changed)
+        self.page_prev_btn.clicked.connect(lambda: self.on_page(-1))
+        self.page_next_btn.clicked.connect(lambda: self.on_page(1))
+        results_row.addWidget(self.saved_combo)
+        results_row.addWidget(self.save_search_btn)
+        results_row.addWidget(self.sort_label)
+        results_row.addWidget(self.sort_combo)
+        results_row.addWidget(self.group_check)
+        results_row.addWidget(self.preview_check)
+        results_row.addStretch()
+        results_row.addWidget(self.page_prev_btn)
+        results_row.addWidget(self.page_label)
+        results_row.addWidget(self.page_next_btn)
+        self.page_widgets = [self.page_prev_btn, self.page_label, self.page_next_btn]
+        for widget in self.page_widgets:
+            widget.hide()
+        self.layout.addLayout(results_row)
+        
+        # Results List
+        self.results_list = AnimatedListWidget()
+        self.results_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.results_list.itemDoubleClicked.connect(self.on_select)
+        self.results_list.setStyleSheet("""
+            QListWidget {
+                background: rgba(60, 64, 72, 120);
+                border: 1px solid rgba(255, 255, 255, 180);
+                border-radius: 3px;
+                color: rgba(0, 0, 0, 180);
+            }
+            QWidget {
+                background: transparent;
+            }
+            QLabel {
+                color: rgba(0, 0, 0, 180);
+                padding: 1px;
+                font-size: 11px;
+            }
+            QListWidget::item {
+                background: transparent;
+                border-radius: 2px;
+                padding: 2px;
+            }
+            QListWidget::item:selected {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(200, 220, 255, 180),
+                    stop:1 rgba(180, 200, 255, 140));
+            }
+            QListWidget::item:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(220, 240, 255, 180),
+                    stop:1 rgba(200, 230, 255, 140));
+            }
+            /* Custom Scrollbar Styling */
+            QScrollBar:vertical {
+                border: none;
+                background: rgba(60, 64, 72, 40);
+                width: 8px;
+                margin: 0px;
+                border-radius: 4px;
+            }
+            QScrollBar::handle:vertical {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 rgba(100, 104, 112, 180),
+                    stop:0.5 rgba(80, 84, 92, 160),
+                    stop:1 rgba(60, 64, 72, 180));
+                min-height: 20px;
+                border-radius: 4px;
+                border: 1px solid rgba(255, 255, 255, 180);
+            }
+            QScrollBar::handle:vertical:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 rgba(120, 124, 132, 200),
+                    stop:0.5 rgba(100, 104, 112, 180),
+                    stop:1 rgba(80, 84, 92, 200));
+            }
+            QScrollBar::handle:vertical:pressed {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 rgba(80, 84, 92, 160),
+                    stop:0.5 rgba(60, 64, 72, 140),
+                    stop:1 rgba(40, 44, 52, 160));
+            }
+            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+                height: 0px;
+            }
+            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
+                background: none;
+            }
+            QScrollBar:horizontal {
+                border: none;
+                background: rgba(60, 64, 72, 40);
+                height: 8px;
+                margin: 0px;
+                border-radius: 4px;
+            }
+            QScrollBar::handle:horizontal {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(100, 104, 112, 180),
+                    stop:0.5 rgba(80, 84, 92, 160),
+                    stop:1 rgba(60, 64, 72, 180));
+                min-width: 20px;
+                border-radius: 4px;
+                border: 1px solid rgba(255, 255, 255, 180);
+            }
+            QScrollBar::handle:horizontal:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(120, 124, 132, 200),
+                    stop:0.5 rgba(100, 104, 112, 180),
+                    stop:1 rgba(80, 84, 92, 200));
+            }
+            QScrollBar::handle:horizontal:pressed {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(80, 84, 92, 160),
+                    stop:0.5 rgba(60, 64, 72, 140),
+                    stop:1 rgba(40, 44, 52, 160));
+            }
+            QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {
+                width: 0px;
+            }
+            QScrollBar::add-page:horizontal, QScrollBar::sub-page:horizontal {
+                background: none;
+            }
+        """)
+        self.layout.addWidget(self.results_list)
+        self.results_list.currentItemChanged.connect(self.on_current_result_changed)
+        self.results_list.verticalScrollBar().valueChanged.connect(self.schedule_thumbnails)
+        
+        # Preview of the selected result; thumbnails are made off the GUI thread
+        self.preview_pane = PreviewPane()
+        self.preview_pane.hide()
+        self.layout.addWidget(self.preview_pane)
+        self.thumbnail_store = ThumbnailStore('file_index_thumbnails')
+        self.thumbnail_loader = None  # Started the first time the preview is shown
+        self.pixmap_cache = PixmapCache()
+        self.preview_path = None
+        self.preview_extensions = {'.' + bytes(fmt).decode().lower() for fmt in QImageReader.supportedImageFormats()}
+        self.preview_timer = QTimer(self)  # Coalesces scroll events into one thumbnail request
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(50)
+        self.preview_timer.timeout.connect(self.request_thumbnails)
+        
+        # Action Buttons
+        action_row = QHBoxLayout()
+        action_row.setSpacing(4)
+        self.select_all_btn = AeroButton("Select All")
+        self.copy_btn = AeroButton("Copy")
+        self.move_btn = AeroButton("Move")
+        self.delete_btn = AeroButton("Delete")
+        self.duplicates_btn = AeroButton("Duplicates")
+        self.similar_btn = AeroButton("Similar")
+        self.similar_btn.setToolTip("Group files with nearly the same name")
+        self.usage_btn = AeroButton("Usage")
+        self.usage_btn.setToolTip("Browse folders by the space their indexed files take up")
+        self.export_btn = AeroButton("Export")
+        self.export_btn.setToolTip("Save all results, with sizes and dates, as NUL-separated paths, CSV or JSON lines")
+        self.help_btn = AeroButton("?")
+        
+        # Set fixed widths and styles for action buttons
+        for btn in [self.copy_btn, self.move_btn, self.delete_btn, self.duplicates_btn, self.similar_btn,
+                    self.usage_btn, self.export_btn]:
+            btn.setFixedWidth(60)
+            btn.setStyleSheet("""
+                QPushButton {
+                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
+                        stop:0 rgba(255, 255, 255, 180),
+                        stop:0.3 rgba(220, 240, 255, 140),
+                        stop:0.6 rgba(200, 230, 255, 120),
+                        stop:1 rgba(180, 220, 255, 100));
+                    border: 1px solid rgba(255, 255, 255, 180);
+                    border-radius: 3px;
+                    padding: 4px;
+                    color: rgba(0, 0, 0, 180);
+                    font-weight: bold;
+                    font-size: 10px;
+                    min-height: 20px;
+                }
+                QPushButton:hover {
+                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 rgba(255, 255, 255, 220),
+                        stop:0.3 rgba(230, 245, 255, 180),
+                        stop:0.6 rgba(210, 235, 255, 160),
+                        stop:1 rgba(190, 225, 255, 140));
+                    border: 1px solid rgba(255, 255, 255, 220);
+                }
+            """)
+        
+        self.duplicates_btn.setFixedWidth(70)
+        
+        # Special styling for Select All button with smaller text
+        self.select_all_btn.setFixedWidth(70)  # Slightly wider for the text
+        self.select_all_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
+                    stop:0 rgba(255, 255, 255, 180),
+                    stop:0.3 rgba(220, 240, 255, 140),
+                    stop:0.6 rgba(200, 230, 255, 120),
+                    stop:1 rgba(180, 220, 255, 100));
+                border: 1px solid rgba(255, 255, 255, 180);
+                border-radius: 3px;
+                padding: 4px;
+                color: rgba(0, 0, 0, 180);
+                font-weight: bold;
+                font-size: 9px;
+                min-height: 20px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(255, 255, 255, 220),
+                    stop:0.3 rgba(230, 245, 255, 180),
+                    stop:0.6 rgba(210, 235, 255, 160),
+                    stop:1 rgba(190, 225, 255, 140));
+                border: 1px solid rgba(255, 255, 255, 220);
+            }
+        """)
+        
+        # Help button styling
+        self.help_btn.setFixedSize(24, 24)
+        self.help_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
+                    stop:0 rgba(255, 255, 255, 180),
+                    stop:0.3 rgba(220, 240, 255, 140),
+                    stop:0.6 rgba(200, 230, 255, 120),
+                    stop:1 rgba(180, 220, 255, 100));
+                border: 1px solid rgba(255, 255, 255, 180);
+                border-radius: 12px;
+                padding: 0px;
+                color: rgba(0, 0, 0, 180);
+                font-weight: bold;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(255, 255, 255, 220),
+                    stop:0.3 rgba(230, 245, 255, 180),
+                    stop:0.6 rgba(210, 235, 255, 160),
+                    stop:1 rgba(190, 225, 255, 140));
+                border: 1px solid rgba(255, 255, 255, 220);
+            }
+        """)
+        self.help_btn.clicked.connect(self.show_help)
+        
+        # Connect action buttons
+        self.select_all_btn.clicked.connect(self.on_select_all)
+        self.copy_btn.clicked.connect(self.on_copy)
+        self.move_btn.clicked.connect(self.on_move)
+        self.delete_btn.clicked.connect(self.on_delete)
+        self.duplicates_btn.clicked.connect(self.on_find_duplicates)
+        self.similar_btn.clicked.connect(self.on_find_similar)
+        self.usage_btn.clicked.connect(self.on_disk_usage)
+        self.export_btn.clicked.connect(self.on_export)
+        self.search_btn.clicked.connect(self.on_search)
+        self.cancel_btn.clicked.connect(self.cancel_search)
+        
+        action_row.addWidget(self.select_all_btn)
+        action_row.addWidget(self.copy_btn)
+        action_row.addWidget(self.move_btn)
+        action_row.addWidget(self.delete_btn)
+        action_row.addWidget(self.duplicates_btn)
+        action_row.addWidget(self.similar_btn)
+        action_row.addWidget(self.usage_btn)
+        action_row.addWidget(self.export_btn)
+        action_row.addStretch()  # Add stretch to push help button to the right
+        action_row.addWidget(self.help_btn)
+        self.layout.addLayout(action_row)
+        
+        # File operation progress row (hidden while no job is running)
+        job_row = QHBoxLayout()
+        job_row.setSpacing(4)
+        self.job_label = QLabel("")
+        self.job_label.setStyleSheet("color: rgba(0, 0, 0, 180); font-size: 10px;")
+        self.job_progress = AnimatedProgressBar()
+        self.job_progress.setFixedHeight(12)
+        self.job_progress.setRange(0, 1000)
+        self.job_pause_btn = AeroButton("Pause")
+        self.job_cancel_btn = AeroButton("Stop")
+        for btn in [self.job_pause_btn, self.job_cancel_btn]:
+            btn.setFixedWidth(50)
+            btn.setFixedHeight(20)
+        self.job_pause_btn.clicked.connect(self.on_job_pause)
+        self.job_cancel_btn.clicked.connect(self.on_job_cancel)
+        job_row.addWidget(self.job_label)
+        job_row.addWidget(self.job_progress)
+        job_row.addWidget(self.job_pause_btn)
+        job_row.addWidget(self.job_cancel_btn)
+        self.job_widgets = [self.job_label, self.job_progress, self.job_pause_btn, self.job_cancel_btn]
+        for widget in self.job_widgets:
+            widget.hide()
+        self.layout.addLayout(job_row)
+        
+        # Queue of pending file operations, run one at a time in a worker thread
+        self.file_jobs = []
+        self.file_worker = None
+        
+        # Initialize indexing data after UI elements
+        self.index_file = 'file_index.json'
+        self.hash_cache_file = 'file_index_hashes.json'
+        self.media_cache_file = media_cache_path(self.index_file)
+        self.snapshot_file = snapshot_path(self.index_file)  # The index before the last reindex
+        self.snapshot_saving = None  # Future while it is being written
+        self.media_cache = MediaCache(self.media_cache_file)  # Shared by the media scan and searches
+        self.media_scanner = None
+        self.retired_workers = set()  # Stopped threads still finishing, kept alive until they do
+        self.indexed_files = FileIndex()
+        self.indexed_directory = None
+        self.index_loader = None
+        self.background_indexer = None
+        self.exporter = None
+        self.search_pending = False  # A search asked for while the index was still loading
+        
+        # Searches run on long-lived threads; a new search cancels the previous one
+        self.search_executor = SearchExecutor(parent=self)
+        
+        # Results of the last search; only the current page of them is in results_list
+        self.search_results = []
+        self.results_sortable = True
+        self.results_page = 0
+        self.grouped_rows = None  # Flattened folder headings and paths while grouping
+        self.result_groups = None  # [(heading, paths)] for results that come grouped, e.g. similar names
+        self.similar_threshold = SIMILAR_NAMES_THRESHOLD
+        self.live_matchers = MatcherCache()  # For search-as-you-type
+        
+        # Saved searches live in the index file and follow its changes
+        self.saved_searches = SavedSearches(self.indexed_files)
+        self.saved_searches_dirty = False  # "Seen" state changed since the index was saved
+        # Folder sizes follow the index the same way
+        self.disk_usage = DiskUsage(self.indexed_files)
+        self.disk_usage_dialog = None
+        self.update_saved_menu()
+        
+        # Snowflake animation properties
+        self.snowflakes = []
+        self.snowflake_count = 50  # More snowflakes for better effect
+        self.animation_timer = QTimer(self)
+        self.animation_timer.timeout.connect(self.update_snowflakes)
+        self.animation_timer.start(16)  # ~60 FPS
+        
+        # Initialize snowflakes with random positions and velocities
+        for _ in range(self.snowflake_count):
+            snowflake = {
+                'x': random.randint(0, self.width()),
+                'y': random.randint(-100, 0),  # Start above the window
+                'size': random.randint(2, 6),  # Smaller sizes for snowflakes
+                'speed': random.uniform(1, 3),  # Falling speed
+                'sway': random.uniform(-1, 1),  # Sideways movement
+                'sway_speed': random.uniform(0.02, 0.05)  # Speed of swaying
+            }
+            self.snowflakes.append(snowflake)
+            
+        # Performance overlay, toggled with F12
+        self.last_search_latency = None
+        self.search_started = None
+        self.hud = PerformanceHUD(self)
+        self.hud_shortcut = QShortcut(QKeySequence("F12"), self)
+        self.hud_shortcut.activated.connect(self.hud.toggle)
+            
+        # Load the index in the background once the window is up
+        self.first_paint_done = False
+        QTimer.singleShot(0, self.load_index)
+
+    def update_snowflakes(self):
+        """Update snowflake positions and handle falling animation."""
+        for snowflake in self.snowflakes:
+            # Update position
+            snowflake['y'] += snowflake['speed']
+            snowflake['x'] += snowflake['sway'] * math.sin(snowflake['y'] * snowflake['sway_speed'])
+            
+            # Reset snowflake when it goes below the window
+            if snowflake['y'] > self.height():
+                snowflake['y'] = random.randint(-100, 0)
+                snowflake['x'] = random.randint(0, self.width())
+        
+        self.update()  # Trigger repaint
+
+    def paintEvent(self, event):
+        """Time the frame for the performance overlay when it is shown."""
+        if not self.first_paint_done:
+            self.first_paint_done = True
+            startup_probe("first_paint")
+        if not self.hud.isVisible():
+            self.paint_window()
+            return
+        start = time.perf_counter()
+        self.paint_window()
+        self.hud.record_frame(time.perf_counter() - start)
+
+    def paint_window(self):
+        """Custom painting for futuristic glass and metal interface."""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        
+        # Futuristic base gradient with metallic tint
+        gradient = QLinearGradient(0, 0, 0, self.height())
+        gradient.setColorAt(0, QColor(240, 245, 255, 220))  # Brighter top
+        gradient.setColorAt(0.3, QColor(230, 240, 250, 200))
+        gradient.setColorAt(0.6, QColor(220, 235, 250, 180))
+        gradient.setColorAt(1, QColor(210, 230, 250, 160))
+        painter.fillRect(self.rect(), gradient)
+        
+        # Metallic frame effect
+        frame_gradient = QLinearGradient(0, 0, 0, self.height())
+        frame_gradient.setColorAt(0, QColor(200, 220, 255, 100))
+        frame_gradient.setColorAt(0.5, QColor(180, 200, 255, 80))
+        frame_gradient.setColorAt(1, QColor(160, 180, 255, 60))
+        painter.setPen(QPen(frame_gradient, 2))
+        painter.drawRect(self.rect().adjusted(1, 1, -1, -1))
+        
+        # Draw snowflakes
+        painter.setPen(QPen(QColor(255, 255, 255, 180), 1))
+        for snowflake in self.snowflakes:
+            # Draw a simple snowflake shape
+            x, y = int(snowflake['x']), int(snowflake['y'])
+            size = int(snowflake['size'])
+            
+            # Main snowflake body
+            painter.drawLine(x, y - size, x, y + size)
+            painter.drawLine(x - size, y, x + size, y)
+            
+            # Diagonal lines
+            painter.drawLine(x - size//2, y - size//2, x + size//2, y + size//2)
+            painter.drawLine(x - size//2, y + size//2, x + size//2, y - size//2)
+            
+            # Add some sparkle
+            painter.drawPoint(x, y)
+        
+        # Enhanced top glass highlight with metallic tint
+        highlight = QLinearGradient(0, 0, 0, 150)
+        highlight.setColorAt(0, QColor(255, 255, 255, 100))  # Brighter highlight
+        highlight.setColorAt(0.3, QColor(220, 240, 255, 80))
+        highlight.setColorAt(0.6, QColor(200, 220, 255, 60))
+        highlight.setColorAt(1, QColor(180, 200, 255, 0))
+        painter.fillRect(QRectF(0, 0, self.width(), 150), highlight)
+        
+        # Futuristic bottom reflection with metallic effect
+        bottom_reflection = QLinearGradient(0, self.height() - 100, 0, self.height())
+        bottom_reflection.setColorAt(0, QColor(180, 200, 255, 0))
+        bottom_reflection.setColorAt(0.7, QColor(160, 180, 255, 30))
+        bottom_reflection.setColorAt(1, QColor(140, 160, 255, 50))
+        painter.fillRect(QRectF(0, self.height() - 100, self.width(), 100), bottom_reflection)
+        
+        # Metallic corner accents
+        corner_size = 30
+        corner_gradient = QRadialGradient(corner_size, corner_size, corner_size, corner_size, corner_size)
+        corner_gradient.setColorAt(0, QColor(200, 220, 255, 80))
+        corner_gradient.setColorAt(0.5, QColor(180, 200, 255, 40))
+        corner_gradient.setColorAt(1, QColor(160, 180, 255, 0))
+        painter.setBrush(corner_gradient)
+        painter.drawEllipse(0, 0, corner_size * 2, corner_size * 2)
+        painter.drawEllipse(self.width() - corner_size * 2, 0, corner_size * 2, corner_size * 2)
+        
+        # Futuristic shine effects
+        shine = QLinearGradient(0, 0, self.width(), 0)
+        shine.setColorAt(0, QColor(255, 255, 255, 0))
+        shine.setColorAt(0.3, QColor(220, 240, 255, 40))
+        shine.setColorAt(0.7, QColor(200, 220, 255, 40))
+        shine.setColorAt(1, QColor(180, 200, 255, 0))
+        painter.fillRect(QRectF(0, 0, self.width(), 3), shine)
+        
+        # Vertical metallic accent
+        v_shine = QLinearGradient(0, 0, 0, self.height())
+        v_shine.setColorAt(0, QColor(200, 220, 255, 0))
+        v_shine.setColorAt(0.3, QColor(180, 200, 255, 30))
+        v_shine.setColorAt(0.7, QColor(160, 180, 255, 30))
+        v_shine.setColorAt(1, QColor(140, 160, 255, 0))
+        painter.fillRect(QRectF(0, 0, 3, self.height()), v_shine)
+        
+        # Futuristic bottom edge
+        bottom_edge = QLinearGradient(0, self.height() - 3, 0, self.height())
+        bottom_edge.setColorAt(0, QColor(180, 200, 255, 60))
+        bottom_edge.setColorAt(1, QColor(160, 180, 255, 80))
+        painter.fillRect(QRectF(0, self.height() - 3, self.width(), 3), bottom_edge)
+
+    def load_index(self):
+        """Start loading the index from the JSON file; searches wait until it is ready."""
+        self.index_loader = IndexLoadWorker(self.index_file)
+        self.index_loader.loaded.connect(self.on_index_loaded)
+        self.index_loader.error.connect(self.on_index_load_error)
+        self.index_loader.start()
+        self.status_label.setText("Loading index...")
+
+    def index_loading(self):
+        return self.index_loader is not None and not self.index_loader.discard
+
+    def finish_index_load(self):
+        """Drop the finished loader; False if its result should be ignored."""
+        loader = self.index_loader
+        self.index_loader = None
+        loader.wait()  # run() has emitted its result, so this returns at once
+        return not loader.discard
+
+    def on_index_loaded(self, directory, index):
+        if not self.finish_index_load():
+            self.run_pending_search()  # Superseded by a reindex started while loading
+            return
+        if index is not None:
+            self.indexed_files = index
+            self.indexed_directory = directory
+            self.saved_searches.attach(index)
+            self.disk_usage.attach(index, directory)
+            self.update_saved_menu()
+            self.warm_live_matcher()
+            self.start_media_scan()
+            if self.indexed_directory:
+                if not self.dir_input.text():
+                    self.dir_input.setText(self.indexed_directory)
+                self.status_label.setText(f"Loaded index: {len(self.indexed_files)} files")
+        else:
+            self.status_label.setText("Ready")
+        startup_probe("index_ready")
+        self.run_pending_search()
+
+    def on_index_load_error(self, error_message):
+        if not self.finish_index_load():
+            self.run_pending_search()
+            return
+        print(f"Error loading index: {error_message}")
+        self.indexed_files = FileIndex()
+        self.indexed_directory = None
+        self.saved_searches.attach(self.indexed_files)
+        self.disk_usage.attach(self.indexed_files)
+        self.status_label.setText("Ready")
+        startup_probe("index_ready")
+        self.run_pending_search()
+
+    def run_pending_search(self):
+        if self.search_pending:
+            self.search_pending = False
+            self.on_search()
+
+    def save_index(self):
+        """Save the current index to the JSON file."""
+        try:
+            save_index_file(self.index_file, self.indexed_directory, self.indexed_files)
+            self.saved_searches_dirty = False
+        except Exception as e:
+            print(f"Error saving index: {str(e)}")
+
+    def on_search(self):
+        self.live_timer.stop()  # Enter or the button replaces a pending live search
+        if self.index_loading():
+            # Run it as soon as the index is ready rather than walking the directory now
+            self.search_pending = True
+            self.status_label.setText("Loading index... the search will start when it is ready")
+            return
+        try:
+            self.clear_results()
+            directory = self.dir_input.text()
+            keyword = self.search_input.text()
+            
+            if not directory:
+                QMessageBox.warning(self, "Search Error", "Please enter a directory path")
+                return
+                
+            if not os.path.exists(directory):
+                QMessageBox.warning(self, "Search Error", f"Directory '{directory}' does not exist")
+                return
+                
+            if not os.access(directory, os.R_OK):
+                QMessageBox.warning(self, "Search Error", f"No read permission for directory '{directory}'")
+                return
+            
+            # Auto-index if directory changed
+            if directory != self.indexed_directory:
+                self.index_directory(directory)
+                
+            if self.content_check.isChecked():
+                self.start_content_search(keyword)
+                return
+                
+            # Start animations
+            self.search_started = time.perf_counter()
+            self.search_btn.start_pulse()
+            self.search_btn.setEnabled(False)
+            self.search_btn.setText("Searching...")
+            self.progress_bar.setValue(0)
+            self.progress_bar.show()
+            self.progress_bar.start_wave()
+            self.cancel_btn.setVisible(True)
+            
+            # Queue the search; this cancels any search still running
+            self.start_name_search(NameSearchTask(directory, keyword, self.indexed_files.copy(), self.index_file,
+                                                  media_cache=self.media_cache))
+            
+        except Exception as e:
+            QMessageBox.warning(self, "Search Error", f"An error occurred during search: {str(e)}")
+            import traceback
+            print("Full error traceback:")
+            print(traceback.format_exc())
+            
+    def start_content_search(self, keyword):
+        """Search file contents, adding rows as matching files are found."""
+        if not keyword:
+            QMessageBox.warning(self, "Search Error", "Please enter text to search for")
+            return
+        regex = len(keyword) > 2 and keyword.startswith('/') and keyword.endswith('/')
+        pattern = keyword[1:-1] if regex else keyword
+        
+        self.search_btn.start_pulse()
+        self.search_btn.setEnabled(False)
+        self.search_btn.setText("Searching...")
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.progress_bar.start_wave()
+        self.cancel_btn.setVisible(True)
+        
+        task = ContentSearchTask(self.indexed_files.sized_paths(), pattern, regex, parse_extensions(self.ext_input.text()))
+        task.match_found.connect(self.on_content_match)
+        task.finished.connect(self.on_content_search_complete)
+        task.error.connect(self.on_search_error)
+        self.search_executor.submit(task)
+
+    def warm_live_matcher(self):
+        """Build the search-as-you-type matcher in the background so the first keystroke doesn't wait."""
+        if self.indexed_files:
+            self.search_executor.pool.submit(self.live_matchers.get, self.indexed_files,
+                                             self.indexed_files.version, self.indexed_files.paths())
+
+    def start_media_scan(self):
+        """(Re)read media metadata for the current index in the background."""
+        self.stop_media_scan()
+        if not self.indexed_files:
+            return
+        self.media_scanner = MediaScanWorker(self.indexed_files, self.media_cache)
+        self.media_scanner.scanned.connect(self.on_media_scanned)
+        self.media_scanner.start(QThread.Priority.LowPriority)
+
+    def stop_media_scan(self):
+        if self.media_scanner is not None:
+            self.retire_worker(self.media_scanner)  # In-flight header reads finish in the background
+            self.media_scanner = None
+
+    def retire_worker(self, worker):
+        """Stop a worker thread without waiting for it; it stays referenced until it has finished."""
+        worker.stop()
+        if worker.isRunning():
+            self.retired_workers.add(worker)
+            worker.finished.connect(lambda: self.retired_workers.discard(worker))
+
+    def on_media_scanned(self, count):
+        scanner = self.sender()
+        if scanner is not self.media_scanner:
+            return
+        if self.results_sortable and self.sort_combo.currentData()[0] in MEDIA_SORT_KEYS and self.search_results:
+            self.grouped_rows = None
+            self.render_results_page()  # The order may have changed now that more is known
+
+    def on_preview_toggled(self, checked):
+        self.preview_pane.setVisible(checked)
+        if checked:
+            if self.thumbnail_loader is None:
+                self.thumbnail_loader = ThumbnailLoader(self.thumbnail_store, parent=self)
+                self.thumbnail_loader.ready.connect(self.on_thumbnail_ready)
+            self.on_current_result_changed(self.results_list.currentItem(), None)
+        elif self.thumbnail_loader is not None:
+            self.thumbnail_loader.request([])
+
+    def on_current_result_changed(self, current, previous):
+        """Show the current row in the preview pane; its thumbnail is never decoded here."""
+        if not self.preview_check.isChecked():
+            return
+        path = self.results_list.path_at(self.results_list.row(current)) if current is not None else None
+        self.preview_path = path
+        if path is None:
+            self.preview_pane.show_file("")
+            return
+        details = [f"<b>{html.escape(os.path.basename(path))}</b>", html.escape(os.path.dirname(path))]
+        slot = self.indexed_files.slot_of.get(path)
+        if slot is not None and self.indexed_files.sizes[slot] >= 0:
+            modified = datetime.fromtimestamp(self.indexed_files.mtimes[slot]).strftime("%Y-%m-%d %H:%M")
+            details.append(f"{format_bytes(self.indexed_files.sizes[slot])}, modified {modified}")
+        info = self.indexed_files.media.get(path)
+        if info is not None:
+            details.append(html.escape(format_media_info(info)))
+        previewable = self.is_previewable(path)
+        self.preview_pane.show_file("<br>".join(details), "Loading..." if previewable else "")
+        pixmap = self.pixmap_cache.get(path)
+        if pixmap is not None:
+            self.preview_pane.set_pixmap(pixmap)
+        elif previewable:
+            self.request_thumbnails()
+
+    def is_previewable(self, path):
+        return os.path.splitext(path)[1].lower() in self.preview_extensions
+
+    def schedule_thumbnails(self):
+        if self.preview_check.isChecked():
+            self.preview_timer.start()
+
+    def request_thumbnails(self):
+        """Queue thumbnails for the current row, then the rows in view, then the next few."""
+        if self.thumbnail_loader is None or not self.preview_check.isChecked():
+            return
+        paths = [self.preview_path] if self.preview_path else []
+        rows = self.results_list.visible_rows()
+        if rows is not None:
+            first, last = rows
+            for row in range(first, min(self.results_list.count(), last + 1 + PREVIEW_PREFETCH_ROWS)):
+                path = self.results_list.path_at(row)
+                if path is not None and path != self.preview_path:
+                    paths.append(path)
+        self.thumbnail_loader.request([path for path in paths
+                                       if path not in self.pixmap_cache and self.is_previewable(path)])
+
+    def on_thumbnail_ready(self, path, image):
+        pixmap = QPixmap.fromImage(image)
+        self.pixmap_cache.put(path, pixmap)
+        if path == self.preview_path:
+            self.preview_pane.set_pixmap(pixmap)
+
+    def on_search_text_edited(self, text):
+        self.live_timer.start()  # Restarting the timer means only a pause in typing searches
+
+    def on_live_search(self):
+        """Search the index for the text typed so far, without dialogs or walking."""
+        if (self.content_check.isChecked() or self.index_loading() or not self.indexed_files
+                or self.dir_input.text() != self.indexed_directory):
+            return  # Left to an explicit search
+        keyword = self.search_input.text()
+        if has_media_filters(keyword):
+            return  # Media filters may need header reads; left to an explicit search
+        if not isinstance(self.search_executor.current, LiveSearchTask) and self.search_executor.is_running():
+            return  # Leave explicit searches and scans running; submitting would cancel them
+        if len(normalize_filename(keyword)) < LIVE_SEARCH_MIN_CHARS:
+            self.search_executor.cancel()
+            return
+        self.search_started = time.perf_counter()
+        task = LiveSearchTask(keyword, self.indexed_files, self.live_matchers)
+        task.finished.connect(self.on_search_complete)
+        task.error.connect(self.on_search_error)
+        self.search_executor.submit(task)
+
+    def start_name_search(self, task):
+        task.finished.connect(self.on_search_complete)
+        task.error.connect(self.on_search_error)
+        task.progress.connect(self.update_progress)
+        task.large_directory.connect(self.handle_large_directory)
+        self.search_executor.submit(task)
+
+    def is_stale(self):
+        """True inside a slot called by a search task that was cancelled or superseded."""
+        sender = self.sender()
+        return isinstance(sender, SearchTask) and not self.search_executor.is_current(sender)
+
+    def on_content_match(self, path, matches):
+        if self.is_stale():
+            return
+        detail = "\n".join(f"{line}: {preview}" for line, _, preview in matches)
+        self.results_list.add_item_with_animation(path, detail)
+
+    def on_content_search_complete(self, count):
+        if self.is_stale():
+            return
+        self.reset_search_ui()
+        self.status_label.setText(f"{count} files contain a match")
+
+    def update_progress(self, current, total):
+        if self.is_stale():
+            return
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(current)
+            
+    def reset_search_ui(self):
+        # Stop the wave animation and hide progress bar immediately
+        self.progress_bar.stop_wave()
+        
+        # Stop animations and reset UI
+        self.search_btn.stop_pulse()
+        self.search_btn.setEnabled(True)
+        self.search_btn.setText("Search")
+        self.cancel_btn.setVisible(False)
+
+    def on_search_complete(self, results, sortable=True, groups=None):
+        if self.is_stale():
+            return
+        self.reset_search_ui()
+        self.search_results = results
+        self.results_sortable = sortable
+        self.result_groups = groups
+        self.results_page = 0
+        self.grouped_rows = None
+        self.render_results_page()
+        if getattr(self.sender(), "truncated", False):
+            self.status_label.setText(f"Showing the first {len(results):,} matches; press Enter for all of them")
+        if self.search_started is not None:
+            self.last_search_latency = time.perf_counter() - self.search_started
+            self.search_started = None
+
+    def clear_results(self):
+        self.results_list.clear()
+        self.search_results = []
+        self.grouped_rows = None
+        self.result_groups = None
+        self.update_page_controls(0)
+
+    def render_results_page(self):
+        """Show the current page of search_results in the chosen order."""
+        key, reverse = self.sort_combo.currentData() if self.results_sortable else (None, False)
+        start = self.results_page * RESULTS_PAGE_SIZE
+        with tracing.span("render", results=len(self.search_results)):
+            self.results_list.clear()  # Clear any existing items
+            if self.result_groups is not None or (self.group_check.isChecked() and self.results_sortable):
+                if self.grouped_rows is None:
+                    if self.result_groups is not None:
+                        present = set(self.search_results)  # Files may have been moved or deleted since
+                        groups = [(heading, [path for path in paths if path in present])
+                                  for heading, paths in self.result_groups]
+                    else:
+                        groups = group_by_directory(self.search_results, self.indexed_files, key, reverse)
+                    self.grouped_rows = []
+                    for heading, paths in groups:
+                        if paths:
+                            self.grouped_rows.append((heading, len(paths)))
+                            self.grouped_rows.extend(paths)
+                total = len(self.grouped_rows)
+                for row in self.grouped_rows[start:start + RESULTS_PAGE_SIZE]:
+                    if isinstance(row, tuple):
+                        self.results_list.add_header(f"{row[0]}  ({row[1]} files)")
+                    else:
+                        self.results_list.add_item_with_animation(row)
+            else:
+                total = len(self.search_results)
+                for path in sort_results(self.search_results, self.indexed_files, key, reverse,
+                                         start, RESULTS_PAGE_SIZE):
+                    self.results_list.add_item_with_animation(path)
+        self.update_page_controls(total)
+        self.schedule_thumbnails()
+
+    def update_page_controls(self, total):
+        paged = total > RESULTS_PAGE_SIZE
+        for widget in self.page_widgets:
+            widget.setVisible(paged)
+        if paged:
+            start = self.results_page * RESULTS_PAGE_SIZE
+            self.page_label.setText(f"{start + 1:,}-{min(start + RESULTS_PAGE_SIZE, total):,} of {total:,}")
+            self.page_prev_btn.setEnabled(self.results_page > 0)
+            self.page_next_btn.setEnabled(start + RESULTS_PAGE_SIZE < total)
+
+    def on_sort_changed(self):
+        self.results_page = 0
+        self.grouped_rows = None
+        if self.search_results:
+            self.render_results_page()
+
+    def on_page(self, step):
+        self.results_page = max(0, self.results_page + step)
+        self.render_results_page()
+        self.results_list.scrollToTop()
+
+    def update_saved_menu(self):
+        """Refresh the saved search menu, showing how many new matches each one has."""
+        current = self.saved_combo.currentData()
+        self.saved_combo.blockSignals(True)
+        self.saved_combo.clear()
+        self.saved_combo.addItem("Saved searches" if len(self.saved_searches) else "No saved searches", None)
+        for search in self.saved_searches:
+            label = f"{search.name} ({len(search.new)} new)" if search.new else search.name
+            self.saved_combo.addItem(label, search.name)
+            if search.name == current:
+                self.saved_combo.setCurrentIndex(self.saved_combo.count() - 1)
+        self.saved_combo.blockSignals(False)
+
+    def on_save_search(self):
+        keyword = self.search_input.text()
+        if self.content_check.isChecked():
+            QMessageBox.warning(self, "Save Search", "Only name searches can be saved")
+            return
+        name, ok = QInputDialog.getText(self, "Save Search", "Name:", text=keyword or "All files")
+        if not ok or not name.strip():
+            return
+        size_text, ok = QInputDialog.getText(self, "Save Search", "Only files of at least (e.g. 500M, blank for any size):")
+        if not ok:
+            return
+        try:
+            min_size = parse_size(size_text)
+        except ValueError:
+            QMessageBox.warning(self, "Save Search", f"Not a size: {size_text}")
+            return
+        search = self.saved_searches.save_search(name.strip(), keyword, min_size)
+        self.save_index()
+        self.update_saved_menu()
+        self.saved_combo.setCurrentIndex(self.saved_combo.findData(search.name))
+        self.status_label.setText(f"Saved search '{search.name}': {len(search.matches)} files")
+
+    def on_saved_search_selected(self, position):
+        name = self.saved_combo.itemData(position)
+        if name is None:
+            return
+        if self.index_loading():
+            QMessageBox.information(self, "Saved Searches", "The index is still loading, please try again in a moment")
+            return
+        search = self.saved_searches.get(name)
+        new = len(search.new)
+        results = self.saved_searches.open(name)  # Kept up to date, so no rescan
+        self.saved_searches_dirty = True
+        self.search_input.setText(search.keyword)
+        self.clear_results()
+        self.on_search_complete(results)
+        self.update_saved_menu()
+        self.status_label.setText(f"Saved search '{name}': {len(results)} files, {new} new since last viewed")
+
+    def show_saved_menu(self, position):
+        name = self.saved_combo.currentData()
+        if name is None:
+            return
+        menu = QMenu()
+        remove_action = menu.addAction(f"Remove '{name}'")
+        if menu.exec(self.saved_combo.mapToGlobal(position)) == remove_action:
+            self.saved_searches.delete(name)
+            self.save_index()
+            self.update_saved_menu()
+
+    def closeEvent(self, event):
+        self.search_executor.shutdown()
+        if self.thumbnail_loader is not None:
+            self.thumbnail_loader.shutdown()
+        self.stop_media_scan()
+        self.stop_background_index()
+        if self.exporter is not None:
+            self.exporter.stop()
+            self.exporter.wait()
+        for worker in list(self.retired_workers):
+            worker.wait()
+        if self.saved_searches_dirty:
+            self.save_index()  # Remember which saved search results have been seen
+        super().closeEvent(event)
+
+    def on_search_error(self, error_message):
+        if self.is_stale():
+            return
+        if getattr(self.sender(), "live", False):
+            self.reset_search_ui()
+            self.status_label.setText(error_message)
+            return
+        # Stop animations and reset UI
+        self.search_btn.stop_pulse()
+        self.search_btn.setEnabled(True)
+        self.search_btn.setText("Search")
+        self.progress_bar.stop_wave()  # This will also hide the progress bar
+        self.cancel_btn.setVisible(False)
+        
+        # Show error message with more details
+        QMessageBox.warning(self, "Search Error", error_message)
+        print(f"Search error: {error_message}")  # Log to console for debugging
+        
+    def cancel_search(self):
+        # Returns at once; the task stops at its next check and its late signals are ignored
+        self.search_executor.cancel()
+        self.search_started = None
+        self.reset_search_ui()  # Keep any rows a streaming search already added
+
+    def on_index(self):
+        """Reindex the current directory."""
+        directory = self.dir_input.text()
+        if directory and os.path.isdir(directory):
+            self.index_directory(directory)
+        else:
+            QMessageBox.warning(self, "Error", "Please select a valid directory first")
+
+    def on_browse(self):
+        directory = QFileDialog.getExistingDirectory(self, "Choose a directory")
+        if directory:
+            self.dir_input.setText(directory)
+            # Auto-index the directory if it's different from the current one
+            if directory != self.indexed_directory:
+                self.index_directory(directory)
+
+    def on_select(self, item):
+        if not item.flags() & Qt.ItemFlag.ItemIsSelectable:
+            return  # Folder heading
+        # Get the widget from the item
+        widget = self.results_list.itemWidget(item)
+        # Get the label from the widget's layout
+        label = widget.findChild(QLabel)
+        if label:
+            file_path = label.text()
+            open_file(file_path)
+
+    def on_select_all(self):
+        self.results_list.selectAll()  # Use the built-in selectAll method
+
+    def get_selected_files(self):
+        """Get the file paths of selected items."""
+        selected_files = []
+        for i in range(self.results_list.count()):
+            item = self.results_list.item(i)
+            if item.isSelected():
+                widget = self.results_list.itemWidget(item)
+                label = widget.findChild(QLabel)
+                if label:
+                    selected_files.append(label.text())
+        return selected_files
+
+    def on_copy(self):
+        selected = self.get_selected_files()
+        if selected:
+            dest_dir = QFileDialog.getExistingDirectory(self, "Choose destination directory")
+            if dest_dir:
+                self.queue_file_job(FileJob("copy", selected, dest_dir))
+
+    def on_move(self):
+        selected = self.get_selected_files()
+        if selected:
+            dest_dir = QFileDialog.getExistingDirectory(self, "Choose destination directory")
+            if dest_dir:
+                self.queue_file_job(FileJob("move", selected, dest_dir))
+
+    def on_delete(self):
+        selected = self.get_selected_files()
+        if selected and QMessageBox.question(self, "Confirm Delete", "Are you sure?") == QMessageBox.StandardButton.Yes:
+            self.queue_file_job(FileJob("delete", selected))
+
+    def queue_file_job(self, job):
+        """Add a file operation to the queue and start it if nothing is running."""
+        self.file_jobs.append(job)
+        if self.file_worker is None:
+            self.start_next_file_job()
+
+    def start_next_file_job(self):
+        if not self.file_jobs:
+            self.file_worker = None
+            for widget in self.job_widgets:
+                widget.hide()
+            return
+        job = self.file_jobs.pop(0)
+        self.job_progress.setValue(0)
+        self.job_pause_btn.setText("Pause")
+        self.job_label.setText(f"{job.operation.capitalize()} {len(job.sources)} files")
+        for widget in self.job_widgets:
+            widget.show()
+        self.file_worker = FileOperationWorker(job)
+        self.file_worker.progress.connect(self.on_job_progress)
+        self.file_worker.finished.connect(self.on_job_finished)
+        self.file_worker.start()
+
+    def on_job_progress(self, job):
+        if job.total_bytes:
+            self.job_progress.setValue(int(job.done_bytes * 1000 / job.total_bytes))
+        text = (f"{job.operation.capitalize()}: {format_bytes(job.done_bytes)} / "
+                f"{format_bytes(job.total_bytes)} ({format_bytes(job.throughput())}/s)")
+        if self.file_jobs:
+            text += f" ({len(self.file_jobs)} queued)"
+        self.job_label.setText(text)
+
+    def on_job_pause(self):
+        if self.file_worker is None:
+            return
+        job = self.file_worker.job
+        if job.is_paused:
+            job.resume()
+            self.job_pause_btn.setText("Pause")
+        else:
+            job.pause()
+            self.job_pause_btn.setText("Resume")
+
+    def on_job_cancel(self):
+        if self.file_worker is not None:
+            self.file_worker.job.cancel()
+
+    def on_job_finished(self, job):
+        self.file_worker.wait()
+        if job.operation in ("move", "delete") and job.completed:
+            root = os.path.join(os.path.abspath(self.indexed_directory or ""), "")
+            for source, dest in job.completed:
+                if dest and os.path.abspath(dest).startswith(root):
+                    self.indexed_files.rename(source, dest)
+                else:
+                    self.indexed_files.remove(source)
+            self.save_index()  # Save the updated index
+            # Drop the affected rows instead of re-running the search
+            gone = {source for source, _ in job.completed}
+            self.results_list.remove_paths(gone)
+            self.search_results = [path for path in self.search_results if path not in gone]
+            self.grouped_rows = None
+            self.update_saved_menu()
+            self.refresh_disk_usage()
+            self.status_label.setText(f"Index: {len(self.indexed_files)} files")
+
+        done = len(job.completed)
+        if job.cancelled:
+            summary = f"{job.operation.capitalize()} cancelled after {done} of {len(job.sources)} files."
+        else:
+            summary = f"{job.operation.capitalize()} finished: {done} of {len(job.sources)} files."
+        if job.failures:
+            details = "\n".join(f"{path}: {message}" for path, message in job.failures[:20])
+            if len(job.failures) > 20:
+                details += f"\n... and {len(job.failures) - 20} more"
+            QMessageBox.warning(self, "File Operation Errors", f"{summary}\n\n{len(job.failures)} failed:\n{details}")
+        else:
+            QMessageBox.information(self, "File Operation Complete", summary)
+        self.start_next_file_job()
+
+    def on_find_duplicates(self):
+        """Search the index for groups of identical files."""
+        if self.index_loading():
+            QMessageBox.information(self, "Duplicates", "The index is still loading, please try again in a moment")
+            return
+        if not self.indexed_files:
+            QMessageBox.warning(self, "Duplicates", "Please index a directory first")
+            return
+        self.clear_results()
+        self.search_btn.start_pulse()
+        self.search_btn.setEnabled(False)
+        self.search_btn.setText("Hashing...")
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.progress_bar.start_wave()
+        self.cancel_btn.setVisible(True)
+        
+        task = DuplicateTask(self.indexed_files.sized_paths(), self.hash_cache_file)
+        task.finished.connect(self.on_duplicates_complete)
+        task.progress.connect(self.update_progress)
+        self.search_executor.submit(task)
+
+    def on_duplicates_complete(self, groups):
+        if self.is_stale():
+            return
+        # Identical files are listed next to each other, largest waste first, so keep that order
+        self.on_search_complete([path for group in groups for path in group], sortable=False)
+        wasted = 0
+        for group in groups:
+            try:
+                wasted += os.path.getsize(group[0]) * (len(group) - 1)
+            except OSError:
+                pass
+        self.status_label.setText(f"{len(groups)} duplicate groups, {format_bytes(wasted)} reclaimable")
+
+    def on_find_similar(self):
+        """Group indexed files whose names are nearly the same."""
+        if self.index_loading():
+            QMessageBox.information(self, "Similar Names", "The index is still loading, please try again in a moment")
+            return
+        if not self.indexed_files:
+            QMessageBox.warning(self, "Similar Names", "Please index a directory first")
+            return
+        percent, ok = QInputDialog.getInt(self, "Similar Names", "Minimum name similarity (%):",
+                                          round(self.similar_threshold * 100), 10, 100)
+        if not ok:
+            return
+        self.similar_threshold = percent / 100
+        self.clear_results()
+        self.search_btn.start_pulse()
+        self.search_btn.setEnabled(False)
+        self.search_btn.setText("Comparing...")
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.progress_bar.start_wave()
+        self.cancel_btn.setVisible(True)
+
+        task = SimilarNamesTask(self.indexed_files.paths(), self.similar_threshold)
+        task.finished.connect(self.on_similar_complete)
+        task.progress.connect(self.update_progress)
+        task.error.connect(self.on_search_error)
+        self.search_executor.submit(task)
+
+    def on_similar_complete(self, clusters):
+        if self.is_stale():
+            return
+        groups = [(os.path.basename(cluster[0]), cluster) for cluster in clusters]
+        self.on_search_complete([path for cluster in clusters for path in cluster], sortable=False, groups=groups)
+        self.status_label.setText(f"{len(clusters)} groups of similar names")
+
+    def on_show_changes(self):
+        """List what the last reindex found added, modified and removed."""
+        if self.index_loading():
+            QMessageBox.information(self, "Changes", "The index is still loading, please try again in a moment")
+            return
+        if not self.indexed_files:
+            QMessageBox.warning(self, "Changes", "Please index a directory first")
+            return
+        self.clear_results()
+        self.search_btn.start_pulse()
+        self.search_btn.setEnabled(False)
+        self.search_btn.setText("Comparing...")
+        self.cancel_btn.setVisible(True)
+
+        task = IndexDiffTask(self.indexed_files.copy(), self.indexed_directory, self.snapshot_file, self.snapshot_saving)
+        task.finished.connect(self.on_changes_complete)
+        task.error.connect(self.on_search_error)
+        self.search_executor.submit(task)
+
+    def on_changes_complete(self, diff):
+        if self.is_stale():
+            return
+        if diff is None:
+            self.reset_search_ui()
+            self.status_label.setText("No earlier index of this directory yet; changes are kept from the next reindex")
+            return
+        groups = diff.groups()
+        self.on_search_complete([path for _, paths in groups for path in paths], sortable=False, groups=groups)
+        self.status_label.setText(f"Since the reindex on {diff.since}: {len(diff.added)} added, "
+                                  f"{len(diff.modified)} modified, {len(diff.removed)} removed")
+
+    def on_disk_usage(self):
+        """Show the indexed folders by size."""
+        if self.index_loading():
+            QMessageBox.information(self, "Disk Usage", "The index is still loading, please try again in a moment")
+            return
+        if not self.indexed_files:
+            QMessageBox.warning(self, "Disk Usage", "Please index a directory first")
+            return
+        if self.disk_usage_dialog is None:
+            self.disk_usage_dialog = DiskUsageDialog(self.disk_usage, self.search_executor.pool, self)
+            self.disk_usage_dialog.list_files.connect(self.on_list_folder_files)
+        self.disk_usage_dialog.show()
+        self.disk_usage_dialog.raise_()
+        self.disk_usage_dialog.refresh()
+
+    def refresh_disk_usage(self):
+        """Bring an open disk usage view up to date after the index changed."""
+        if self.disk_usage_dialog is not None and self.disk_usage_dialog.isVisible():
+            self.disk_usage_dialog.refresh()
+
+    def on_list_folder_files(self, directory, recursive):
+        self.search_executor.cancel()  # Its results would replace these
+        self.clear_results()
+        paths = self.disk_usage.files(directory, recursive)
+        self.on_search_complete(paths)
+        size, count = self.disk_usage.usage(directory) if recursive else self.disk_usage.own_usage(directory)
+        self.status_label.setText(f"{count} files, {format_bytes(size)} in {directory}")
+
+    def on_export(self):
+        """Save the whole result set, in the order shown, to a file."""
+        if not self.search_results:
+            QMessageBox.information(self, "Export", "There are no results to export")
+            return
+        if self.exporter is not None:
+            QMessageBox.information(self, "Export", "An export is still running")
+            return
+        filters = {f"{label} (*{EXPORT_EXTENSIONS[fmt]})": fmt for fmt, label in EXPORT_FORMATS.items()}
+        filename, chosen = QFileDialog.getSaveFileName(self, "Export results", "results.csv", ";;".join(filters),
+                                                       next(name for name, fmt in filters.items() if fmt == "csv"))
+        if not filename:
+            return
+        # The extension decides when it names a format; otherwise the chosen filter does
+        fmt = export_format(filename) if os.path.splitext(filename)[1] else filters.get(chosen, "nul")
+        if not os.path.splitext(filename)[1]:
+            filename += EXPORT_EXTENSIONS[fmt]
+        key, reverse = self.sort_combo.currentData() if self.results_sortable else (None, False)
+        by_folder = self.results_sortable and self.group_check.isChecked()
+        self.exporter = ExportWorker(self.search_results, self.indexed_files, filename, fmt, key, reverse, by_folder)
+        self.exporter.exported.connect(self.on_exported)
+        self.exporter.progress.connect(self.on_export_progress)
+        self.exporter.error.connect(self.on_export_error)
+        self.exporter.start(QThread.Priority.LowPriority)
+        self.status_label.setText(f"Exporting {len(self.search_results):,} results...")
+
+    def on_export_progress(self, done, total):
+        if self.sender() is self.exporter:
+            self.status_label.setText(f"Exporting: {done:,} of {total:,}")
+
+    def on_exported(self, filename, count):
+        if self.sender() is not self.exporter:
+            return
+        self.exporter.wait()
+        self.exporter = None
+        self.status_label.setText(f"Exported {count:,} results to {filename}")
+
+    def on_export_error(self, error_message):
+        if self.sender() is not self.exporter:
+            return
+        self.exporter.wait()
+        self.exporter = None
+        QMessageBox.warning(self, "Export Error", f"An error occurred while exporting: {error_message}")
+
+    def handle_large_directory(self, total_files):
+        if self.is_stale():
+            return
+        # Re-enable search button and hide progress
+        self.search_btn.setEnabled(True)
+        self.search_btn.setText("Search")
+        self.progress_bar.hide()
+        self.cancel_btn.setVisible(False)
+        
+        # Ask user if they want to index the directory
+        reply = QMessageBox.question(
+            self, 
+            "Large Directory Detected",
+            f"This directory contains {total_files} files. Would you like to index it first for better performance?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            # Index the directory
+            self.index_directory(self.dir_input.text())
+        else:
+            # Continue with non-indexed search, without asking again
+            self.search_btn.start_pulse()
+            self.search_btn.setEnabled(False)
+            self.search_btn.setText("Searching...")
+            self.progress_bar.show()
+            self.progress_bar.start_wave()
+            self.cancel_btn.setVisible(True)
+            self.start_name_search(NameSearchTask(self.dir_input.text(), self.search_input.text(), check_size=False))
+            
+    def index_directory(self, directory):
+        """Index the directory and save to JSON file."""
+        self.stop_background_index()
+        if self.background_check.isChecked():
+            self.start_background_index(directory)
+            return
+        try:
+            if self.index_loader is not None:
+                self.index_loader.discard = True  # A fresh index replaces the one still loading
+            self.progress_bar.setValue(0)
+            self.progress_bar.show()
+            self.progress_bar.start_wave()
+            
+            # Count total files first
+            total_files = 0
+            with tracing.span("walk", directory=directory, purpose="count"):
+                for _, _, files in os.walk(directory):
+                    total_files += len(files)
+            
+            # Index files with progress
+            index = FileIndex()
+            processed_files = 0
+            
+            with tracing.span("index_build", directory=directory):
+                for path, size, mtime, inode in walk_entries(directory):
+                    index.add(path, size, mtime, inode)
+                    processed_files += 1
+                    if processed_files % 100 == 0:
+                        self.progress_bar.setValue(int(processed_files * 100 / total_files))
+            
+            self.use_new_index(directory, index)
+            self.progress_bar.stop_wave()
+            self.progress_bar.hide()
+            
+        except Exception as e:
+            QMessageBox.warning(self, "Indexing Error", f"An error occurred while indexing: {str(e)}")
+            self.progress_bar.stop_wave()
+            self.progress_bar.hide()
+
+    def use_new_index(self, directory, index):
+        """Replace the index with a freshly built one and save it."""
+        previous = self.indexed_files
+        if len(previous) and self.indexed_directory:
+            # Keep the replaced generation for Changes (which checks it is of the same directory);
+            # nothing modifies it any more
+            self.snapshot_saving = self.search_executor.pool.submit(
+                save_snapshot, self.snapshot_file, self.indexed_directory, previous)
+        self.indexed_files = index
+        self.indexed_directory = directory
+        self.saved_searches.attach(index, [search.to_dict() for search in self.saved_searches])
+        self.disk_usage.attach(index, directory)
+        self.update_saved_menu()
+        self.warm_live_matcher()
+        self.save_index()
+        self.start_media_scan()
+        self.refresh_disk_usage()
+        self.status_label.setText(f"Indexed {len(index)} files")
+
+    def start_background_index(self, directory):
+        """Rebuild the index on a low-priority thread; the current index stays searchable meanwhile."""
+        self.background_indexer = BackgroundIndexWorker(directory)
+        self.background_indexer.indexed.connect(self.on_background_indexed)
+        self.background_indexer.progress.connect(self.on_background_index_progress)
+        self.background_indexer.error.connect(self.on_background_index_error)
+        self.background_indexer.start(QThread.Priority.IdlePriority)
+        self.status_label.setText("Indexing in the background...")
+
+    def stop_background_index(self):
+        if self.background_indexer is not None:
+            self.retire_worker(self.background_indexer)  # The walk ends at its next directory or file
+            self.background_indexer = None
+
+    def on_background_index_progress(self, count, rate):
+        if self.sender() is self.background_indexer:
+            self.status_label.setText(f"Indexing in the background: {count:,} files, {rate:.0f} folders/s")
+
+    def on_background_indexed(self, directory, index):
+        if self.sender() is not self.background_indexer:
+            return
+        self.background_indexer.wait()
+        self.background_indexer = None
+        if self.index_loader is not None:
+            self.index_loader.discard = True  # The fresh index wins
+        self.use_new_index(directory, index)
+
+    def on_background_index_error(self, error_message):
+        if self.sender() is not self.background_indexer:
+            return
+        self.background_indexer.wait()
+        self.background_indexer = None
+        QMessageBox.warning(self, "Indexing Error", f"An error occurred while indexing: {error_message}")
+
+    def show_help(self):
+        """Show help message with GitHub link."""
+        help_text = """
+        <h3>File Search Help</h3>
+        <p>This application helps you search through your files with a beautiful frosted glass interface.</p>
+        
+        <h4>Features:</h4>
+        <ul>
+            <li>Search files by name or extension</li>
+            <li>Auto-indexing for faster searches</li>
+            <li>Copy, move, and delete files in the background with pause and cancel</li>
+            <li>Find duplicate files in the indexed directory</li>
+            <li>Group files with nearly the same name with Similar</li>
+            <li>See which folders take the most space with Usage; double-click one to list its files</li>
+            <li>Tick Gently to reindex shared drives in the background without slowing them down for others</li>
+            <li>Export all results with their sizes and dates as NUL-separated paths, CSV or JSON lines</li>
+            <li>Hit Changes after a reindex to list files added, modified or removed since the one before</li>
+            <li>Search inside files with the Contents option</li>
+            <li>Filter images and videos by size, length and codec, e.g. <i>width&gt;=1920 duration&gt;5m codec:h264</i></li>
+            <li>Tick Preview for a thumbnail of the selected file</li>
+            <li>Press F12 for a performance overlay</li>
+            <li>Beautiful frosted glass UI with snow animation</li>
+        </ul>
+        
+        <h4>How to use:</h4>
+        <ol>
+            <li>Select a directory to search in</li>
+            <li>Enter your search term</li>
+            <li>Use the buttons to manage your files</li>
+        </ol>
+        
+        <p>For more information, visit the project on GitHub:<br>
+        <a href="https://github.com/m0nnnna/Filesearch">https://github.com/m0nnnna/Filesearch</a></p>
+        """
+        
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Help")
+        msg.setTextFormat(Qt.TextFormat.RichText)
+        msg.setText(help_text)
+        msg.setStyleSheet("""
+            QMessageBox {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(255, 255, 255, 180),
+                    stop:0.3 rgba(220, 240, 255, 140),
+                    stop:0.6 rgba(200, 230, 255, 120),
+                    stop:1 rgba(180, 220, 255, 100));
+                border: 1px solid rgba(255, 255, 255, 180);
+                border-radius: 3px;
+            }
+            QMessageBox QLabel {
+                color: rgba(0, 0, 0, 180);
+                background: transparent;
+            }
+            QMessageBox QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(255, 255, 255, 180),
+                    stop:0.3 rgba(220, 240, 255, 140),
+                    stop:0.6 rgba(200, 230, 255, 120),
+                    stop:1 rgba(180, 220, 255, 100));
+                border: 1px solid rgba(255, 255, 255, 180);
+                border-radius: 3px;
+                padding: 6px;
+                color: rgba(0, 0, 0, 180);
+                font-weight: bold;
+                min-height: 20px;
+            }
+            QMessageBox QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 rgba(255, 255, 255, 220),
+                    stop:0.3 rgba(230, 245, 255, 180),
+                    stop:0.6 rgba(210, 235, 255, 160),
+                    stop:1 rgba(190, 225, 255, 140));
+                border: 1px solid rgba(255, 255, 255, 220);
+            }
+        """)
+        msg.exec()
+
+STARTUP_PROBE = os.environ.get("FILESEARCH_STARTUP_PROBE")  # Set by "benchmark.py startup"
+_startup_marks = set()
+
+def startup_probe(mark):
+    """Report a startup milestone on stdout for the startup benchmark.
+
+    Once both the first paint and the index load are reported the app quits.
+    """
+    if not STARTUP_PROBE or mark in _startup_marks:
+        return
+    _startup_marks.add(mark)
+    print(f"{mark} {time.time():.6f}", flush=True)
+    if {"first_paint", "index_ready"} <= _startup_marks:
+        QTimer.singleShot(0, QApplication.quit)
+
+def main(argv=None):
+    """Run the search window until it is closed and return the exit code."""
+    app = QApplication(argv if argv is not None else sys.argv)
+    app.setStyle("Fusion")
+    window = FileSearchWindow()
+    window.show()
+    return app.exec()
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Content search workers in frozen builds
+    sys.exit(main())
\ No newline at end of file
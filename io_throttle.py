@@ -0,0 +1,101 @@
+"""Gentle indexing for shared storage: idle priority and a paced listing rate.
+
+lower_thread_priority() moves the calling thread to idle CPU and I/O
+priority. IndexThrottle limits how many directories walk_entries lists per
+second. It also watches how long each listing and its stat calls take, and
+slows down further when they take longer than usual, because that means
+someone else is using the disk or the file server.
+"""
+import os
+import sys
+import time
+import ctypes
+import platform
+import threading
+
+DEFAULT_LISTINGS_PER_SECOND = 50
+MIN_LISTINGS_PER_SECOND = 1
+BACKOFF_FACTOR = 3  # Smoothed latency this many times the quietest seen means contention
+LATENCY_FLOOR = 0.001  # Seconds per call; faster than this is never contention (e.g. cached metadata)
+LATENCY_SMOOTHING = 0.2  # Weight of the newest listing in the smoothed latency
+
+# ioprio_set(2) has no libc wrapper; these are its syscall numbers
+_IOPRIO_SET = {"x86_64": 251, "amd64": 251, "i386": 289, "i686": 289, "aarch64": 30, "arm64": 30,
+               "riscv64": 30, "armv7l": 314, "ppc64le": 273, "s390x": 282}
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_WHO_PROCESS = 1  # With who=0, the calling thread
+_PRIO_DARWIN_THREAD = 3
+_PRIO_DARWIN_BG = 0x1000
+_THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+
+def lower_thread_priority():
+    """Run the calling thread at idle CPU and I/O priority; returns True if the platform allowed it.
+
+    Only the calling thread is affected on Linux, macOS and Windows, and
+    its priority can't be raised again, so call this from a thread that
+    only indexes.
+    """
+    try:
+        if sys.platform == "win32":
+            kernel32 = ctypes.windll.kernel32
+            return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), _THREAD_MODE_BACKGROUND_BEGIN))
+        if sys.platform == "darwin":
+            os.setpriority(_PRIO_DARWIN_THREAD, 0, _PRIO_DARWIN_BG)  # Throttles both CPU and disk
+            return True
+        os.setpriority(os.PRIO_PROCESS, 0, 19)  # Per thread on Linux
+        number = _IOPRIO_SET.get(platform.machine().lower())
+        if sys.platform.startswith("linux") and number is not None:
+            libc = ctypes.CDLL(None, use_errno=True)
+            return libc.syscall(number, _IOPRIO_WHO_PROCESS, 0, _IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT) == 0
+        return True
+    except (OSError, AttributeError, ValueError) as e:
+        print(f"Error lowering indexing priority: {str(e)}")
+        return False
+
+class IndexThrottle:
+    """Paces directory listings and slows down when they take longer than usual.
+
+    Listings are spaced 1/rate seconds apart. Each one's time per call (the
+    scandir plus a stat per file) is smoothed; when that rises to
+    BACKOFF_FACTOR times the quietest seen, the rate is halved, at most
+    once a second and down to MIN_LISTINGS_PER_SECOND. While latency is
+    normal the rate climbs back by one per listing, up to max_rate.
+    """
+    def __init__(self, max_rate=DEFAULT_LISTINGS_PER_SECOND):
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.latency = None  # Smoothed seconds per call
+        self.baseline = None  # Lowest smoothed latency seen
+        self.listings = 0
+        self.waited = 0.0  # Seconds spent pausing
+        self.next_time = 0.0
+        self.last_backoff = 0.0
+        self.stopped = threading.Event()  # Cuts a pause short
+
+    def stop(self):
+        self.stopped.set()
+
+    def wait(self):
+        """Pause until the next listing is due."""
+        now = time.perf_counter()
+        delay = self.next_time - now
+        if delay > 0 and not self.stopped.is_set():
+            self.stopped.wait(delay)
+            self.waited += delay
+            now = self.next_time
+        self.next_time = now + 1 / self.rate
+
+    def listed(self, seconds, calls):
+        """Record that a listing and its stat calls took seconds, and adjust the rate."""
+        self.listings += 1
+        per_call = seconds / max(calls, 1)
+        self.latency = per_call if self.latency is None else self.latency + LATENCY_SMOOTHING * (per_call - self.latency)
+        self.baseline = self.latency if self.baseline is None else min(self.baseline, self.latency)
+        now = time.perf_counter()
+        if self.latency > max(self.baseline * BACKOFF_FACTOR, LATENCY_FLOOR):
+            if now - self.last_backoff >= 1:
+                self.rate = max(MIN_LISTINGS_PER_SECOND, self.rate / 2)
+                self.last_backoff = now
+        else:
+            self.rate = min(self.max_rate, self.rate + 1)
@@ -0,0 +1,449 @@
+"""Image and video metadata (dimensions, duration, codec) read from file headers.
+
+Only the bytes that hold the answer are read: the first few dozen bytes of
+PNG, GIF and WebP files, the segment headers of a JPEG up to its frame
+header, the moov box of MP4/MOV files (skipping mdat) and the Info and
+Tracks elements of Matroska/WebM files (skipping clusters).
+
+Results are cached by (inode, size, mtime) in a JSON file beside the index,
+so a file is only read again after it changes. They are kept in
+FileIndex.media, where search filters and the duration/resolution sort keys
+find them:
+
+    holiday width>=1920 duration>90 codec:h264
+"""
+import os
+import re
+import struct
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from duplicates import HashCache
+from file_index import UNKNOWN_SIZE
+from search_core import SearchCancelled, CANCEL_CHECK_INTERVAL
+
+MEDIA_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.jpe', '.gif', '.webp',
+                    '.mp4', '.m4v', '.mov', '.3gp', '.mkv', '.webm'}
+MEDIA_WORKERS = 4  # Header reads are small and mostly wait on the disk
+MAX_MOOV_SIZE = 32 * 1024 * 1024  # Don't read absurdly large MP4 index boxes
+MAX_ELEMENTS = 4096  # Boxes/elements/segments walked per file before giving up
+
+MediaInfo = namedtuple('MediaInfo', 'width height duration codec')  # duration in seconds; 0/'' when unknown
+
+MP4_CODECS = {'avc1': 'h264', 'avc3': 'h264', 'hvc1': 'hevc', 'hev1': 'hevc', 'av01': 'av1', 'vp09': 'vp9',
+              'vp08': 'vp8', 'mp4v': 'mpeg4', 'mp4a': 'aac', 'ac-3': 'ac3', 'ec-3': 'eac3', 'opus': 'opus'}
+MKV_CODECS = {'V_MPEG4/ISO/AVC': 'h264', 'V_MPEGH/ISO/HEVC': 'hevc', 'V_AV1': 'av1', 'V_VP9': 'vp9',
+              'V_VP8': 'vp8', 'V_MPEG4/ISO/ASP': 'mpeg4', 'A_AAC': 'aac', 'A_OPUS': 'opus',
+              'A_VORBIS': 'vorbis', 'A_AC3': 'ac3', 'A_EAC3': 'eac3', 'A_FLAC': 'flac'}
+
+def is_media_name(path):
+    return os.path.splitext(path)[1].lower() in MEDIA_EXTENSIONS
+
+def probe(path):
+    """Return the MediaInfo of an image or video file, or None if it isn't one we can read."""
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        try:
+            if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+                width, height = struct.unpack('>II', head[16:24])
+                return MediaInfo(width, height, 0.0, 'png')
+            if head[:6] in (b'GIF87a', b'GIF89a'):
+                width, height = struct.unpack('<HH', head[6:10])
+                return MediaInfo(width, height, 0.0, 'gif')
+            if head.startswith(b'\xff\xd8'):
+                return _probe_jpeg(f)
+            if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+                return _probe_webp(head)
+            if head[4:8] in (b'ftyp', b'moov', b'mdat', b'wide', b'free', b'skip'):
+                return _probe_mp4(f)
+            if head.startswith(b'\x1a\x45\xdf\xa3'):
+                return _probe_matroska(f)
+        except (struct.error, IndexError, ValueError):
+            return None  # Truncated or corrupt header
+    return None
+
+def _probe_jpeg(f):
+    f.seek(2)
+    for _ in range(MAX_ELEMENTS):
+        byte = f.read(1)
+        while byte == b'\xff':  # Fill bytes before the marker
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0x01, 0xd8) or 0xd0 <= marker <= 0xd7:
+            continue  # Markers without a length
+        if marker == 0xd9:
+            return None  # End of image before a frame header
+        length = struct.unpack('>H', f.read(2))[0]
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            _, height, width = struct.unpack('>BHH', f.read(5))
+            return MediaInfo(width, height, 0.0, 'jpeg')
+        f.seek(length - 2, os.SEEK_CUR)
+    return None
+
+def _probe_webp(head):
+    chunk = head[12:16]
+    if chunk == b'VP8 ':
+        width, height = struct.unpack('<HH', head[26:30])
+        return MediaInfo(width & 0x3fff, height & 0x3fff, 0.0, 'webp')
+    if chunk == b'VP8L':
+        b0, b1, b2, b3 = head[21:25]
+        width = 1 + (b0 | (b1 & 0x3f) << 8)
+        height = 1 + (b1 >> 6 | b2 << 2 | (b3 & 0x0f) << 10)
+        return MediaInfo(width, height, 0.0, 'webp')
+    if chunk == b'VP8X':
+        width = 1 + int.from_bytes(head[24:27], 'little')
+        height = 1 + int.from_bytes(head[27:30], 'little')
+        return MediaInfo(width, height, 0.0, 'webp')
+    return None
+
+def _mp4_boxes(data, start=0, end=None):
+    """Yield (type, payload start, payload end) for the boxes in data[start:end]."""
+    end = len(data) if end is None else end
+    while start + 8 <= end:
+        size, kind = struct.unpack('>I4s', data[start:start + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', data[start + 8:start + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - start
+        if size < header:
+            return
+        yield kind.decode('latin-1'), start + header, min(start + size, end)
+        start += size
+
+def _probe_mp4(f):
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    offset = 0
+    for _ in range(MAX_ELEMENTS):
+        if offset + 8 > file_size:
+            return None
+        f.seek(offset)
+        size, kind = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header:
+            return None
+        if kind == b'moov':
+            if size > MAX_MOOV_SIZE:
+                return None
+            moov = f.read(size - header)
+            if len(moov) < size - header:
+                return None  # Truncated; what is there would give partial tracks
+            return _parse_moov(moov)
+        offset += size  # Skip mdat and everything else without reading it
+    return None
+
+def _parse_moov(moov):
+    duration = 0.0
+    width = height = 0
+    video_codec = audio_codec = ''
+    for kind, start, end in _mp4_boxes(moov):
+        if kind == 'mvhd':
+            if moov[start] == 1:
+                timescale, length = struct.unpack('>IQ', moov[start + 20:start + 32])
+            else:
+                timescale, length = struct.unpack('>II', moov[start + 12:start + 20])
+            if timescale:
+                duration = length / timescale
+        elif kind == 'trak':
+            track_width, track_height, handler, codec = _parse_trak(moov, start, end)
+            if handler == 'vide' and not video_codec:
+                width, height, video_codec = track_width, track_height, codec
+            elif handler == 'soun' and not audio_codec:
+                audio_codec = codec
+    return MediaInfo(width, height, duration, video_codec or audio_codec)
+
+def _parse_trak(data, start, end):
+    width = height = 0
+    handler = codec = ''
+    boxes = list(_mp4_boxes(data, start, end))
+    while boxes:
+        kind, start, end = boxes.pop()
+        if kind in ('mdia', 'minf', 'stbl'):
+            boxes.extend(_mp4_boxes(data, start, end))
+        elif kind == 'tkhd':
+            at = start + (88 if data[start] == 1 else 76)
+            width, height = (value >> 16 for value in struct.unpack('>II', data[at:at + 8]))  # 16.16 fixed point
+        elif kind == 'hdlr':
+            handler = data[start + 8:start + 12].decode('latin-1')
+        elif kind == 'stsd' and end - start >= 16:
+            fourcc = data[start + 12:start + 16].decode('latin-1')
+            codec = MP4_CODECS.get(fourcc, fourcc.strip())
+    return width, height, handler, codec
+
+def _read_vint(f, keep_marker=False):
+    """Read an EBML variable-length integer; returns (value, length), value None for "unknown"."""
+    first = f.read(1)
+    if not first:
+        raise ValueError("Unexpected end of file")
+    first = first[0]
+    length = 1
+    while length <= 8 and not first & (0x80 >> (length - 1)):
+        length += 1
+    if length > 8:
+        raise ValueError("Invalid EBML integer")
+    value = first if keep_marker else first & (0xff >> length)
+    rest = f.read(length - 1)
+    if len(rest) != length - 1:
+        raise ValueError("Unexpected end of file")
+    for byte in rest:
+        value = value << 8 | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return None, length
+    return value, length
+
+class _Bytes:
+    """Minimal file-like reader over bytes, so element payloads parse like the file."""
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def read(self, n):
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += len(chunk)
+        return chunk
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self.pos = offset if whence == os.SEEK_SET else self.pos + offset
+
+    def tell(self):
+        return self.pos
+
+def _ebml_elements(f, end):
+    """Yield (id, size) for elements until end, leaving f at each payload."""
+    for _ in range(MAX_ELEMENTS):
+        if f.tell() >= end:
+            return
+        element_id, _ = _read_vint(f, keep_marker=True)
+        size, _ = _read_vint(f)
+        yield element_id, size
+
+def _ebml_uint(data):
+    return int.from_bytes(data, 'big')
+
+def _probe_matroska(f):
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    f.seek(4)  # Past the EBML header's id
+    header_size = _read_vint(f)[0]
+    f.seek(header_size, os.SEEK_CUR)
+    if _read_vint(f, keep_marker=True)[0] != 0x18538067:  # Segment
+        return None
+    segment_size = _read_vint(f)[0]
+    segment_end = file_size if segment_size is None else min(file_size, f.tell() + segment_size)
+    info = tracks = None
+    for element_id, size in _ebml_elements(f, segment_end):
+        if size is None:
+            return None  # Only clusters are written with unknown sizes; nothing to skip to
+        if element_id in (0x1549a966, 0x1654ae6b):  # Info, Tracks
+            payload = f.read(size)
+            if len(payload) < size:
+                return None  # Truncated; what is there would give partial tracks
+            if element_id == 0x1549a966:
+                info = payload
+            else:
+                tracks = payload
+        else:
+            f.seek(size, os.SEEK_CUR)  # SeekHead, Cues, Clusters, ...
+        if info is not None and tracks is not None:
+            break
+    if info is None and tracks is None:
+        return None
+
+    duration = 0.0
+    if info:
+        scale, ticks = 1000000, 0.0
+        reader = _Bytes(info)
+        for element_id, size in _ebml_elements(reader, len(info)):
+            payload = reader.read(size or 0)
+            if element_id == 0x2ad7b1:  # TimecodeScale, nanoseconds per tick
+                scale = _ebml_uint(payload)
+            elif element_id == 0x4489:  # Duration in ticks
+                ticks = struct.unpack('>f' if size == 4 else '>d', payload)[0]
+        duration = ticks * scale / 1e9
+
+    width = height = 0
+    video_codec = audio_codec = ''
+    if tracks:
+        reader = _Bytes(tracks)
+        for element_id, size in _ebml_elements(reader, len(tracks)):
+            entry = reader.read(size or 0)
+            if element_id != 0xae:  # TrackEntry
+                continue
+            track_type, codec_id, track_width, track_height = 0, '', 0, 0
+            entry_reader = _Bytes(entry)
+            for child_id, child_size in _ebml_elements(entry_reader, len(entry)):
+                payload = entry_reader.read(child_size or 0)
+                if child_id == 0x83:  # TrackType: 1 video, 2 audio
+                    track_type = _ebml_uint(payload)
+                elif child_id == 0x86:  # CodecID
+                    codec_id = payload.rstrip(b'\0').decode('ascii', 'replace')
+                elif child_id == 0xe0:  # Video
+                    video_reader = _Bytes(payload)
+                    for video_id, video_size in _ebml_elements(video_reader, len(payload)):
+                        value = _ebml_uint(video_reader.read(video_size or 0))
+                        if video_id == 0xb0:  # PixelWidth
+                            track_width = value
+                        elif video_id == 0xba:  # PixelHeight
+                            track_height = value
+            codec = MKV_CODECS.get(codec_id, codec_id.split('_', 1)[-1].lower())
+            if track_type == 1 and not video_codec:
+                width, height, video_codec = track_width, track_height, codec
+            elif track_type == 2 and not audio_codec:
+                audio_codec = codec
+    return MediaInfo(width, height, duration, video_codec or audio_codec)
+
+def media_cache_path(index_file):
+    """Where the media cache of an index file lives, e.g. file_index_media.json."""
+    root, ext = os.path.splitext(index_file)
+    return f"{root}_media{ext or '.json'}"
+
+class MediaCache(HashCache):
+    """Probed MediaInfo keyed by (inode, size, mtime), stored as JSON beside the index.
+
+    Files that turned out not to be readable media are remembered too, so
+    they aren't opened again either.
+    """
+    def __init__(self, path=None):
+        super().__init__(path)
+        self.lock = threading.Lock()  # The background scan and searches may share a cache
+
+    @staticmethod
+    def entry_key(index, path):
+        """Cache key from the index's metadata, or from a stat when the index has none."""
+        slot = index.slot_of.get(path) if index is not None else None
+        if slot is not None and index.sizes[slot] != UNKNOWN_SIZE:
+            return f"{index.inodes[slot]}:{index.sizes[slot]}:{index.mtimes[slot]!r}"
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return f"{st.st_ino}:{st.st_size}:{st.st_mtime!r}"
+
+    def put(self, key, kind, value):
+        with self.lock:
+            super().put(key, kind, value)
+
+    def save(self):
+        with self.lock:
+            super().save()
+
+def extract_media(paths, cache, index=None, progress=None, cancel=None):
+    """Look up the MediaInfo of the media files among paths, reading headers only on a cache miss.
+
+    Results go into index.media (None for files that aren't readable media)
+    and are returned as a {path: MediaInfo or None} dict. progress(done,
+    total) is called as headers are read; cancel() is polled and
+    SearchCancelled raised when it returns True.
+    """
+    found = index.media if index is not None else {}
+    todo = []
+    for i, path in enumerate(paths):
+        if not i % CANCEL_CHECK_INTERVAL and cancel is not None and cancel():
+            raise SearchCancelled()
+        if path in found or not is_media_name(path):
+            continue
+        key = cache.entry_key(index, path)
+        if key is None:
+            continue
+        cached = cache.get(key, 'media')
+        if cached is None:
+            todo.append((path, key))
+        else:
+            found[path] = MediaInfo(*cached) if cached else None
+    if not todo:
+        return found
+
+    def read_one(job):
+        if cancel is not None and cancel():
+            return job, None
+        try:
+            return job, probe(job[0])
+        except OSError:
+            return job, None
+
+    executor = ThreadPoolExecutor(max_workers=MEDIA_WORKERS, thread_name_prefix="media")
+    try:
+        for done, ((path, key), info) in enumerate(executor.map(read_one, todo), 1):
+            if cancel is not None and cancel():
+                raise SearchCancelled()
+            found[path] = info
+            cache.put(key, 'media', list(info) if info else [])
+            if progress and (done % 100 == 0 or done == len(todo)):
+                progress(done, len(todo))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    if index is not None:
+        index.media_changed()
+    return found
+
+MEDIA_FILTER = re.compile(r'(?<!\S)(width|height|duration|codec)\s*(>=|<=|>|<|=|:)\s*(\S+)', re.IGNORECASE)
+
+def parse_duration(text):
+    """Seconds from "90", "90s", "5m", "1.5h", "1:30" or "1:02:03"."""
+    text = text.lower()
+    if ':' in text:
+        seconds = 0.0
+        for part in text.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+def has_media_filters(keyword):
+    return MEDIA_FILTER.search(keyword) is not None
+
+def parse_media_filters(keyword):
+    """Split media filters such as width>=1920 off a query, returning (keyword, filters).
+
+    Raises ValueError for a filter whose value can't be read.
+    """
+    filters = []
+    for match in MEDIA_FILTER.finditer(keyword):
+        field, op, value = match.group(1).lower(), match.group(2), match.group(3)
+        if op == ':':
+            op = '='
+        if field == 'codec':
+            if op != '=':
+                raise ValueError(f"codec only supports codec:name, not {match.group(0)}")
+            filters.append((field, op, value.lower()))
+            continue
+        try:
+            number = parse_duration(value) if field == 'duration' else int(value.lower().rstrip('p'))
+        except ValueError:
+            raise ValueError(f"Can't read the value of {match.group(0)}")
+        filters.append((field, op, number))
+    return MEDIA_FILTER.sub('', keyword).strip(), filters
+
+_COMPARE = {
+    '>=': lambda a, b: a >= b, '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b, '<': lambda a, b: a < b, '=': lambda a, b: a == b,
+}
+
+def media_matches(info, filters):
+    """True if info (a MediaInfo or None) passes every filter."""
+    if info is None:
+        return not filters
+    for field, op, value in filters:
+        actual = getattr(info, field)
+        if field != 'codec' and not actual:
+            return False  # Unknown values never match a comparison
+        if not _COMPARE[op](actual, value):
+            return False
+    return True
+
+def filter_media(paths, filters, cache, index=None, cancel=None):
+    """The paths whose media metadata passes filters, in their original order."""
+    found = extract_media(paths, cache, index, cancel=cancel)
+    return [path for path in paths if media_matches(found.get(path), filters)]
@@ -0,0 +1,131 @@
+"""Saved searches kept up to date from index changes.
+
+A saved search is a keyword (matched like search_files) and an optional
+minimum size. Its matches are computed once when attached to an index and
+then maintained from the index's add/remove/rename notifications, so opening
+one never rescans the index. The paths seen when it was last opened are
+stored with it, so "new since last viewed" survives restarts and rebuilds.
+"""
+from search_core import normalize_filename
+
+class SavedSearch:
+    def __init__(self, name, keyword, min_size=0, seen=()):
+        self.name = name
+        self.keyword = keyword
+        self.min_size = min_size
+        self.normalized_keyword = normalize_filename(keyword)
+        self.seen = set(seen)  # Matches when it was last opened
+        self.matches = set()
+        self.new = set()  # Matches that weren't in seen
+
+    def accepts(self, path, size):
+        if self.min_size and size < self.min_size:
+            return False
+        return not self.normalized_keyword or self.normalized_keyword in normalize_filename(path)
+
+    def add(self, path):
+        self.matches.add(path)
+        if path not in self.seen:
+            self.new.add(path)
+
+    def discard(self, path):
+        self.matches.discard(path)
+        self.new.discard(path)
+
+    def to_dict(self):
+        return {"name": self.name, "keyword": self.keyword, "min_size": self.min_size,
+                "seen": sorted(self.seen & self.matches)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data.get("keyword", ""), data.get("min_size", 0), data.get("seen", ()))
+
+class SavedSearches:
+    """The saved searches of one FileIndex, registered as one of its watchers."""
+    def __init__(self, index=None):
+        self.index = None
+        self.searches = {}
+        if index is not None:
+            self.attach(index)
+
+    def attach(self, index, definitions=None):
+        """Watch index, loading definitions (default: the ones stored in it) and their matches."""
+        if self.index is not None and self in self.index.watchers:
+            self.index.watchers.remove(self)
+        self.index = index
+        if definitions is None:
+            definitions = index.saved_searches
+        self.searches = {}
+        for data in definitions:
+            search = SavedSearch.from_dict(data)
+            self.searches[search.name] = search
+        self.recompute(*self.searches.values())
+        index.watchers.append(self)
+        self.store()
+
+    def recompute(self, *searches):
+        """Match searches against the whole index, in one pass for all of them."""
+        if not searches:
+            return
+        for search in searches:
+            search.matches = set()
+            search.new = set()
+        sizes = self.index.sizes
+        for slot, path in self.index.slot_items():
+            for search in searches:
+                if search.accepts(path, sizes[slot]):
+                    search.add(path)
+
+    def store(self):
+        """Copy the definitions into the index so they are written with it."""
+        self.index.saved_searches = [search.to_dict() for search in self.searches.values()]
+
+    def __iter__(self):
+        return iter(self.searches.values())
+
+    def __len__(self):
+        return len(self.searches)
+
+    def get(self, name):
+        return self.searches.get(name)
+
+    def save_search(self, name, keyword, min_size=0):
+        """Add or replace a saved search; everything it matches now counts as seen."""
+        search = SavedSearch(name, keyword, min_size)
+        self.searches[name] = search
+        self.recompute(search)
+        search.seen = set(search.matches)
+        search.new = set()
+        self.store()
+        return search
+
+    def delete(self, name):
+        if self.searches.pop(name, None) is not None:
+            self.store()
+
+    def open(self, name):
+        """Return the search's matches in index order and mark them all as seen."""
+        search = self.searches[name]
+        slot_of = self.index.slot_of
+        results = sorted(search.matches, key=slot_of.__getitem__)
+        search.seen = set(search.matches)
+        search.new = set()
+        self.store()
+        return results
+
+    def on_add(self, path, size):
+        for search in self.searches.values():
+            if search.accepts(path, size):
+                search.add(path)
+
+    def on_remove(self, path, size):
+        for search in self.searches.values():
+            search.discard(path)
+
+    def on_rename(self, old_path, new_path, size):
+        for search in self.searches.values():
+            if old_path in search.seen:
+                search.seen.add(new_path)  # Already seen under its old name
+            search.discard(old_path)
+            if search.accepts(new_path, size):
+                search.add(new_path)
@@ -0,0 +1,239 @@
+import os
+import re
+import heapq
+import threading
+from bisect import bisect_right
+
+import tracing
+from file_index import UNKNOWN_SIZE, MEDIA_SORT_KEYS, path_sort_key
+
+CANCEL_CHECK_INTERVAL = 4096  # Paths matched between checks of a cancellation token
+
+class SearchCancelled(Exception):
+    """Raised by a scan whose cancellation token has been set."""
+
+class CancelToken:
+    """Cooperative cancellation flag shared by a caller and a running scan.
+
+    Scans check it between chunks of work. Calling the token returns whether
+    it has been cancelled, so it can be passed as the cancel callable that
+    content_search and find_duplicates take.
+    """
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def __call__(self):
+        return self.cancelled
+
+    def check(self):
+        if self.cancelled:
+            raise SearchCancelled()
+
+def normalize_filename(filename):
+    """Normalize the filename by converting to lowercase and removing non-alphanumeric characters except for letters, numbers, and dots."""
+    return re.sub(r'[^a-zA-Z0-9.]', '', filename.lower())
+
+def walk_paths(directory, cancel=None):
+    """Yield the path of every file below directory, in os.walk order.
+
+    cancel (e.g. a CancelToken) is checked once per directory; SearchCancelled
+    is raised when it returns True.
+    """
+    for root, _, files in os.walk(directory):
+        if cancel is not None and cancel():
+            raise SearchCancelled()
+        for file in files:
+            yield os.path.join(root, file)
+
+def iter_matches(paths, keyword, cancel=None):
+    """Yield the paths whose normalized form contains the normalized keyword.
+
+    This is the matching done by search_files, as a generator so callers can
+    stream results. An empty keyword matches everything. cancel is checked
+    every CANCEL_CHECK_INTERVAL paths.
+    """
+    normalized_keyword = normalize_filename(keyword)
+    if cancel is None:
+        if not normalized_keyword:
+            yield from paths
+            return
+        for file_path in paths:
+            if normalized_keyword in normalize_filename(file_path):
+                yield file_path
+        return
+    for i, file_path in enumerate(paths):
+        if not i % CANCEL_CHECK_INTERVAL and cancel():
+            raise SearchCancelled()
+        if not normalized_keyword or normalized_keyword in normalize_filename(file_path):
+            yield file_path
+
+def search_files(directory, keyword, indexed_files=None, cancel=None):
+    source_files = indexed_files if indexed_files else []
+    if not source_files and directory:
+        with tracing.span("walk", directory=directory):
+            source_files = list(walk_paths(directory, cancel))
+
+    if not normalize_filename(keyword):
+        return list(source_files)
+    with tracing.span("match", keyword=keyword) as span:
+        results = list(iter_matches(source_files, keyword, cancel))
+        span.set(results=len(results), scanned=len(source_files))
+    return results
+
+def _stat_key(path, key):
+    if key in MEDIA_SORT_KEYS:
+        return 0.0  # Media metadata is only known for indexed files
+    try:
+        st = os.stat(path)
+    except OSError:
+        return UNKNOWN_SIZE if key == "size" else 0.0
+    return st.st_size if key == "size" else st.st_mtime
+
+def sort_results(paths, index=None, key=None, reverse=False, offset=0, limit=0):
+    """Return paths ordered by key (one of file_index.SORT_KEYS).
+
+    Indexed paths are ordered by the index's sort-key arrays; only paths the
+    index doesn't know are stat'ed. With a limit just the page
+    [offset, offset + limit) is selected, with a heap rather than a full sort
+    when the page is near the front. Ties keep their found order. key None
+    keeps found order and only pages.
+    """
+    if not key:
+        return list(paths[offset:offset + limit] if limit else paths[offset:])
+    with tracing.span("sort", key=key, results=len(paths)) as span:
+        slot_of = index.slot_of if index is not None else {}
+        slots = [slot_of.get(path) for path in paths]
+        if index is None or None in slots:
+            # Some results aren't in the index; build keys for all of them directly
+            if key in ("name", "folder"):
+                keys = [path_sort_key(path, key) for path in paths]
+            else:
+                values = index.sort_keys(key) if index is not None else None
+                keys = [values[slot] if slot is not None else _stat_key(path, key)
+                        for path, slot in zip(paths, slots)]
+        else:
+            values = index.sort_keys(key)
+            keys = [values[slot] for slot in slots]
+        positions = range(len(paths))
+        wanted = offset + limit if limit else len(paths)
+        if wanted < len(paths) // 4:
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            order = select(wanted, positions, key=keys.__getitem__)
+        else:
+            order = sorted(positions, key=keys.__getitem__, reverse=reverse)
+        page = [paths[i] for i in order[offset:wanted]]
+        span.set(page=len(page))
+    return page
+
+def group_by_directory(paths, index=None, key=None, reverse=False):
+    """Group paths by folder as [(folder, paths)], each folder's files ordered by key.
+
+    Folders come in the order of their first file under that ordering, so
+    sorting by size, largest first, puts the folder holding the biggest file
+    first.
+    """
+    groups = {}
+    for path in sort_results(paths, index, key, reverse):
+        groups.setdefault(os.path.dirname(path), []).append(path)
+    return list(groups.items())
+
+class LinearMatcher:
+    """Reference matcher: search_files over the paths as given."""
+    def __init__(self, paths):
+        self.paths = list(paths)
+
+    def search(self, keyword):
+        return search_files(None, keyword, self.paths)
+
+class NormalizedMatcher:
+    """Normalizes every path once up front, then does plain substring checks."""
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.normalized = [normalize_filename(path) for path in self.paths]
+
+    def search(self, keyword):
+        normalized_keyword = normalize_filename(keyword)
+        if not normalized_keyword:
+            return list(self.paths)
+        return [path for path, normalized in zip(self.paths, self.normalized)
+                if normalized_keyword in normalized]
+
+class JoinedMatcher:
+    """Runs str.find over one newline-joined string of normalized paths.
+
+    Normalized names only contain [a-z0-9.], so a newline can't be part of a
+    match; hits are mapped back to paths by bisecting the start offsets and the
+    scan then skips to the next path, keeping index order.
+    """
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.starts = []
+        offset = 0
+        normalized = []
+        for path in self.paths:
+            name = normalize_filename(path)
+            self.starts.append(offset)
+            normalized.append(name)
+            offset += len(name) + 1
+        self.starts.append(offset)
+        self.text = "\n".join(normalized) + "\n"
+
+    def search(self, keyword, limit=0):
+        """Matching paths in index order; with a limit the scan stops after that many."""
+        normalized_keyword = normalize_filename(keyword)
+        if not normalized_keyword:
+            return list(self.paths[:limit] if limit else self.paths)
+        results = []
+        find = self.text.find
+        starts = self.starts
+        pos = 0
+        while True:
+            hit = find(normalized_keyword, pos)
+            if hit == -1:
+                break
+            i = bisect_right(starts, hit) - 1
+            results.append(self.paths[i])
+            if len(results) == limit:
+                break
+            pos = starts[i + 1]
+        return results
+
+class MatcherCache:
+    """A JoinedMatcher over a FileIndex, rebuilt only when the index changes.
+
+    Building costs one normalization pass over the index; queries after that
+    take milliseconds, which is what search-as-you-type needs. Safe to share
+    between threads; a second caller waits for a build in progress.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index = None
+        self.version = None
+        self.matcher = None
+
+    def get(self, index, version, paths):
+        """The matcher for index as of version, built from paths unless it is cached.
+
+        The caller reads version and paths (FileIndex.paths()) together on
+        the thread that changes index, so a build never reads the live index.
+        """
+        with self.lock:
+            if self.index is not index or self.version != version:
+                with tracing.span("matcher_build") as span:
+                    self.matcher = JoinedMatcher(paths)
+                    span.set(entries=len(self.matcher.paths))
+                self.index = index
+                self.version = version
+            return self.matcher
+
+# Matcher backends by name; "linear" is the reference the others must agree with
+MATCHERS = {
+    "linear": LinearMatcher,
+    "normalized": NormalizedMatcher,
+    "joined": JoinedMatcher,
+}
@@ -0,0 +1,252 @@
+"""Warm-index search service over a Unix domain socket.
+
+The daemon keeps index files loaded (reloading one when its file changes) and
+answers name searches for any number of concurrent clients. The protocol is
+newline-delimited JSON; a client sends one request per line:
+
+    {"op": "search", "index": "/abs/file_index.json", "keyword": "mp4", "limit": 0, "meta": false,
+     "sort": "size", "reverse": true}
+    {"op": "ping"}    {"op": "stats"}    {"op": "shutdown"}
+
+and a search is answered with batches followed by a terminator:
+
+    {"paths": ["/a/b.mp4", ...]}            (or "rows": [[path, size, mtime], ...] with meta)
+    {"done": true, "count": 1234}
+    {"error": "message"}                    on failure
+
+Start it with "python file_search.py serve"; clients fall back to searching
+in-process when it isn't running.
+"""
+import os
+import sys
+import json
+import socket
+import threading
+import socketserver
+
+import tracing
+from file_index import load_index_file
+from search_core import JoinedMatcher, sort_results
+
+BATCH_SIZE = 1000  # Paths per response line
+CONNECT_TIMEOUT = 0.2  # Seconds; a missing daemon should cost almost nothing
+
+class DaemonUnavailable(ConnectionError):
+    """No daemon is listening, or it answered with an error."""
+
+def is_supported():
+    return hasattr(socket, "AF_UNIX") and hasattr(socketserver, "ThreadingUnixStreamServer")
+
+def default_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "filesearch.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join("/tmp", f"filesearch-{uid}.sock")
+
+class ResidentIndex:
+    """One loaded index file with a matcher built over it."""
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self.mtime = os.path.getmtime(index_file)
+        self.directory, self.index = load_index_file(index_file)
+        with tracing.span("daemon_matcher_build", entries=len(self.index)):
+            self.matcher = JoinedMatcher(self.index)
+
+class IndexCache:
+    """Index files kept in memory, reloaded when they change on disk."""
+    def __init__(self):
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    def get(self, index_file):
+        index_file = os.path.abspath(index_file)
+        mtime = os.path.getmtime(index_file)
+        with self.lock:
+            resident = self.indexes.get(index_file)
+            if resident is None or resident.mtime != mtime:
+                resident = ResidentIndex(index_file)
+                self.indexes[index_file] = resident
+        return resident
+
+    def stats(self):
+        with self.lock:
+            return {path: {"directory": resident.directory, "entries": len(resident.index)}
+                    for path, resident in self.indexes.items()}
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def send(self, message):
+        self.wfile.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n")
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not self.dispatch(request):
+                    return
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            except Exception as e:
+                try:
+                    self.send({"error": str(e)})
+                except OSError:
+                    return
+            self.wfile.flush()
+
+    def dispatch(self, request):
+        op = request.get("op")
+        if op == "ping":
+            self.send({"ok": True, "pid": os.getpid()})
+        elif op == "stats":
+            self.send({"indexes": self.server.cache.stats()})
+        elif op == "shutdown":
+            self.send({"ok": True})
+            self.wfile.flush()
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return False
+        elif op == "search":
+            self.search(request)
+        else:
+            self.send({"error": f"Unknown op: {op}"})
+        return True
+
+    def search(self, request):
+        resident = self.server.cache.get(request["index"])
+        directory = request.get("directory")
+        if directory and os.path.abspath(directory) != os.path.abspath(resident.directory or ""):
+            self.send({"error": "Index is for a different directory"})
+            return
+        limit = request.get("limit") or 0
+        with tracing.span("daemon_search", keyword=request.get("keyword", "")) as span:
+            # Without a sort, a limited search can stop scanning early
+            results = resident.matcher.search(request.get("keyword", ""), 0 if request.get("sort") else limit)
+            if request.get("sort"):
+                results = sort_results(results, resident.index, request["sort"], bool(request.get("reverse")), 0, limit)
+            elif limit:
+                results = results[:limit]
+            span.set(results=len(results))
+        index = resident.index
+        for start in range(0, len(results), BATCH_SIZE):
+            batch = results[start:start + BATCH_SIZE]
+            if request.get("meta"):
+                rows = []
+                for path in batch:
+                    slot = index.slot_of.get(path)
+                    rows.append([path, index.sizes[slot], index.mtimes[slot]] if slot is not None else [path, -1, 0.0])
+                self.send({"rows": rows})
+            else:
+                self.send({"paths": batch})
+        self.send({"done": True, "count": len(results)})
+
+class SearchServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        self.cache = IndexCache()
+        super().__init__(socket_path, RequestHandler)
+
+def serve(socket_path=None, preload=()):
+    """Run the daemon in the foreground until it is shut down."""
+    if not is_supported():
+        print("Error: the search daemon needs Unix domain sockets", file=sys.stderr)
+        return 2
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        try:
+            request(socket_path, {"op": "ping"})
+            print(f"Error: a daemon is already listening on {socket_path}", file=sys.stderr)
+            return 1
+        except DaemonUnavailable:
+            os.remove(socket_path)  # Left behind by a daemon that died
+    old_umask = os.umask(0o077)  # Socket only usable by this user
+    try:
+        server = SearchServer(socket_path)
+    finally:
+        os.umask(old_umask)
+    for index_file in preload:
+        try:
+            server.cache.get(index_file)
+        except Exception as e:
+            print(f"Error loading index {index_file}: {str(e)}", file=sys.stderr)
+    print(f"Serving searches on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+    return 0
+
+def _connect(socket_path):
+    if not is_supported():
+        raise DaemonUnavailable("Unix domain sockets are not supported here")
+    socket_path = socket_path or default_socket_path()
+    if not os.path.exists(socket_path):
+        raise DaemonUnavailable(f"No daemon socket at {socket_path}")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(socket_path)
+    except OSError as e:
+        sock.close()
+        raise DaemonUnavailable(str(e))
+    sock.settimeout(None)
+    return sock
+
+def _messages(sock):
+    with sock.makefile('rb') as reader:
+        for line in reader:
+            message = json.loads(line)
+            if "error" in message:
+                raise DaemonUnavailable(message["error"])
+            yield message
+
+def request(socket_path, message):
+    """Send a single-reply request (ping, stats, shutdown) and return the reply."""
+    sock = _connect(socket_path)
+    try:
+        sock.sendall(json.dumps(message).encode('utf-8') + b"\n")
+        for reply in _messages(sock):
+            return reply
+        raise DaemonUnavailable("Daemon closed the connection")
+    finally:
+        sock.close()
+
+def query(keyword, index_file, socket_path=None, directory=None, limit=0, meta=False, sort=None, reverse=False):
+    """Search through the daemon, yielding paths (or (path, size, mtime) with meta).
+
+    Raises DaemonUnavailable before yielding anything if no daemon can serve
+    the request, so callers can fall back to an in-process search.
+    """
+    sock = _connect(socket_path)
+    try:
+        sock.sendall(json.dumps({"op": "search", "index": os.path.abspath(index_file), "keyword": keyword,
+                                 "directory": os.path.abspath(directory) if directory else directory,
+                                 "limit": limit, "meta": meta, "sort": sort, "reverse": reverse}).encode('utf-8') + b"\n")
+        messages = _messages(sock)
+        first = next(messages, None)  # Surface errors before the caller starts consuming
+        if first is None:
+            raise DaemonUnavailable("Daemon closed the connection")
+        return _results(sock, first, messages, meta)
+    except Exception:
+        sock.close()
+        raise
+
+def _results(sock, first, messages, meta):
+    try:
+        message = first
+        while True:
+            if message.get("done"):
+                return
+            if meta:
+                for path, size, mtime in message.get("rows", []):
+                    yield path, size, mtime
+            else:
+                yield from message.get("paths", [])
+            message = next(messages, None)
+            if message is None:
+                raise DaemonUnavailable("Daemon closed the connection mid-search")
+    finally:
+        sock.close()
@@ -0,0 +1,305 @@
+"""Out-of-core index: fixed-size segment files searched one at a time.
+
+For machines where a whole FileIndex doesn't fit in memory. The index is
+written as a directory of segment files of at most SEGMENT_BYTES each,
+plus a manifest.json listing them. Writing streams from walk_entries, and
+a search streams through the segments, so memory stays the same whatever
+the size of the index: two segment buffers plus the output.
+
+Each segment holds the same data as a JoinedMatcher, laid out so it can be
+used straight from the read buffer:
+
+    header          magic, entry count, byte lengths of the two text blocks
+    name_starts     uint32 offset of each normalized name, plus the end
+    names           normalized names (ASCII [a-z0-9.]) joined by newlines
+    path_starts     uint32 offset of each UTF-8 path, plus the end
+    paths           the paths, back to back
+    sizes, mtimes   int64 and float64 per entry
+
+Every block starts on an 8-byte boundary, so the arrays are memoryview
+casts of the buffer rather than copies. A search runs bytearray.find over
+the names block and decodes only the paths that match. While one segment
+is matched, the next is read into the other buffer on a background
+thread, so a search runs at close to the speed of reading the files in
+order.
+
+Segments are written in the machine's byte order, which the manifest
+records.
+"""
+import os
+import sys
+import json
+import heapq
+import shutil
+import struct
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+from search_core import normalize_filename, SearchCancelled
+
+SEGMENT_BYTES = 4 * 1024 * 1024  # Most a segment file holds, unless one entry alone is bigger
+MANIFEST = "manifest.json"
+_MAGIC = b"FSSEG01\0"
+_HEADER = struct.Struct("=8sIII4x")  # magic, entries, names bytes, paths bytes; 24 bytes
+_ENTRY_OVERHEAD = 4 + 4 + 8 + 8  # name start, path start, size, mtime
+
+def segments_path(index_file):
+    """The directory holding the segmented form of index_file."""
+    root, _ = os.path.splitext(index_file)
+    return root + "_segments"
+
+def _pad(n):
+    return (n + 7) & ~7
+
+def _layout(count, names_len, paths_len):
+    """Offsets of (name_starts, names, path_starts, paths, sizes, mtimes, end) in a segment."""
+    starts_len = _pad(4 * (count + 1))
+    name_starts = _HEADER.size
+    names = name_starts + starts_len
+    path_starts = names + _pad(names_len)
+    paths = path_starts + starts_len
+    sizes = paths + _pad(paths_len)
+    mtimes = sizes + 8 * count
+    return name_starts, names, path_starts, paths, sizes, mtimes, mtimes + 8 * count
+
+class SegmentWriter:
+    """Collects entries and writes a segment file each time SEGMENT_BYTES worth have been added."""
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segments = []  # Manifest entries of the segments written so far
+        self.entries = 0
+        self._reset()
+
+    def _reset(self):
+        self.names = []
+        self.paths = []
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.pending = _HEADER.size
+
+    def add(self, path, size, mtime):
+        name = normalize_filename(path).encode('ascii')
+        encoded = path.encode('utf-8', 'surrogateescape')
+        needed = len(name) + 1 + len(encoded) + _ENTRY_OVERHEAD + 32  # 32: worst-case padding
+        if self.names and self.pending + needed > self.segment_bytes:
+            self.flush()
+        self.names.append(name)
+        self.paths.append(encoded)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        self.pending += needed - 32
+
+    def flush(self):
+        if not self.names:
+            return
+        count = len(self.names)
+        name_starts = array('I', [0])
+        for name in self.names:
+            name_starts.append(name_starts[-1] + len(name) + 1)
+        path_starts = array('I', [0])
+        for encoded in self.paths:
+            path_starts.append(path_starts[-1] + len(encoded))
+        names = b"\n".join(self.names) + b"\n"
+        paths = b"".join(self.paths)
+        offsets = _layout(count, len(names), len(paths))
+        data = bytearray(offsets[-1])
+        data[:_HEADER.size] = _HEADER.pack(_MAGIC, count, len(names), len(paths))
+        for offset, block in zip(offsets, (name_starts.tobytes(), names, path_starts.tobytes(), paths,
+                                           self.sizes.tobytes(), self.mtimes.tobytes())):
+            data[offset:offset + len(block)] = block
+        file = f"{len(self.segments):05d}.seg"
+        with open(os.path.join(self.directory, file), 'wb') as f:
+            f.write(data)
+        self.segments.append({"file": file, "entries": count, "bytes": len(data)})
+        self.entries += count
+        self._reset()
+
+def write_segments(segments_dir, directory, entries, segment_bytes=SEGMENT_BYTES):
+    """Write (path, size, mtime, ...) entries, e.g. from walk_entries, as a segmented index; returns the count.
+
+    The segments are written to a new directory that replaces segments_dir
+    once complete, so searches never see a half-written index.
+    """
+    temp = segments_dir + ".tmp"
+    shutil.rmtree(temp, ignore_errors=True)
+    os.makedirs(temp)
+    writer = SegmentWriter(temp, segment_bytes)
+    with tracing.span("segments_write", directory=directory) as span:
+        for entry in entries:
+            writer.add(entry[0], entry[1], entry[2])
+        writer.flush()
+        manifest = {
+            "directory": directory,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "byteorder": sys.byteorder,
+            "segment_bytes": segment_bytes,
+            "entries": writer.entries,
+            "segments": writer.segments,
+        }
+        with open(os.path.join(temp, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        old = segments_dir + ".old"
+        if os.path.exists(segments_dir):
+            shutil.rmtree(old, ignore_errors=True)
+            os.replace(segments_dir, old)
+        os.replace(temp, segments_dir)
+        shutil.rmtree(old, ignore_errors=True)
+        span.set(entries=writer.entries, segments=len(writer.segments))
+    return writer.entries
+
+class Segment:
+    """One segment as views into a read buffer; only valid until the buffer is reused."""
+    def __init__(self, buffer, size):
+        magic, self.count, names_len, paths_len = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC:
+            raise ValueError("Not an index segment")
+        offsets = _layout(self.count, names_len, paths_len)
+        if offsets[-1] != size:
+            raise ValueError("Index segment has the wrong size")
+        view = memoryview(buffer)
+        n = self.count
+        self.buffer = buffer
+        self.name_starts = view[offsets[0]:offsets[0] + 4 * (n + 1)].cast('I')
+        self.names = offsets[1]
+        self.names_end = offsets[1] + names_len
+        self.path_starts = view[offsets[2]:offsets[2] + 4 * (n + 1)].cast('I')
+        self.paths = offsets[3]
+        self.sizes = view[offsets[4]:offsets[4] + 8 * n].cast('q')
+        self.mtimes = view[offsets[5]:offsets[5] + 8 * n].cast('d')
+        self.views = (view, self.name_starts, self.path_starts, self.sizes, self.mtimes)
+
+    def release(self):
+        """Let go of the buffer so it can be read into (or resized) again."""
+        for view in reversed(self.views):
+            view.release()
+
+    def path(self, i):
+        start = self.paths + self.path_starts[i]
+        return self.buffer[start:self.paths + self.path_starts[i + 1]].decode('utf-8', 'surrogateescape')
+
+    def all_paths(self):
+        """Every path in the segment, decoded in one go."""
+        starts = self.path_starts.tolist()
+        block = self.buffer[self.paths:self.paths + starts[-1]]
+        if block.isascii():  # Byte offsets are character offsets, so slice the decoded text
+            text = block.decode('ascii')
+            return [text[start:end] for start, end in zip(starts, starts[1:])]
+        return [block[start:end].decode('utf-8', 'surrogateescape') for start, end in zip(starts, starts[1:])]
+
+    def matches(self, keyword):
+        """Positions of the entries whose normalized path contains keyword (normalized, as bytes)."""
+        find = self.buffer.find
+        starts = self.name_starts
+        base = self.names
+        end = self.names_end
+        pos = base
+        while True:
+            hit = find(keyword, pos, end)
+            if hit == -1:
+                return
+            i = bisect_right(starts, hit - base) - 1
+            yield i
+            pos = base + starts[i + 1]
+
+class SegmentedIndex:
+    """A segmented index on disk, opened from its manifest; nothing else is read until a search."""
+    def __init__(self, segments_dir):
+        self.segments_dir = segments_dir
+        with open(os.path.join(segments_dir, MANIFEST), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("byteorder") != sys.byteorder:
+            raise ValueError("The segmented index was written on a machine with another byte order; reindex")
+        self.directory = manifest.get("directory")
+        self.segments = manifest["segments"]
+        self.entries = manifest["entries"]
+
+    def __len__(self):
+        return self.entries
+
+    def _read(self, segment, buffer):
+        size = segment["bytes"]
+        if len(buffer) < size:
+            buffer.extend(bytes(size - len(buffer)))  # Only for a single oversized entry
+        with open(os.path.join(self.segments_dir, segment["file"]), 'rb', buffering=0) as f:
+            view = memoryview(buffer)[:size]
+            try:
+                if f.readinto(view) != size:
+                    raise ValueError(f"Index segment {segment['file']} is truncated")
+            finally:
+                view.release()
+        return buffer, size
+
+    def scan(self, prefetch=True, cancel=None):
+        """Yield each Segment in order; a segment's views are invalid once the next one is requested.
+
+        With prefetch the next segment is read on a helper thread while the
+        caller works on the current one. cancel() is polled between
+        segments and SearchCancelled raised when it returns True.
+        """
+        buffers = [bytearray(SEGMENT_BYTES), bytearray(SEGMENT_BYTES if prefetch else 0)]
+        pool = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            pending = None
+            for i, segment in enumerate(self.segments):
+                if cancel is not None and cancel():
+                    raise SearchCancelled()
+                if pending is not None:
+                    buffer, size = pending.result()
+                else:
+                    buffer, size = self._read(segment, buffers[i % 2])
+                if pool is not None and i + 1 < len(self.segments):
+                    pending = pool.submit(self._read, self.segments[i + 1], buffers[(i + 1) % 2])
+                current = Segment(buffer, size)
+                try:
+                    yield current
+                finally:
+                    current.release()
+            if pending is not None:
+                pending.result()
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+    def search(self, keyword, limit=0, meta=False, prefetch=True, cancel=None):
+        """Yield matching paths (or (path, size, mtime) with meta) in index order, like iter_matches."""
+        normalized = normalize_filename(keyword).encode('ascii')
+        found = 0
+        with tracing.span("segments_search", keyword=keyword, segments=len(self.segments)) as span:
+            for segment in self.scan(prefetch, cancel):
+                if normalized:
+                    positions = segment.matches(normalized)
+                    rows = [segment.path(i) for i in positions] if not meta else \
+                        [(segment.path(i), segment.sizes[i], segment.mtimes[i]) for i in positions]
+                else:
+                    rows = segment.all_paths()
+                    if meta:
+                        rows = list(zip(rows, segment.sizes.tolist(), segment.mtimes.tolist()))
+                if limit and found + len(rows) >= limit:
+                    yield from rows[:limit - found]
+                    found = limit
+                    break
+                found += len(rows)
+                yield from rows
+            span.set(results=found)
+
+def sort_rows(rows, key, reverse=False, limit=0):
+    """Order (path, size, mtime) rows from a segmented search by key: name, folder, size or mtime.
+
+    Only the matches are held, never the index; with a limit only the top
+    rows are kept, in a heap.
+    """
+    from file_index import path_sort_key
+    if key == "size":
+        sort_key = lambda row: row[1]
+    elif key == "mtime":
+        sort_key = lambda row: row[2]
+    else:
+        sort_key = lambda row: path_sort_key(row[0], key)
+    if limit:
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return select(limit, rows, key=sort_key)
+    return sorted(rows, key=sort_key, reverse=reverse)
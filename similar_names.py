@@ -0,0 +1,131 @@
+"""Clusters of near-identical file names, found with MinHash and LSH banding.
+
+Every distinct name (normalized with normalize_filename, with copy markers
+like " (1)" and " - Copy" dropped) is cut into character shingles and given
+a MinHash signature. Signatures are split into bands; names that agree on
+all the rows of any band land in the same bucket and become candidates, and
+only candidates have their shingle sets compared. That keeps the whole
+index to roughly linear work instead of comparing every pair of names.
+"""
+import os
+import re
+import zlib
+import random
+
+from search_core import normalize_filename, SearchCancelled, CANCEL_CHECK_INTERVAL
+
+SHINGLE_SIZE = 3  # Characters per shingle
+NUM_HASHES = 32  # MinHash signature length
+DEFAULT_THRESHOLD = 0.7  # Jaccard similarity of shingle sets
+BUCKET_CAP = 16  # Names kept per LSH bucket to compare newcomers with, so crowded buckets stay linear
+_MASK = (1 << 64) - 1
+_COPY_MARKER = re.compile(r'(\s*\(\d+\)|\s*\[\d+\]|[\s_-]*copy(\s*(of|\(?\d+\)?))?)+$', re.IGNORECASE)
+
+_rng = random.Random(0x5eed)  # Fixed seed, so every run clusters the same names
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_HASHES)]
+
+def name_key(path):
+    """The normalized basename that similarity is measured on."""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return normalize_filename(_COPY_MARKER.sub('', stem) + ext)
+
+def shingles(name, size=SHINGLE_SIZE):
+    if len(name) <= size:
+        return {name}
+    return {name[i:i + size] for i in range(len(name) - size + 1)}
+
+def permuted_hashes(shingle):
+    """The shingle's value under every permutation, cut to 30 bits so they compare as small ints.
+
+    The shingle is hashed with CRC-32 rather than hash(), which is salted
+    per process and would make clusters vary from run to run.
+    """
+    h = zlib.crc32(shingle.encode('utf-8', 'surrogateescape'))
+    return tuple([((a * h + b) & _MASK) >> 34 for a, b in _PERMUTATIONS])
+
+def signature(shingle_set, cache=None):
+    """MinHash signature: the minimum of each hash permutation over the shingles.
+
+    File names share most of their shingles, so passing a dict as cache
+    saves rehashing them for every name.
+    """
+    if cache is None:
+        cache = {}
+    for shingle in shingle_set:
+        if shingle not in cache:
+            cache[shingle] = permuted_hashes(shingle)
+    return list(map(min, zip(*map(cache.__getitem__, shingle_set))))
+
+def lsh_bands(threshold, num_hashes=NUM_HASHES):
+    """(bands, rows) whose S-curve crosses (1/bands)**(1/rows) closest to, but not above, threshold.
+
+    Erring low adds candidates rather than missing pairs; candidates are
+    checked exactly, so extra ones only cost time.
+    """
+    best = None
+    for rows in range(1, num_hashes + 1):
+        bands = num_hashes // rows
+        knee = (1 / bands) ** (1 / rows)
+        if knee <= threshold and (best is None or knee > best[0]):
+            best = (knee, bands, rows)
+    return (best[1], best[2]) if best else (num_hashes, 1)
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+def find_similar_names(paths, threshold=DEFAULT_THRESHOLD, progress=None, cancel=None):
+    """Return clusters of paths whose names are at least threshold similar, biggest first.
+
+    paths is any iterable of paths (e.g. a FileIndex). Names that are equal
+    after normalization always share a cluster. progress(done, total) is
+    called while signatures are computed; cancel() is polled and
+    SearchCancelled raised when it returns True.
+    """
+    by_name = {}
+    for path in paths:
+        key = name_key(path)
+        if len(key) >= SHINGLE_SIZE:  # Shorter names are too generic to compare
+            by_name.setdefault(key, []).append(path)
+    names = list(by_name)
+    parent = list(range(len(names)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    bands, rows = lsh_bands(threshold)
+    buckets = [{} for _ in range(bands)]
+    shingle_sets = []
+    hash_cache = {}
+    for i, name in enumerate(names):
+        if not i % CANCEL_CHECK_INTERVAL:
+            if cancel is not None and cancel():
+                raise SearchCancelled()
+            if progress:
+                progress(i, len(names))
+        shingle_set = shingles(name)
+        shingle_sets.append(shingle_set)
+        sig = signature(shingle_set, hash_cache)
+        for band, bucket in enumerate(buckets):
+            start = band * rows
+            members = bucket.setdefault(tuple(sig[start:start + rows]), [])
+            for other in members:
+                if find(other) != find(i) and jaccard(shingle_sets[other], shingle_set) >= threshold:
+                    parent[find(i)] = find(other)
+            if len(members) < BUCKET_CAP:
+                members.append(i)
+    if progress:
+        progress(len(names), len(names))
+
+    clusters = {}
+    for i, name in enumerate(names):
+        clusters.setdefault(find(i), []).append(name)
+    result = []
+    for members in clusters.values():
+        cluster = [path for name in sorted(members) for path in by_name[name]]
+        if len(cluster) > 1:
+            result.append(cluster)
+    result.sort(key=lambda cluster: (-len(cluster), name_key(cluster[0])))
+    return result
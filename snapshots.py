@@ -0,0 +1,102 @@
+"""The previous generation of an index, kept to show what changed since.
+
+Before a reindex replaces an index, its entries are written to
+<index>_previous.json sorted by path. diff_index() reads that snapshot once
+and looks each path up in the new index's path -> slot map (a hash join).
+Every slot it finds is marked, and afterwards the unmarked slots are the
+added files. Both generations are visited once and nothing is sorted but
+the added files, so multi-million entry indexes diff in a few seconds.
+"""
+import os
+import json
+from datetime import datetime
+from itertools import compress
+
+import tracing
+from search_core import SearchCancelled, CANCEL_CHECK_INTERVAL
+
+_FLIP = bytes([1, 0]) + bytes(254)  # bytes.translate table swapping 0 and 1
+
+def snapshot_path(index_file):
+    """Where the generation before index_file's current one is kept."""
+    root, _ = os.path.splitext(index_file)
+    return root + "_previous.json"
+
+def save_snapshot(snapshot_file, directory, index):
+    """Write index's entries, sorted by path, as the previous generation for directory."""
+    with tracing.span("snapshot_save", file=snapshot_file, entries=len(index)):
+        paths = sorted(index)
+        slots = list(map(index.slot_of.__getitem__, paths))
+        data = {
+            'directory': directory,
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'files': paths,
+            'sizes': list(map(index.sizes.__getitem__, slots)),
+            'mtimes': list(map(index.mtimes.__getitem__, slots)),
+        }
+        with open(snapshot_file + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False))  # One C-encoded string; json.dump encodes piecewise
+        os.replace(snapshot_file + '.tmp', snapshot_file)
+
+def is_snapshot_of(snapshot, directory):
+    """True if snapshot holds an earlier index of directory."""
+    previous = snapshot.get('directory')
+    return bool(previous and directory) and (os.path.normcase(os.path.abspath(previous))
+                                             == os.path.normcase(os.path.abspath(directory)))
+
+def load_snapshot(snapshot_file):
+    """The snapshot's dict ('directory', 'timestamp', 'files', 'sizes', 'mtimes'), or None if there is none."""
+    if not os.path.exists(snapshot_file):
+        return None
+    with tracing.span("snapshot_load", file=snapshot_file):
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+class IndexDiff:
+    """Paths added, removed and modified (different size or mtime) between two index generations, each sorted."""
+    def __init__(self, added, removed, modified, since=None):
+        self.added = added
+        self.removed = removed
+        self.modified = modified
+        self.since = since  # When the older generation was replaced by a reindex
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.modified)
+
+    def groups(self):
+        """[(heading, paths)] for the kinds of change that happened."""
+        return [(heading, paths) for heading, paths in
+                (("Added", self.added), ("Modified", self.modified), ("Removed", self.removed)) if paths]
+
+def diff_index(snapshot, index, cancel=None):
+    """Compare a snapshot (as from load_snapshot) with index and return an IndexDiff.
+
+    Files whose size wasn't known in either generation count as modified
+    only when their mtime changed. cancel() is polled and SearchCancelled
+    raised when it returns True.
+    """
+    with tracing.span("index_diff", before=len(snapshot['files']), after=len(index)) as span:
+        slot_of = index.slot_of
+        sizes = index.sizes
+        mtimes = index.mtimes
+        seen = bytearray(len(index.slots))
+        removed = []
+        modified = []
+        files = snapshot['files']
+        for start in range(0, len(files), CANCEL_CHECK_INTERVAL):
+            if cancel is not None and cancel():
+                raise SearchCancelled()
+            end = start + CANCEL_CHECK_INTERVAL
+            chunk = files[start:end]
+            for path, slot, size, mtime in zip(chunk, map(slot_of.get, chunk),
+                                               snapshot['sizes'][start:end], snapshot['mtimes'][start:end]):
+                if slot is None:
+                    removed.append(path)
+                    continue
+                seen[slot] = 1
+                if mtimes[slot] != mtime or (size != sizes[slot] and size >= 0 and sizes[slot] >= 0):
+                    modified.append(path)
+        unseen = seen.translate(_FLIP)
+        added = sorted(filter(None, compress(index.slots, unseen)))  # None: tombstones
+        span.set(added=len(added), removed=len(removed), modified=len(modified))
+    return IndexDiff(added, removed, modified, snapshot.get('timestamp'))
@@ -0,0 +1,94 @@
+"""Regenerate the small media files test_media_info.py reads: python tests/fixtures/make_media.py
+
+PNG, JPEG and WebP are written by Qt (PyQt6 is needed); GIF, MP4 and
+Matroska are put together here, with the fields the parsers read.
+"""
+import os
+import struct
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def qt_images():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtGui import QImage, QColor, QGuiApplication
+    app = QGuiApplication([])
+    for name, width, height, quality in [("tiny.png", 7, 5, -1), ("tiny.jpg", 33, 17, 90),
+                                         ("tiny.webp", 21, 11, 80), ("tiny_lossless.webp", 300, 2, 100)]:
+        image = QImage(width, height, QImage.Format.Format_RGB32)
+        image.fill(QColor(200, 30, 90))
+        image.setPixelColor(1, 1, QColor(0, 255, 0))  # Qt can't read back a lossless WebP of one colour
+        if not image.save(os.path.join(HERE, name), None, quality):
+            raise RuntimeError(f"Qt couldn't write {name}")
+    del app
+
+def gif(width, height):
+    """A one-colour GIF89a; every pixel is index 0, LZW-coded without growing the table."""
+    min_code_size = 2
+    clear, end = 1 << min_code_size, (1 << min_code_size) + 1
+    codes = []
+    for i in range(width * height):
+        if i % 2 == 0:
+            codes.append(clear)  # Reset before the table would need wider codes
+        codes.append(0)
+    codes.append(end)
+    bits, nbits, data = 0, 0, bytearray()
+    for code in codes:
+        bits |= code << nbits
+        nbits += min_code_size + 1
+        while nbits >= 8:
+            data.append(bits & 0xff)
+            bits >>= 8
+            nbits -= 8
+    if nbits:
+        data.append(bits)
+    out = b"GIF89a" + struct.pack("<HHBBB", width, height, 0x80, 0, 0)  # 2-entry global colour table
+    out += b"\xc8\x1e\x5a\x00\x00\x00"
+    out += b"," + struct.pack("<HHHHB", 0, 0, width, height, 0) + bytes([min_code_size])
+    for start in range(0, len(data), 255):
+        block = data[start:start + 255]
+        out += bytes([len(block)]) + bytes(block)
+    return out + b"\x00;"
+
+def box(kind, *payload):
+    body = b"".join(payload)
+    return struct.pack(">I4s", 8 + len(body), kind) + body
+
+def mp4():
+    """ftyp, a junk mdat, then moov: 2.5 s, a 640x360 h264 track and an aac track."""
+    mvhd = box(b"mvhd", bytes(4), bytes(8), struct.pack(">II", 1000, 2500), bytes(80))
+
+    def trak(handler, fourcc, width=0, height=0):
+        tkhd = box(b"tkhd", bytes(4), bytes(72), struct.pack(">II", width << 16, height << 16))
+        hdlr = box(b"hdlr", bytes(8), handler, bytes(12), b"\0")
+        stsd = box(b"stsd", bytes(4), struct.pack(">I", 1), box(fourcc, bytes(8)))
+        return box(b"trak", tkhd, box(b"mdia", hdlr, box(b"minf", box(b"stbl", stsd))))
+
+    moov = box(b"moov", mvhd, trak(b"soun", b"mp4a"), trak(b"vide", b"avc1", 640, 360))
+    return box(b"ftyp", b"isom", bytes(4), b"isomavc1") + box(b"mdat", bytes(256)) + moov
+
+def element(element_id, payload):
+    size = len(payload)
+    return element_id + bytes([0x01]) + size.to_bytes(7, "big") + payload  # 8-byte size vint
+
+def mkv():
+    """EBML header and a Segment: SeekHead to skip, Info (1.5 s), a VP9 320x240 and an Opus track, a Cluster."""
+    header = element(b"\x1a\x45\xdf\xa3", element(b"\x42\x82", b"webm"))
+    info = element(b"\x15\x49\xa9\x66", element(b"\x2a\xd7\xb1", (1000000).to_bytes(3, "big"))
+                   + element(b"\x44\x89", struct.pack(">d", 1500.0)))
+    video = element(b"\xae", element(b"\x83", b"\x01") + element(b"\x86", b"V_VP9")
+                    + element(b"\xe0", element(b"\xb0", (320).to_bytes(2, "big"))
+                              + element(b"\xba", (240).to_bytes(2, "big"))))
+    audio = element(b"\xae", element(b"\x83", b"\x02") + element(b"\x86", b"A_OPUS"))
+    tracks = element(b"\x16\x54\xae\x6b", audio + video)
+    seekhead = element(b"\x11\x4d\x9b\x74", bytes(16))
+    cluster = element(b"\x1f\x43\xb6\x75", bytes(64))
+    return header + element(b"\x18\x53\x80\x67", seekhead + info + tracks + cluster)
+
+def main():
+    qt_images()
+    for name, data in [("tiny.gif", gif(6, 4)), ("tiny.mp4", mp4()), ("tiny.mkv", mkv())]:
+        with open(os.path.join(HERE, name), "wb") as f:
+            f.write(data)
+
+if __name__ == "__main__":
+    main()
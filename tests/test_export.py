@@ -0,0 +1,98 @@
+import io
+import os
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+
+from file_index import FileIndex
+from media_info import MediaInfo
+from search_core import SearchCancelled
+from export import export_results, export_format, CSV_COLUMNS
+
+AWKWARD = ['/d/plain.txt', '/d/comma, "quoted".txt', '/d/new\nline.txt', '/d/carriage\rreturn.txt',
+           '/d/tab\tand \\ backslash.txt', '/d/ünïcödé ✓.txt', '/d/control\x01char.txt', '/d/not indexed.txt']
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        indexed = AWKWARD[:-1]
+        self.index = FileIndex(indexed, list(range(len(indexed))), [1.5 * i for i in range(len(indexed))],
+                               [0] * len(indexed))
+        self.index.media['/d/plain.txt'] = MediaInfo(1920, 1080, 12.5, 'h,264 "x"')
+        self.index.media['/d/comma, "quoted".txt'] = None  # Probed, not media
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def export(self, fmt, paths=AWKWARD, **kwargs):
+        filename = os.path.join(self.dir, "out")
+        count = export_results(paths, filename, fmt, self.index, **kwargs)
+        self.assertEqual(count, len(paths))
+        with open(filename, "rb") as f:
+            return f.read()
+
+    def test_export_format(self):
+        self.assertEqual(export_format("a.CSV"), "csv")
+        self.assertEqual(export_format("a.ndjson"), "jsonl")
+        self.assertEqual(export_format("a.json"), "jsonl")
+        self.assertEqual(export_format("a.txt"), "nul")
+        self.assertEqual(export_format("a"), "nul")
+
+    def test_nul(self):
+        self.assertEqual(self.export("nul").decode("utf-8").split("\0"), AWKWARD + [""])
+
+    def test_csv_reads_back_with_the_csv_module(self):
+        data = self.export("csv", chunk_rows=3)
+        rows = list(csv.reader(io.StringIO(data.decode("utf-8"), newline="")))
+        self.assertEqual(tuple(rows[0]), CSV_COLUMNS)
+        self.assertEqual([row[0] for row in rows[1:]], AWKWARD)
+        self.assertEqual(rows[1], ["/d/plain.txt", "0", "0.0", "1920", "1080", "12.5", 'h,264 "x"'])
+        self.assertEqual(rows[2], ['/d/comma, "quoted".txt', "1", "1.5", "", "", "", ""])
+        self.assertEqual(rows[-1], ["/d/not indexed.txt", "", "", "", "", "", ""])
+
+    def test_csv_matches_the_csv_module_byte_for_byte(self):
+        expected = io.StringIO(newline="")
+        writer = csv.writer(expected)
+        writer.writerow(CSV_COLUMNS)
+        for i, path in enumerate(AWKWARD[2:-1], 2):
+            writer.writerow([path, i, 1.5 * i, "", "", "", ""])
+        self.assertEqual(self.export("csv", AWKWARD[2:-1]).decode("utf-8"), expected.getvalue())
+
+    def test_jsonl_lines_parse_as_json(self):
+        lines = self.export("jsonl").decode("utf-8").split("\n")
+        self.assertEqual(lines[-1], "")
+        rows = [json.loads(line) for line in lines[:-1]]
+        self.assertEqual([row["path"] for row in rows], AWKWARD)
+        self.assertEqual(rows[0], {"path": "/d/plain.txt", "size": 0, "mtime": 0.0, "width": 1920,
+                                   "height": 1080, "duration": 12.5, "codec": 'h,264 "x"'})
+        self.assertEqual(rows[1], {"path": '/d/comma, "quoted".txt', "size": 1, "mtime": 1.5})
+        self.assertEqual(rows[-1], {"path": "/d/not indexed.txt"})
+        self.assertIn("ünïcödé ✓", lines[5])  # Written as is, like json.dumps(ensure_ascii=False)
+
+    def test_undecodable_names_are_written_as_their_bytes(self):
+        name = os.fsdecode(b"/d/caf\xe9.txt")
+        self.assertEqual(self.export("nul", [name]), b"/d/caf\xe9.txt\0")
+
+    def test_without_index(self):
+        filename = os.path.join(self.dir, "plain.jsonl")
+        export_results(["/x"], filename)
+        with open(filename, encoding="utf-8") as f:
+            self.assertEqual(f.read(), '{"path": "/x"}\n')
+
+    def test_progress_and_cancel(self):
+        seen = []
+        self.export("nul", progress=lambda done, total: seen.append((done, total)), chunk_rows=3)
+        self.assertEqual(seen, [(3, 8), (6, 8), (8, 8)])
+        filename = os.path.join(self.dir, "cancelled.csv")
+        with self.assertRaises(SearchCancelled):
+            export_results(AWKWARD, filename, index=self.index, cancel=lambda: True)
+        self.assertEqual(os.listdir(self.dir), ["out"])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_results(AWKWARD, os.path.join(self.dir, "x"), "xml")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+
+import file_index
+from file_index import FileIndex, UNKNOWN_SIZE
+
+class Watcher:
+    def __init__(self):
+        self.events = []
+
+    def on_add(self, path, size):
+        self.events.append(("add", path, size))
+
+    def on_remove(self, path, size):
+        self.events.append(("remove", path, size))
+
+    def on_rename(self, old, new, size):
+        self.events.append(("rename", old, new, size))
+
+class FileIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = FileIndex(["/a/one", "/a/two", "/b/three"], [1, 2, 3], [10.0, 20.0, 30.0], [7, 8, 9])
+
+    def test_add_keeps_metadata_and_ignores_duplicates(self):
+        version = self.index.version
+        self.assertEqual(self.index.add("/c/four", 4, 40.0, 10), 3)
+        self.assertEqual(self.index.add("/c/four", 99), 3)
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual((self.index.sizes[3], self.index.mtimes[3], self.index.inodes[3]), (4, 40.0, 10))
+        self.assertEqual(self.index.version, version + 1)
+
+    def test_add_without_metadata(self):
+        index = FileIndex(["/x", "/y"])
+        self.assertEqual(list(index.sizes), [UNKNOWN_SIZE, UNKNOWN_SIZE])
+
+    def test_remove_leaves_a_tombstone(self):
+        self.assertTrue(self.index.remove("/a/two"))
+        self.assertFalse(self.index.remove("/a/two"))
+        self.assertEqual(self.index.slots, ["/a/one", None, "/b/three"])
+        self.assertEqual(self.index.tombstones, 1)
+        self.assertEqual(self.index.slot_of["/b/three"], 2)
+        self.assertNotIn("/a/two", self.index)
+        self.assertEqual(list(self.index), ["/a/one", "/b/three"])
+        self.assertEqual(list(self.index.slot_items()), [(0, "/a/one"), (2, "/b/three")])
+
+    def test_rename_keeps_slot_and_metadata(self):
+        self.index.media["/a/one"] = "info"
+        self.assertEqual(self.index.rename("/a/one", "/a/uno"), 0)
+        self.assertEqual(self.index.slots[0], "/a/uno")
+        self.assertEqual(self.index.sizes[0], 1)
+        self.assertEqual(self.index.media, {"/a/uno": "info"})
+        self.assertNotIn("/a/one", self.index)
+
+    def test_rename_onto_an_indexed_path_drops_the_old_one(self):
+        self.assertEqual(self.index.rename("/a/one", "/b/three"), 2)
+        self.assertEqual(self.index.slots[0], None)
+        self.assertEqual(self.index.tombstones, 1)
+        self.assertEqual(len(self.index), 2)
+
+    def test_rename_of_unknown_path_adds_it(self):
+        self.assertEqual(self.index.rename("/nowhere", "/c/new"), 3)
+        self.assertIn("/c/new", self.index)
+
+    def test_compact_renumbers_slots(self):
+        self.index.remove("/a/one")
+        self.index.compact()
+        self.assertEqual(self.index.slots, ["/a/two", "/b/three"])
+        self.assertEqual(self.index.slot_of, {"/a/two": 0, "/b/three": 1})
+        self.assertEqual(list(self.index.sizes), [2, 3])
+        self.assertEqual(list(self.index.mtimes), [20.0, 30.0])
+        self.assertEqual(list(self.index.inodes), [8, 9])
+        self.assertEqual(self.index.tombstones, 0)
+
+    def test_remove_compacts_once_tombstones_outnumber_entries(self):
+        minimum = file_index.COMPACT_MIN_TOMBSTONES
+        index = FileIndex([f"/f{i}" for i in range(2 * minimum + 10)])
+        for i in range(minimum + 5):
+            index.remove(f"/f{i}")
+        self.assertEqual(index.tombstones, minimum + 5)
+        index.remove(f"/f{minimum + 5}")  # Now more tombstones than entries
+        self.assertEqual(index.tombstones, 0)
+        self.assertEqual(len(index.slots), len(index))
+        self.assertEqual(index.slot_of[f"/f{2 * minimum + 9}"], len(index) - 1)
+
+    def test_watchers_hear_every_change(self):
+        watcher = Watcher()
+        self.index.watchers.append(watcher)
+        self.index.add("/c/four", 4)
+        self.index.remove("/a/two")
+        self.index.rename("/a/one", "/a/uno")
+        self.assertEqual(watcher.events, [("add", "/c/four", 4), ("remove", "/a/two", 2),
+                                          ("rename", "/a/one", "/a/uno", 1)])
+
+    def test_copies_are_unaffected_by_later_changes(self):
+        self.index.remove("/a/two")
+        copy = self.index.copy()
+        paths = self.index.paths()
+        sized = self.index.sized_paths()
+        self.index.add("/c/four", 4)
+        self.index.remove("/a/one")
+        self.index.compact()
+        self.assertEqual(list(paths), ["/a/one", "/b/three"])
+        self.assertEqual(list(sized), [("/a/one", 1), ("/b/three", 3)])
+        self.assertEqual(list(copy), ["/a/one", "/b/three"])
+        self.assertEqual(copy.slot_of, {"/a/one": 0, "/b/three": 2})
+        self.assertEqual(copy.sizes[copy.slot_of["/b/three"]], 3)
+
+    def test_dict_round_trip_drops_tombstones(self):
+        self.index.remove("/a/two")
+        self.index.saved_searches = [{"name": "mine"}]
+        restored = FileIndex.from_dict(self.index.to_dict())
+        self.assertEqual(restored.slots, ["/a/one", "/b/three"])
+        self.assertEqual(list(restored.sizes), [1, 3])
+        self.assertEqual(list(restored.inodes), [7, 9])
+        self.assertEqual(restored.saved_searches, [{"name": "mine"}])
+
+    def test_sort_keys_rank_by_name_and_folder(self):
+        name = self.index.sort_keys("name")
+        folder = self.index.sort_keys("folder")
+        by = lambda keys: sorted(self.index, key=lambda path: keys[self.index.slot_of[path]])
+        self.assertEqual(by(name), ["/a/one", "/b/three", "/a/two"])
+        self.assertEqual(by(folder), ["/a/one", "/a/two", "/b/three"])
+        self.assertIs(self.index.sort_keys("size"), self.index.sizes)
+        with self.assertRaises(ValueError):
+            self.index.sort_keys("colour")
+
+if __name__ == "__main__":
+    unittest.main()
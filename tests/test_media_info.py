@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import media_info
+from media_info import (MediaInfo, MediaCache, probe, extract_media, parse_media_filters, parse_duration,
+                        media_matches, filter_media)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")  # See make_media.py
+
+EXPECTED = {
+    "tiny.png": MediaInfo(7, 5, 0.0, "png"),
+    "tiny.gif": MediaInfo(6, 4, 0.0, "gif"),
+    "tiny.jpg": MediaInfo(33, 17, 0.0, "jpeg"),
+    "tiny.webp": MediaInfo(21, 11, 0.0, "webp"),
+    "tiny_lossless.webp": MediaInfo(300, 2, 0.0, "webp"),
+    "tiny.mp4": MediaInfo(640, 360, 2.5, "h264"),
+    "tiny.mkv": MediaInfo(320, 240, 1.5, "vp9"),
+}
+
+def fixture(name):
+    return os.path.join(FIXTURES, name)
+
+class ProbeTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, data):
+        path = os.path.join(self.dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_fixtures(self):
+        for name, info in EXPECTED.items():
+            with self.subTest(name=name):
+                self.assertEqual(probe(fixture(name)), info)
+
+    def test_truncated_files(self):
+        # Header reads don't need the whole file, but a cut-off header must give None, not an error
+        for name in EXPECTED:
+            with open(fixture(name), "rb") as f:
+                data = f.read()
+            for length in range(0, len(data), max(1, len(data) // 40)):
+                with self.subTest(name=name, length=length):
+                    self.assertIn(probe(self.write(name, data[:length])), (None, EXPECTED[name]))
+            self.assertIsNone(probe(self.write(name, data[:8])))
+
+    def test_other_files(self):
+        self.assertIsNone(probe(self.write("notes.jpg", b"just some text, not an image\n")))
+        self.assertIsNone(probe(self.write("empty.png", b"")))
+
+    def test_jpeg_skips_segments_before_the_frame_header(self):
+        with open(fixture("tiny.jpg"), "rb") as f:
+            data = f.read()
+        comment = b"\xff\xfe" + (2 + 300).to_bytes(2, "big") + b"x" * 300  # COM segment
+        self.assertEqual(probe(self.write("padded.jpg", data[:2] + comment + data[2:])), EXPECTED["tiny.jpg"])
+
+    def test_mp4_with_moov_first_and_audio_only(self):
+        with open(fixture("tiny.mp4"), "rb") as f:
+            data = f.read()
+        ftyp_end = int.from_bytes(data[0:4], "big")
+        mdat_end = ftyp_end + int.from_bytes(data[ftyp_end:ftyp_end + 4], "big")
+        moov_first = data[:ftyp_end] + data[mdat_end:] + data[ftyp_end:mdat_end]
+        self.assertEqual(probe(self.write("fast_start.mp4", moov_first)), EXPECTED["tiny.mp4"])
+        audio_only = data.replace(b"vide", b"meta")
+        self.assertEqual(probe(self.write("audio.m4a", audio_only)), MediaInfo(0, 0, 2.5, "aac"))
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.paths = [os.path.join(self.dir, name) for name in EXPECTED]
+        for name, path in zip(EXPECTED, self.paths):
+            shutil.copy(fixture(name), path)
+        self.paths.append(os.path.join(self.dir, "readme.txt"))
+        with open(self.paths[-1], "w") as f:
+            f.write("not media")
+        self.cache_file = os.path.join(self.dir, "file_index_media.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_headers_are_read_once(self):
+        cache = MediaCache(self.cache_file)
+        found = extract_media(self.paths, cache)
+        self.assertEqual({os.path.basename(path): info for path, info in found.items()}, EXPECTED)
+        cache.save()
+        with mock.patch.object(media_info, "probe", side_effect=AssertionError("read again")):
+            again = extract_media(self.paths, MediaCache(self.cache_file))
+        self.assertEqual(again, found)
+
+    def test_filter_media(self):
+        _, filters = parse_media_filters("width>=300 duration>1")
+        matched = filter_media(self.paths, filters, MediaCache())
+        self.assertEqual([os.path.basename(path) for path in matched], ["tiny.mp4", "tiny.mkv"])
+
+class FiltersTest(unittest.TestCase):
+    def test_parse_media_filters(self):
+        self.assertEqual(parse_media_filters("holiday width>=1920 codec:H264 height=1080p duration<1:30"),
+                         ("holiday", [("width", ">=", 1920), ("codec", "=", "h264"), ("height", "=", 1080),
+                                      ("duration", "<", 90.0)]))
+        self.assertEqual(parse_media_filters("plain"), ("plain", []))
+        with self.assertRaises(ValueError):
+            parse_media_filters("width>wide")
+        with self.assertRaises(ValueError):
+            parse_media_filters("codec>h264")
+
+    def test_parse_duration(self):
+        self.assertEqual([parse_duration(text) for text in ("90", "90s", "5m", "1.5h", "1:02:03")],
+                         [90.0, 90.0, 300.0, 5400.0, 3723.0])
+
+    def test_media_matches(self):
+        video = MediaInfo(1920, 1080, 0.0, "h264")
+        self.assertTrue(media_matches(video, [("width", ">=", 1920), ("codec", "=", "h264")]))
+        self.assertFalse(media_matches(video, [("duration", "<", 10)]))  # Unknown never matches
+        self.assertFalse(media_matches(None, [("width", ">", 1)]))
+        self.assertTrue(media_matches(None, []))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+from search_core import SearchCancelled, search_files
+from segments import SegmentedIndex, write_segments, segments_path, sort_rows, MANIFEST
+
+def entries(count):
+    names = ["Holiday Photo.jpg", "report_final.PDF", "Ünïcödé notes.txt", "clip 2019.mp4"]
+    return [(f"/data/d{i % 7}/{i}-{names[i % len(names)]}", i * 10, 1000.0 + i, i) for i in range(count)]
+
+class SegmentsTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.segments_dir = segments_path(os.path.join(self.dir, "file_index.json"))
+        self.entries = entries(500)
+        self.count = write_segments(self.segments_dir, "/data", self.entries, segment_bytes=4096)
+        self.index = SegmentedIndex(self.segments_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_segments_path(self):
+        self.assertEqual(segments_path("/x/file_index.json"), "/x/file_index_segments")
+
+    def test_manifest(self):
+        self.assertEqual(self.count, 500)
+        self.assertEqual(len(self.index), 500)
+        self.assertEqual(self.index.directory, "/data")
+        self.assertGreater(len(self.index.segments), 1)
+        self.assertEqual(sum(segment["entries"] for segment in self.index.segments), 500)
+        self.assertFalse(os.path.exists(self.segments_dir + ".tmp"))
+
+    def test_search_matches_the_reference_scan(self):
+        paths = [entry[0] for entry in self.entries]
+        for keyword in ["photo", "REPORT", "unicode", "nicd", "19.mp", "d3/4", "nothing here"]:
+            with self.subTest(keyword=keyword):
+                self.assertEqual(list(self.index.search(keyword)), search_files(None, keyword, paths))
+
+    def test_empty_keyword_returns_everything_in_order(self):
+        self.assertEqual(list(self.index.search("")), [entry[0] for entry in self.entries])
+        self.assertEqual(list(self.index.search("", meta=True)),
+                         [(path, size, mtime) for path, size, mtime, _ in self.entries])
+
+    def test_meta_and_limit(self):
+        rows = list(self.index.search("clip", limit=3, meta=True))
+        expected = [(path, size, mtime) for path, size, mtime, _ in self.entries if "clip" in path][:3]
+        self.assertEqual(rows, expected)
+
+    def test_without_prefetch(self):
+        self.assertEqual(list(self.index.search("photo", prefetch=False)), list(self.index.search("photo")))
+
+    def test_undecodable_names_survive(self):
+        name = os.fsdecode(b"/data/caf\xe9.txt")  # Latin-1 bytes on a UTF-8 system
+        write_segments(self.segments_dir, "/data", [(name, 1, 2.0, 3)])
+        self.assertEqual(list(SegmentedIndex(self.segments_dir).search("caf")), [name])
+
+    def test_rewrite_replaces_the_old_segments(self):
+        write_segments(self.segments_dir, "/data", entries(3))
+        index = SegmentedIndex(self.segments_dir)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(sorted(os.listdir(self.segments_dir)), ["00000.seg", MANIFEST])
+
+    def test_cancel(self):
+        with self.assertRaises(SearchCancelled):
+            list(self.index.search("photo", cancel=lambda: True))
+
+    def test_other_byte_order_is_refused(self):
+        manifest_file = os.path.join(self.segments_dir, MANIFEST)
+        with open(manifest_file, encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest["byteorder"] = "big" if sys.byteorder == "little" else "little"
+        with open(manifest_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        with self.assertRaises(ValueError):
+            SegmentedIndex(self.segments_dir)
+
+    def test_damaged_segments_are_refused(self):
+        first = os.path.join(self.segments_dir, self.index.segments[0]["file"])
+        with open(first, "r+b") as f:
+            f.write(b"NOTASEG!")
+        with self.assertRaises(ValueError):
+            list(self.index.search("photo"))
+        with open(first, "r+b") as f:
+            f.truncate(100)
+        with self.assertRaises(ValueError):
+            list(self.index.search("photo"))
+
+    def test_sort_rows(self):
+        rows = [("/b/x", 3, 1.0), ("/a/y", 1, 3.0), ("/c/w", 2, 2.0)]
+        self.assertEqual([row[0] for row in sort_rows(rows, "size")], ["/a/y", "/c/w", "/b/x"])
+        self.assertEqual([row[0] for row in sort_rows(rows, "mtime", reverse=True)], ["/a/y", "/c/w", "/b/x"])
+        self.assertEqual([row[0] for row in sort_rows(rows, "name")], ["/c/w", "/b/x", "/a/y"])
+        self.assertEqual([row[0] for row in sort_rows(rows, "folder", limit=2)], ["/a/y", "/b/x"])
+        self.assertEqual([row[0] for row in sort_rows(rows, "size", reverse=True, limit=1)], ["/b/x"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import random
+import subprocess
+import unittest
+
+from search_core import SearchCancelled
+from similar_names import find_similar_names, name_key, lsh_bands, jaccard, shingles, BUCKET_CAP
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def generated_paths(count=3000, seed=7):
+    rng = random.Random(seed)
+    words = ["holiday", "report", "invoice", "photo", "draft", "final", "scan", "meeting", "notes", "budget"]
+    paths = []
+    for i in range(count):
+        name = "_".join(rng.sample(words, 3)) + f"_{rng.randrange(40)}"
+        if rng.random() < 0.3:
+            name += rng.choice([" (1)", " - Copy", "_v2", "x"])
+        paths.append(f"/d{i % 9}/{name}.{rng.choice(['pdf', 'jpg', 'txt'])}")
+    return paths
+
+CLUSTER_SCRIPT = """
+import json, sys
+sys.path.insert(0, sys.argv[1])
+from tests.test_similar_names import generated_paths
+from similar_names import find_similar_names
+print(json.dumps(find_similar_names(generated_paths())))
+"""
+
+class SimilarNamesTest(unittest.TestCase):
+    def test_name_key_drops_copy_markers(self):
+        for path in ["/a/Report Final (1).pdf", "/b/report final - Copy.pdf", "/c/REPORT_FINAL copy 2.pdf",
+                     "/d/report-final [3].pdf", "/e/Report Final.pdf"]:
+            with self.subTest(path=path):
+                self.assertEqual(name_key(path), "reportfinal.pdf")
+
+    def test_clusters(self):
+        paths = ["/a/holiday_photos_2019.jpg", "/b/holiday_photos_2019 (1).jpg", "/c/Holiday Photo 2019.jpg",
+                 "/a/invoice_march.pdf", "/b/Invoice March - Copy.pdf", "/a/unrelated.txt", "/a/ab"]
+        self.assertEqual(find_similar_names(paths), [
+            ["/c/Holiday Photo 2019.jpg", "/a/holiday_photos_2019.jpg", "/b/holiday_photos_2019 (1).jpg"],
+            ["/a/invoice_march.pdf", "/b/Invoice March - Copy.pdf"],
+        ])
+
+    def test_threshold(self):
+        paths = ["/a/project_plan_v1.doc", "/a/project_plan_v2.doc"]
+        similarity = jaccard(shingles(name_key(paths[0])), shingles(name_key(paths[1])))
+        self.assertEqual(find_similar_names(paths, threshold=similarity), [paths])
+        self.assertEqual(find_similar_names(paths, threshold=min(1.0, similarity + 0.05)), [])
+
+    def test_later_bucket_members_are_compared(self):
+        # These share buckets with quartddlyvreport first, which is like neither; comparing only
+        # with a bucket's first name never joins the other two
+        paths = ["/p/quartddlyvreport.txt", "/p/quarterly_report.txt", "/p/quarterlk_report.txt"]
+        self.assertEqual(find_similar_names(paths), [["/p/quarterlk_report.txt", "/p/quarterly_report.txt"]])
+
+    def test_crowded_buckets(self):
+        crowd = [f"/x/zzzz{i:03d}qqqq.bin" for i in range(10 * BUCKET_CAP)]
+        found = find_similar_names(crowd, threshold=0.5)
+        self.assertEqual(sum(len(cluster) for cluster in found), len(crowd))
+
+    def test_results_do_not_depend_on_hash_randomization(self):
+        runs = set()
+        for seed in ("1", "2", "3"):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            out = subprocess.run([sys.executable, "-c", CLUSTER_SCRIPT, ROOT], env=env, cwd=ROOT,
+                                 capture_output=True, text=True, check=True).stdout
+            runs.add(out)
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(json.loads(runs.pop()), find_similar_names(generated_paths()))
+
+    def test_lsh_bands_knee_stays_below_threshold(self):
+        for threshold in (0.5, 0.7, 0.9):
+            bands, rows = lsh_bands(threshold)
+            self.assertLessEqual((1 / bands) ** (1 / rows), threshold)
+
+    def test_progress_and_cancel(self):
+        seen = []
+        find_similar_names(generated_paths(100), progress=lambda done, total: seen.append((done, total)))
+        self.assertEqual(seen[-1][0], seen[-1][1])
+        with self.assertRaises(SearchCancelled):
+            find_similar_names(generated_paths(100), cancel=lambda: True)
+
+if __name__ == "__main__":
+    unittest.main()
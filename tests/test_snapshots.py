@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from file_index import FileIndex, UNKNOWN_SIZE
+from search_core import SearchCancelled
+from snapshots import save_snapshot, load_snapshot, diff_index, is_snapshot_of, snapshot_path
+
+def make_index(entries):
+    """FileIndex from {path: (size, mtime)}."""
+    paths = list(entries)
+    return FileIndex(paths, [entries[p][0] for p in paths], [entries[p][1] for p in paths], [0] * len(paths))
+
+class SnapshotsTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = snapshot_path(os.path.join(self.dir, "file_index.json"))
+        before = make_index({"/d/same": (1, 1.0), "/d/grown": (2, 2.0), "/d/touched": (3, 3.0),
+                             "/d/gone": (4, 4.0), "/d/unsized": (UNKNOWN_SIZE, 5.0)})
+        before.remove("/d/gone")  # Tombstones aren't saved
+        before.add("/d/gone", 4, 4.0)
+        save_snapshot(self.file, "/d", before)
+        self.snapshot = load_snapshot(self.file)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_snapshot_round_trip(self):
+        self.assertEqual(self.file, os.path.join(self.dir, "file_index_previous.json"))
+        self.assertEqual(self.snapshot["files"], sorted(self.snapshot["files"]))
+        self.assertEqual(len(self.snapshot["files"]), 5)
+        self.assertIsNotNone(self.snapshot["timestamp"])
+        self.assertIsNone(load_snapshot(os.path.join(self.dir, "missing.json")))
+
+    def test_is_snapshot_of(self):
+        self.assertTrue(is_snapshot_of(self.snapshot, "/d/"))
+        self.assertFalse(is_snapshot_of(self.snapshot, "/e"))
+        self.assertFalse(is_snapshot_of(self.snapshot, None))
+
+    def test_diff_reports_added_removed_and_modified(self):
+        after = make_index({"/d/new": (9, 9.0), "/d/same": (1, 1.0), "/d/grown": (20, 2.0),
+                            "/d/touched": (3, 30.0), "/d/unsized": (6, 5.0), "/d/also new": (1, 1.0)})
+        after.remove("/d/also new")  # A tombstone is not an added file
+        diff = diff_index(self.snapshot, after)
+        self.assertEqual(diff.added, ["/d/new"])
+        self.assertEqual(diff.removed, ["/d/gone"])
+        self.assertEqual(diff.modified, ["/d/grown", "/d/touched"])  # Unknown sizes compare by mtime only
+        self.assertEqual(len(diff), 4)
+        self.assertEqual(diff.since, self.snapshot["timestamp"])
+        self.assertEqual([heading for heading, _ in diff.groups()], ["Added", "Modified", "Removed"])
+
+    def test_no_changes(self):
+        after = make_index({"/d/same": (1, 1.0), "/d/grown": (2, 2.0), "/d/touched": (3, 3.0),
+                            "/d/gone": (4, 4.0), "/d/unsized": (UNKNOWN_SIZE, 5.0)})
+        diff = diff_index(self.snapshot, after)
+        self.assertEqual(len(diff), 0)
+        self.assertEqual(diff.groups(), [])
+
+    def test_cancel(self):
+        with self.assertRaises(SearchCancelled):
+            diff_index(self.snapshot, FileIndex(), cancel=lambda: True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Size-bounded on-disk store of encoded thumbnails.
+
+Thumbnails are keyed by the file's content (size and a hash of its first
+and last blocks, as in duplicates.partial_hash), so a renamed, moved or
+copied image reuses its thumbnail and an edited one gets a new entry. Each
+entry is one file in the cache directory. When the total passes max_bytes
+the least recently used entries are deleted; use is tracked by mtime, so
+the order survives restarts.
+
+Decoding and scaling happen in the window's thumbnail workers; this module
+only stores bytes and has no Qt dependency.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from duplicates import partial_hash
+
+THUMBNAIL_SIZE = 160  # Longest side, in pixels
+THUMBNAIL_CACHE_BYTES = 256 * 1024 * 1024
+
+def content_key(path, size, thumbnail_size=THUMBNAIL_SIZE):
+    """Cache key for a file's thumbnail; reads at most two PARTIAL_BLOCKs of it."""
+    return f"{partial_hash(path, size)}-{size:x}-{thumbnail_size}"
+
+class ThumbnailStore:
+    """Encoded thumbnails in a directory, evicted least recently used first."""
+    def __init__(self, directory, max_bytes=THUMBNAIL_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = None  # key -> bytes on disk, least recently used first; read on first use
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        found = []
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        st = entry.stat()
+                        found.append((st.st_mtime, entry.name, st.st_size))
+        except OSError as e:
+            print(f"Error reading thumbnail cache: {str(e)}")
+        found.sort()
+        self.entries = OrderedDict((name, size) for _, name, size in found)
+        self.total = sum(self.entries.values())
+
+    def get(self, key):
+        """The stored bytes for key, or None; marks the entry as recently used."""
+        with self.lock:
+            self._load()
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            with self.lock:
+                self.total -= self.entries.pop(key, 0)
+            return None
+
+    def put(self, key, data):
+        path = os.path.join(self.directory, key)
+        with self.lock:
+            self._load()
+            try:
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(data)
+                os.replace(path + '.tmp', path)
+            except OSError as e:
+                print(f"Error writing thumbnail: {str(e)}")
+                return
+            self.total += len(data) - self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            while self.total > self.max_bytes and len(self.entries) > 1:
+                old_key, old_size = self.entries.popitem(last=False)
+                self.total -= old_size
+                try:
+                    os.remove(os.path.join(self.directory, old_key))
+                except OSError:
+                    pass
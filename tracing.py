@@ -0,0 +1,163 @@
+"""Lightweight phase tracing for File Search.
+
+Code marks its phases with spans:
+
+    with tracing.span("walk", directory=directory):
+        ...
+
+When tracing is off, span() returns a shared no-op object, so the cost is a
+function call and a flag check. It is switched on with environment variables
+(or configure()):
+
+    FILESEARCH_TRACE=trace.json      write a Chrome trace (chrome://tracing, Perfetto) at exit
+    FILESEARCH_PROFILE=walk,match    run these phases under cProfile ("all" for every phase)
+    FILESEARCH_PROFILE_DIR=profiles  where the .prof files go (default: current directory)
+"""
+import os
+import json
+import time
+import atexit
+import cProfile
+import itertools
+import threading
+
+_enabled = False
+_trace_file = None
+_profile_phases = set()
+_profile_all = False
+_profile_dir = "."
+_events = []
+_thread_names = {}
+_listeners = []
+_lock = threading.Lock()
+_profile_counter = itertools.count(1)
+_origin_ns = time.perf_counter_ns()
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "args", "start", "profiler")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.profiler = None
+
+    def set(self, **args):
+        """Attach extra values (e.g. result counts) to the span."""
+        self.args.update(args)
+
+    def __enter__(self):
+        if _profile_all or self.name in _profile_phases:
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:  # Another profiler is already active on this thread
+                self.profiler = None
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if self.profiler is not None:
+            self.profiler.disable()
+            path = os.path.join(_profile_dir, f"{self.name}-{next(_profile_counter)}.prof")
+            try:
+                self.profiler.dump_stats(path)
+            except OSError as e:
+                print(f"Error writing profile {path}: {str(e)}")
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _record(self.name, self.start, end, self.args)
+        return False
+
+def _record(name, start_ns, end_ns, args):
+    thread = threading.current_thread()
+    if _trace_file:
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": (start_ns - _origin_ns) / 1000.0,
+            "dur": (end_ns - start_ns) / 1000.0,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": args,
+        }
+        with _lock:
+            _events.append(event)
+            _thread_names.setdefault(thread.ident, thread.name)
+    for listener in list(_listeners):
+        try:
+            listener(name, (end_ns - start_ns) / 1e9, args)
+        except Exception as e:
+            print(f"Error in trace listener: {str(e)}")
+
+def span(name, **args):
+    """Time a named phase; use as a context manager."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+def is_enabled():
+    return _enabled
+
+def add_listener(callback):
+    """Call callback(name, seconds, args) whenever a span ends; enables spans."""
+    global _enabled
+    _listeners.append(callback)
+    _enabled = True
+
+def remove_listener(callback):
+    global _enabled
+    if callback in _listeners:
+        _listeners.remove(callback)
+    _enabled = bool(_trace_file or _profile_phases or _profile_all or _listeners)
+
+def configure(trace_file=None, profile_phases=None, profile_dir=None):
+    """Turn on trace output and/or profiling. profile_phases is a list of span names or ["all"]."""
+    global _enabled, _trace_file, _profile_phases, _profile_all, _profile_dir
+    if trace_file:
+        if not _trace_file:
+            atexit.register(dump)
+        _trace_file = trace_file
+    if profile_phases:
+        phases = {phase.strip() for phase in profile_phases if phase.strip()}
+        _profile_all = "all" in phases
+        _profile_phases = phases - {"all"}
+    if profile_dir:
+        _profile_dir = profile_dir
+        os.makedirs(profile_dir, exist_ok=True)
+    _enabled = bool(_trace_file or _profile_phases or _profile_all or _listeners)
+
+def dump(path=None):
+    """Write the recorded spans as a Chrome trace JSON file."""
+    path = path or _trace_file
+    if not path:
+        return
+    with _lock:
+        events = list(_events)
+        names = dict(_thread_names)
+    pid = os.getpid()
+    metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                for tid, name in names.items()]
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+    except OSError as e:
+        print(f"Error writing trace {path}: {str(e)}")
+
+configure(os.environ.get("FILESEARCH_TRACE"),
+          os.environ.get("FILESEARCH_PROFILE", "").split(",") if os.environ.get("FILESEARCH_PROFILE") else None,
+          os.environ.get("FILESEARCH_PROFILE_DIR"))